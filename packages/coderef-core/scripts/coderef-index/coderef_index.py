@@ -0,0 +1,511 @@
+#!/usr/bin/env python3
+"""
+---
+related_test: scripts/coderef-index/test_coderef_index.py
+---
+
+coderef_index.py - Streaming loader and query index for .coderef/index.json
+
+Purpose:
+    Reads the element index written by saveIndex() without a full json.load:
+    the "elements" array is stream-parsed one element at a time, so memory is
+    bounded by the compact index, not by the size of the JSON file.
+
+Index:
+    Columns (name, type, file, line, exported) plus inverted indexes by name,
+    type and file, stored as sorted keys with one run of element ids per key,
+    and the list of exported element ids. Queries such as "exported hooks in
+    file X" or "names starting with Y" touch only the smallest matching run.
+
+Sidecar:
+    index.json.idx next to the index holds the built columns (marshal format).
+    It is reused while the index file's size and mtime are unchanged, so later
+    loads skip parsing entirely.
+
+Usage:
+    python coderef_index.py [project_or_index] [--name N] [--prefix P] [--type T]
+                            [--file F] [--exported | --not-exported] [--limit N] [--json]
+    python coderef_index.py [project_or_index] --stats
+"""
+
+import argparse
+import json
+import marshal
+import os
+import re
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Callable, Dict, IO, Iterator, List, NamedTuple, Optional, Tuple
+
+# Characters read per refill of the parse buffer
+CHUNK_SIZE = 1024 * 1024
+
+# Bump whenever the sidecar layout changes
+SIDECAR_FORMAT = 1
+SIDECAR_SUFFIX = '.idx'
+
+# exported column values (the field is optional in index.json)
+EXPORTED_NO, EXPORTED_YES, EXPORTED_UNKNOWN = 0, 1, 2
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_DECODER = json.JSONDecoder()
+
+
+class Element(NamedTuple):
+    """The queryable fields of one index.json element"""
+    name: str
+    type: str
+    file: str
+    line: int
+    exported: Optional[bool]
+
+
+def index_path(path) -> Path:
+    """index.json for a project directory, or the path itself if it is a file"""
+    path = Path(path)
+    if path.is_dir():
+        return path / '.coderef' / 'index.json'
+    return path
+
+
+def sidecar_path(path) -> Path:
+    """Prebuilt index written next to index.json"""
+    path = Path(path)
+    return path.with_name(path.name + SIDECAR_SUFFIX)
+
+
+def file_key(path: str) -> str:
+    """Element file paths compare with forward slashes (indexes come from Windows and POSIX)"""
+    return path.replace('\\', '/')
+
+
+# ========== STREAMING PARSER ==========
+
+class _Reader:
+    """Chunked JSON tokenizer: whole values are decoded with json's own raw_decode"""
+
+    def __init__(self, f: IO[str], source: Path):
+        self.f = f
+        self.source = source
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        """Drop consumed text and append the next chunk; False at end of file"""
+        if self.eof:
+            return False
+        chunk = self.f.read(CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def _skip_whitespace(self):
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf) or not self._fill():
+                return
+
+    def error(self, message: str) -> ValueError:
+        return ValueError(f"{self.source}: {message}")
+
+    def next_char(self) -> str:
+        """Consume the next non-whitespace character ('' at end of file)"""
+        self._skip_whitespace()
+        if self.pos >= len(self.buf):
+            return ''
+        char = self.buf[self.pos]
+        self.pos += 1
+        return char
+
+    def peek(self) -> str:
+        self._skip_whitespace()
+        return self.buf[self.pos] if self.pos < len(self.buf) else ''
+
+    def expect(self, char: str):
+        found = self.next_char()
+        if found != char:
+            raise self.error(f"expected {char!r}, found {found or 'end of file'!r}")
+
+    def value(self):
+        """Decode one complete JSON value, reading more text until it is whole"""
+        self._skip_whitespace()
+        while True:
+            try:
+                obj, end = _DECODER.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as e:
+                if self._fill():
+                    continue
+                raise self.error(f"invalid JSON ({e})") from e
+            # A number that ends the buffer may continue in the next chunk
+            if end == len(self.buf) and self._fill():
+                continue
+            self.pos = end
+            return obj
+
+
+def iter_elements(path, header: Optional[Dict] = None) -> Iterator[Dict]:
+    """
+    Stream the element dicts of an index.json. Other top-level fields are stored
+    in header as they are passed (fields after "elements" once the stream ends).
+    """
+    path = Path(path)
+    if header is None:
+        header = {}
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        reader = _Reader(f, path)
+        reader.expect('{')
+        if reader.peek() == '}':
+            return
+        while True:
+            key = reader.value()
+            if not isinstance(key, str):
+                raise reader.error("expected an object key")
+            reader.expect(':')
+            if key == 'elements':
+                reader.expect('[')
+                if reader.peek() == ']':
+                    reader.next_char()
+                else:
+                    while True:
+                        yield reader.value()
+                        separator = reader.next_char()
+                        if separator == ']':
+                            break
+                        if separator != ',':
+                            raise reader.error("expected ',' or ']' in elements")
+            else:
+                header[key] = reader.value()
+
+            separator = reader.next_char()
+            if separator == '}':
+                return
+            if separator != ',':
+                raise reader.error("expected ',' or '}' at top level")
+
+
+# ========== INDEX ==========
+
+class Postings:
+    """Sorted keys, each owning a run of ascending element ids (ids[offsets[k]:offsets[k + 1]])"""
+
+    __slots__ = ('keys', 'offsets', 'ids')
+
+    def __init__(self, keys: List[str], offsets: array, ids: array):
+        self.keys = keys
+        self.offsets = offsets
+        self.ids = ids
+
+    def lookup(self, key: str) -> int:
+        """Position of key, or -1"""
+        k = bisect_left(self.keys, key)
+        return k if k < len(self.keys) and self.keys[k] == key else -1
+
+    def prefix_range(self, prefix: str) -> Tuple[int, int]:
+        """[lo, hi) positions of the keys starting with prefix"""
+        lo = bisect_left(self.keys, prefix)
+        hi = bisect_left(self.keys, prefix + '\U0010ffff', lo)
+        return lo, hi
+
+    def run(self, lo: int, hi: Optional[int] = None) -> array:
+        """Element ids of keys lo..hi-1 (just lo by default)"""
+        return self.ids[self.offsets[lo]:self.offsets[lo + 1 if hi is None else hi]]
+
+    def size(self, lo: int, hi: Optional[int] = None) -> int:
+        return self.offsets[lo + 1 if hi is None else hi] - self.offsets[lo]
+
+
+def _build_postings(local_keys: List[str], column: array) -> Tuple[Postings, array]:
+    """Sort first-seen keys and group element ids by key; returns the postings and the remapped column"""
+    order = sorted(range(len(local_keys)), key=local_keys.__getitem__)
+    rank = array('I', [0]) * len(order)
+    for position, local in enumerate(order):
+        rank[local] = position
+    column = array('I', (rank[local] for local in column))
+
+    offsets = array('I', [0]) * (len(order) + 1)
+    for position in column:
+        offsets[position + 1] += 1
+    for k in range(len(order)):
+        offsets[k + 1] += offsets[k]
+
+    cursor = offsets[:-1]
+    ids = array('I', [0]) * len(column)
+    for element_id, position in enumerate(column):
+        ids[cursor[position]] = element_id
+        cursor[position] += 1
+
+    return Postings([local_keys[local] for local in order], offsets, ids), column
+
+
+class CoderefIndex:
+    """Compact columns and inverted indexes over the elements of one index.json"""
+
+    def __init__(self, header: Dict, names: Postings, types: Postings, files: Postings,
+                 name_col: array, type_col: array, file_col: array, lines: array,
+                 exported: bytes, exported_ids: array):
+        self.header = header
+        self.names = names
+        self.types = types
+        self.files = files
+        self.name_col = name_col
+        self.type_col = type_col
+        self.file_col = file_col
+        self.lines = lines
+        self.exported = exported
+        self.exported_ids = exported_ids
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    @classmethod
+    def build(cls, path) -> 'CoderefIndex':
+        """Stream-parse index.json into a new index"""
+        header: Dict = {}
+        interned: Tuple[Dict[str, int], Dict[str, int], Dict[str, int]] = ({}, {}, {})
+        columns = (array('I'), array('I'), array('I'))
+        lines = array('I')
+        exported = bytearray()
+
+        for element in iter_elements(path, header):
+            values = (str(element.get('name', '')), str(element.get('type', 'unknown')),
+                      file_key(str(element.get('file', ''))))
+            for value, seen, column in zip(values, interned, columns):
+                column.append(seen.setdefault(value, len(seen)))
+            lines.append(max(0, int(element.get('line') or 0)))
+            flag = element.get('exported')
+            exported.append(EXPORTED_UNKNOWN if flag is None else EXPORTED_YES if flag else EXPORTED_NO)
+
+        built = [_build_postings(list(seen), column) for seen, column in zip(interned, columns)]
+        (names, name_col), (types, type_col), (files, file_col) = built
+        exported_ids = array('I', (i for i, flag in enumerate(exported) if flag == EXPORTED_YES))
+        return cls(header, names, types, files, name_col, type_col, file_col, lines,
+                   bytes(exported), exported_ids)
+
+    # ========== QUERIES ==========
+
+    def element(self, element_id: int) -> Element:
+        flag = self.exported[element_id]
+        return Element(
+            self.names.keys[self.name_col[element_id]],
+            self.types.keys[self.type_col[element_id]],
+            self.files.keys[self.file_col[element_id]],
+            self.lines[element_id],
+            None if flag == EXPORTED_UNKNOWN else flag == EXPORTED_YES,
+        )
+
+    def _file_position(self, file: str) -> int:
+        """Match a file as stored, or relative to / under the project path"""
+        key = file_key(file)
+        position = self.files.lookup(key)
+        project = file_key(str(self.header.get('projectPath') or '')).rstrip('/')
+        if position < 0 and project:
+            if key.startswith(project + '/'):
+                position = self.files.lookup(key[len(project) + 1:])
+            else:
+                relative = key[2:] if key.startswith('./') else key
+                position = self.files.lookup(f"{project}/{relative}")
+        return position
+
+    def find_ids(self, name: Optional[str] = None, prefix: Optional[str] = None,
+                 type: Optional[str] = None, file: Optional[str] = None,
+                 exported: Optional[bool] = None, limit: Optional[int] = None) -> List[int]:
+        """
+        Ids of elements matching every given filter, ascending.
+        Candidates come from the smallest posting run; the other filters are
+        checked against the columns.
+        """
+        sources: List[Tuple[int, Callable[[], array]]] = []
+        checks: List[Callable[[int], bool]] = []
+
+        if name is not None:
+            k = self.names.lookup(name)
+            if k < 0:
+                return []
+            sources.append((self.names.size(k), lambda: self.names.run(k)))
+            checks.append(lambda i: self.name_col[i] == k)
+        if prefix is not None:
+            lo, hi = self.names.prefix_range(prefix)
+            if lo == hi:
+                return []
+            sources.append((self.names.size(lo, hi), lambda: sorted(self.names.run(lo, hi))))
+            checks.append(lambda i: lo <= self.name_col[i] < hi)
+        if type is not None:
+            t = self.types.lookup(type)
+            if t < 0:
+                return []
+            sources.append((self.types.size(t), lambda: self.types.run(t)))
+            checks.append(lambda i: self.type_col[i] == t)
+        if file is not None:
+            f = self._file_position(file)
+            if f < 0:
+                return []
+            sources.append((self.files.size(f), lambda: self.files.run(f)))
+            checks.append(lambda i: self.file_col[i] == f)
+        if exported is not None:
+            wanted = EXPORTED_YES if exported else EXPORTED_NO
+            if exported:
+                sources.append((len(self.exported_ids), lambda: self.exported_ids))
+            checks.append(lambda i: self.exported[i] == wanted)
+
+        candidates = min(sources, key=lambda source: source[0])[1]() if sources else range(len(self))
+        matches = []
+        for i in candidates:
+            if all(check(i) for check in checks):
+                matches.append(i)
+                if limit is not None and len(matches) >= limit:
+                    break
+        return matches
+
+    def find(self, **filters) -> List[Element]:
+        """Elements matching every filter (see find_ids)"""
+        return [self.element(i) for i in self.find_ids(**filters)]
+
+    def stats(self) -> Dict:
+        return {
+            'elements': len(self),
+            'names': len(self.names.keys),
+            'files': len(self.files.keys),
+            'exported': len(self.exported_ids),
+            'by_type': {key: self.types.size(k) for k, key in enumerate(self.types.keys)},
+        }
+
+    # ========== SIDECAR ==========
+
+    def to_payload(self, source: os.stat_result) -> Dict:
+        def postings(p: Postings):
+            return [p.keys, p.offsets.tobytes(), p.ids.tobytes()]
+
+        return {
+            'format': SIDECAR_FORMAT,
+            'itemsize': array('I').itemsize,
+            'source': [source.st_size, source.st_mtime_ns],
+            'header': self.header,
+            'names': postings(self.names),
+            'types': postings(self.types),
+            'files': postings(self.files),
+            'columns': [self.name_col.tobytes(), self.type_col.tobytes(), self.file_col.tobytes(),
+                        self.lines.tobytes()],
+            'exported': self.exported,
+            'exported_ids': self.exported_ids.tobytes(),
+        }
+
+    @classmethod
+    def from_payload(cls, payload: Dict) -> 'CoderefIndex':
+        def uints(data: bytes) -> array:
+            values = array('I')
+            values.frombytes(data)
+            return values
+
+        def postings(entry) -> Postings:
+            keys, offsets, ids = entry
+            return Postings(keys, uints(offsets), uints(ids))
+
+        name_col, type_col, file_col, lines = (uints(data) for data in payload['columns'])
+        return cls(payload['header'], postings(payload['names']), postings(payload['types']),
+                   postings(payload['files']), name_col, type_col, file_col, lines,
+                   payload['exported'], uints(payload['exported_ids']))
+
+
+def read_sidecar(path: Path, source: os.stat_result) -> Optional[CoderefIndex]:
+    """The prebuilt index, or None if it is missing, stale or from another format"""
+    try:
+        with open(sidecar_path(path), 'rb') as f:
+            payload = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if (not isinstance(payload, dict) or payload.get('format') != SIDECAR_FORMAT
+            or payload.get('itemsize') != array('I').itemsize
+            or payload.get('source') != [source.st_size, source.st_mtime_ns]):
+        return None
+    return CoderefIndex.from_payload(payload)
+
+
+def write_sidecar(index: CoderefIndex, path: Path, source: os.stat_result) -> bool:
+    """Atomically write the sidecar; False if the directory is not writable"""
+    target = sidecar_path(path)
+    tmp_path = target.with_name(target.name + '.tmp')
+    try:
+        with open(tmp_path, 'wb') as f:
+            marshal.dump(index.to_payload(source), f)
+        os.replace(tmp_path, target)
+    except OSError:
+        return False
+    return True
+
+
+def load_index(path, sidecar: bool = True, rebuild: bool = False) -> CoderefIndex:
+    """
+    Index for a project directory or an index.json path.
+    With sidecar, a current index.json.idx is loaded instead of parsing, and a
+    freshly built index is saved for next time.
+    """
+    path = index_path(path)
+    source = path.stat()
+    if sidecar and not rebuild:
+        index = read_sidecar(path, source)
+        if index is not None:
+            return index
+
+    index = CoderefIndex.build(path)
+    if sidecar:
+        write_sidecar(index, path, source)
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Query a .coderef/index.json without loading it whole')
+    parser.add_argument('path', nargs='?', default='.', help='Project directory or index.json (default: .)')
+    parser.add_argument('--name', help='Exact element name')
+    parser.add_argument('--prefix', help='Element name prefix')
+    parser.add_argument('--type', help='Element type (function, method, component, class, hook, ...)')
+    parser.add_argument('--file', help='Source file, as stored or relative to the project')
+    exported = parser.add_mutually_exclusive_group()
+    exported.add_argument('--exported', dest='exported', action='store_const', const=True, default=None,
+                          help='Only exported elements')
+    exported.add_argument('--not-exported', dest='exported', action='store_const', const=False,
+                          help='Only elements marked as not exported')
+    parser.add_argument('--limit', type=int, default=None, help='Stop after N matches')
+    parser.add_argument('--json', action='store_true', help='Print matches as JSON')
+    parser.add_argument('--stats', action='store_true', help='Print index totals instead of querying')
+    parser.add_argument('--no-sidecar', action='store_true', help='Neither read nor write index.json.idx')
+    parser.add_argument('--rebuild', action='store_true', help='Re-parse index.json even if the sidecar is current')
+    args = parser.parse_args()
+
+    try:
+        start = time.perf_counter()
+        index = load_index(args.path, sidecar=not args.no_sidecar, rebuild=args.rebuild)
+        load_seconds = time.perf_counter() - start
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.stats:
+        print(json.dumps({**index.stats(), 'load_seconds': round(load_seconds, 6)}, indent=2))
+        return
+
+    start = time.perf_counter()
+    ids = index.find_ids(name=args.name, prefix=args.prefix, type=args.type, file=args.file,
+                         exported=args.exported, limit=args.limit)
+    query_seconds = time.perf_counter() - start
+    matches = [index.element(i) for i in ids]
+
+    if args.json:
+        print(json.dumps([m._asdict() for m in matches], indent=2))
+        return
+
+    for m in matches:
+        flag = ' (exported)' if m.exported else ''
+        print(f"{m.type:10} {m.name}  {m.file}:{m.line}{flag}")
+    print(f"{len(matches)} match(es); load {load_seconds * 1000:.1f} ms, "
+          f"query {query_seconds * 1e6:.0f} us")
+
+
+if __name__ == "__main__":
+    main()
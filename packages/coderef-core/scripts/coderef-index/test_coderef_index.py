@@ -0,0 +1,115 @@
+"""
+---
+related_script: scripts/coderef-index/coderef_index.py
+---
+"""
+
+import unittest
+import tempfile
+import shutil
+import os
+import json
+from pathlib import Path
+import sys
+
+# Add the script to the path so we can import it
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import coderef_index
+from coderef_index import Element, iter_elements, load_index, sidecar_path
+
+ELEMENTS = [
+    {'type': 'hook', 'name': 'useAuth', 'file': 'src/hooks/auth.ts', 'line': 3, 'exported': True,
+     'calls': ['useState'], 'imports': [{'source': 'react', 'line': 1}]},
+    {'type': 'hook', 'name': 'useAuthInternal', 'file': 'src/hooks/auth.ts', 'line': 20, 'exported': False},
+    {'type': 'function', 'name': 'useAuthHelper', 'file': 'src/hooks/auth.ts', 'line': 30, 'exported': True},
+    {'type': 'component', 'name': 'LoginForm', 'file': 'src\\components\\LoginForm.tsx', 'line': 7, 'exported': True},
+    {'type': 'method', 'name': 'render', 'file': 'src\\components\\LoginForm.tsx', 'line': 12},
+    {'type': 'hook', 'name': 'useTheme', 'file': 'src/hooks/theme.ts', 'line': 1, 'exported': True},
+]
+
+
+class TestCoderefIndex(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.project = Path(self.test_dir)
+        (self.project / '.coderef').mkdir()
+        self.index_file = self.project / '.coderef' / 'index.json'
+        self.write_index(ELEMENTS)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def write_index(self, elements):
+        data = {
+            'version': '2.0.0',
+            'projectPath': str(self.project),
+            'totalElements': len(elements),
+            'elementsByType': {},
+            'elements': elements,
+            'trailer': {'note': 'after elements'},
+        }
+        self.index_file.write_text(json.dumps(data, indent=2), encoding='utf-8')
+
+    def test_stream_matches_json_load_across_chunk_boundaries(self):
+        """Streaming with tiny chunks yields the same elements and header as json.load."""
+        original = coderef_index.CHUNK_SIZE
+        try:
+            for chunk_size in (1, 7, 64, 1 << 20):
+                coderef_index.CHUNK_SIZE = chunk_size
+                header = {}
+                elements = list(iter_elements(self.index_file, header))
+                self.assertEqual(elements, ELEMENTS)
+                self.assertEqual(header['totalElements'], len(ELEMENTS))
+                self.assertEqual(header['trailer'], {'note': 'after elements'})
+        finally:
+            coderef_index.CHUNK_SIZE = original
+
+    def test_queries(self):
+        """Name, prefix, type, file and exported filters combine."""
+        index = load_index(self.project, sidecar=False)
+        self.assertEqual(len(index), len(ELEMENTS))
+
+        hooks = index.find(type='hook', file='src/hooks/auth.ts', exported=True)
+        self.assertEqual(hooks, [Element('useAuth', 'hook', 'src/hooks/auth.ts', 3, True)])
+
+        self.assertEqual([e.name for e in index.find(prefix='useAuth')],
+                         ['useAuth', 'useAuthInternal', 'useAuthHelper'])
+        self.assertEqual([e.name for e in index.find(prefix='useAuth', exported=False)], ['useAuthInternal'])
+        self.assertEqual(index.find(name='render')[0].exported, None)
+
+        # Windows separators and absolute paths under projectPath match too
+        self.assertEqual(len(index.find(file='src/components/LoginForm.tsx')), 2)
+        self.assertEqual(len(index.find(file=str(self.project / 'src' / 'hooks' / 'theme.ts'))), 1)
+
+        self.assertEqual(index.find(name='missing'), [])
+        self.assertEqual(index.find(type='hook', limit=2), index.find(type='hook')[:2])
+        self.assertEqual(index.stats()['by_type']['hook'], 3)
+
+    def test_sidecar_is_reused_until_index_changes(self):
+        """A current sidecar skips parsing; a changed index.json is re-parsed."""
+        first = load_index(self.project)
+        self.assertTrue(sidecar_path(self.index_file).exists())
+
+        original = coderef_index.CoderefIndex.build
+        try:
+            coderef_index.CoderefIndex.build = classmethod(lambda cls, path: self.fail('re-parsed'))
+            cached = load_index(self.project)
+        finally:
+            coderef_index.CoderefIndex.build = original
+        self.assertEqual(cached.find(prefix=''), first.find(prefix=''))
+        self.assertEqual(cached.header, first.header)
+
+        self.write_index(ELEMENTS[:2])
+        os.utime(self.index_file, ns=(1, 1))
+        self.assertEqual(len(load_index(self.project)), 2)
+
+    def test_invalid_json_raises_value_error(self):
+        """Truncated files fail with ValueError naming the file."""
+        text = self.index_file.read_text(encoding='utf-8')
+        self.index_file.write_text(text[:len(text) // 2], encoding='utf-8')
+        with self.assertRaises(ValueError):
+            load_index(self.project, sidecar=False)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -29,103 +29,308 @@ Directories Created:
        - sessions/
        - reports/
 
+Layout:
+    The directory list lives in coderef-layout.json (versioned). Each set-up
+    project gets a stamp file, .coderef/layout.v<N>.stamp, listing the
+    directories it was given: a current project costs one stat, an older one
+    only gets the directories added since its stamp.
+
 Usage:
     python setup-coderef-dirs.py [project_path] [--dry-run]
+
+Bulk Usage (many projects, one aggregated status):
+    python setup-coderef-dirs.py "C:/checkouts/*" other/project [--manifest FILE] [--jobs N] [--json] [--full]
 """
 
 import sys
+import os
+import glob
+import json
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-def create_structure(project_path: str, dry_run: bool = False) -> dict:
+# Versioned layout spec: bump "version" whenever "structure" changes
+LAYOUT_SPEC = Path(__file__).parent / 'coderef-layout.json'
+
+# Stamp files live in .coderef/ and are named after the layout version
+STAMP_DIR = '.coderef'
+STAMP_PREFIX = 'layout.v'
+STAMP_SUFFIX = '.stamp'
+
+
+def load_layout(spec_path=LAYOUT_SPEC):
+    """
+    Read the layout spec.
+    Returns (version, structure) with structure as [(parent_name, subpaths_list), ...].
+    """
+    spec = json.loads(Path(spec_path).read_text(encoding='utf-8-sig'))
+    return int(spec['version']), [(parent, list(subdirs)) for parent, subdirs in spec['structure'].items()]
+
+
+LAYOUT_VERSION, STRUCTURE = load_layout()
+
+# Default worker threads for bulk mode (directory creation is I/O bound)
+DEFAULT_JOBS = 8
+
+def create_structure(project_path: str, dry_run: bool = False, full: bool = False) -> dict:
     """
     Creates the standard Coderef directory structure.
     Returns a status dict of created directories.
+    Same stamp logic as setup_project (which does the work): a project on the current
+    layout is left alone and one with an older stamp only gets the directories added
+    since, unless full is set.
     """
     project = Path(project_path).resolve()
-    
-    if not project.exists() and not dry_run:
+    status = setup_project(str(project), dry_run, full=full)
+
+    if status['layout'] == 'current':
+        print(f"[OK] Coderef layout v{LAYOUT_VERSION} already applied: {project} (--full re-checks it)")
+        return status
+    if 'Path not found' in status['errors']:
         print(f"[ERROR] Project path does not exist: {project}")
-        return {'success': False, 'created': [], 'errors': ['Path not found']}
-
-    # Define the structure
-    # tuple format: (parent_name, subpaths_list)
-    structure = [
-        ('.coderef', [
-            'reports/complexity',
-            'diagrams',
-            'exports'
-        ]),
-        ('coderef', [
-            'workorder',
-            'archived',
-            'standards',
-            'foundation-docs',
-            'documents',
-            'resource',
-            'user',
-            'notes',
-            'sessions',
-            'reports'
-        ])
-    ]
-
-    status = {'success': True, 'created': [], 'skipped': [], 'errors': []}
+        return status
 
     print(f"\nSetting up Coderef structure in: {project}")
     if dry_run:
         print("[DRY-RUN] No directories will be created.\n")
+    if status['layout'] == 'upgraded':
+        print(f"[UPGRADE] Older layout stamp: checking only directories added up to v{LAYOUT_VERSION}")
 
-    for parent, subdirs in structure:
-        parent_dir = project / parent
-        
-        # 1. Create Parent (e.g., .coderef/)
-        if dry_run:
-            print(f"[DRY-RUN] Would create: {parent_dir}")
-        else:
-            try:
-                if not parent_dir.exists():
-                    parent_dir.mkdir(parents=True, exist_ok=True)
-                    status['created'].append(str(parent_dir))
-                    print(f"[CREATE] {parent}/")
-                else:
-                    status['skipped'].append(str(parent_dir))
-                    print(f"[EXISTS] {parent}/")
-            except Exception as e:
-                status['errors'].append(str(e))
-                status['success'] = False
-                print(f"[ERROR] Could not create {parent_dir}: {e}")
-                continue
-
-        # 2. Create Subdirectories
-        for sub in subdirs:
-            target = parent_dir / sub
+    created, skipped = set(status['created']), set(status['skipped'])
+    for rel_path in leaf_dirs():
+        if rel_path in created:
+            print(f"  [DRY-RUN] Would create: {rel_path}/" if dry_run else f"  [CREATE] {rel_path}/")
+        elif rel_path in skipped:
+            print(f"  [EXISTS] {rel_path}/")
+    for error in status['errors']:
+        print(f"  [ERROR] {error}")
+
+    return status
+
+
+# ========== LAYOUT STAMPS ==========
+
+def stamp_path(project: str, version: int) -> str:
+    return os.path.join(project, STAMP_DIR, f"{STAMP_PREFIX}{version}{STAMP_SUFFIX}")
+
+
+def layout_is_current(project: str, version: int = LAYOUT_VERSION) -> bool:
+    """True if the project carries the stamp of this layout version (one stat)"""
+    return os.path.exists(stamp_path(project, version))
+
+
+def read_latest_stamp(project: str):
+    """(version, directories) from the newest stamp in the project, or None"""
+    try:
+        names = os.listdir(os.path.join(project, STAMP_DIR))
+    except OSError:
+        return None
+
+    versions = []
+    for name in names:
+        number = name[len(STAMP_PREFIX):-len(STAMP_SUFFIX)]
+        if name.startswith(STAMP_PREFIX) and name.endswith(STAMP_SUFFIX) and number.isdigit():
+            versions.append(int(number))
+
+    for version in sorted(versions, reverse=True):
+        try:
+            with open(stamp_path(project, version), encoding='utf-8') as f:
+                return version, json.load(f)['directories']
+        except (OSError, ValueError, KeyError):
+            continue
+    return None
+
+
+def write_stamp(project: str, version: int, directories: list):
+    """Record the applied layout and remove stamps of other versions"""
+    path = stamp_path(project, version)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': version, 'directories': directories}, f, indent=2)
+    os.replace(tmp_path, path)
+
+    for name in os.listdir(os.path.dirname(path)):
+        if name.startswith(STAMP_PREFIX) and name.endswith(STAMP_SUFFIX) and name != os.path.basename(path):
+            os.remove(os.path.join(os.path.dirname(path), name))
+
+
+# ========== BULK MODE ==========
+
+def leaf_dirs(structure=STRUCTURE) -> list:
+    """Relative leaf directories; creating a leaf creates its parents too"""
+    return [f"{parent}/{sub}" for parent, subdirs in structure for sub in subdirs]
+
+
+def ensure_dir(target: str) -> bool:
+    """
+    Create target (and any missing parents) with no separate exists() check.
+    Returns True if it was created, False if it already existed.
+    """
+    try:
+        os.mkdir(target)
+        return True
+    except FileExistsError:
+        if not os.path.isdir(target):
+            raise
+        return False
+    except FileNotFoundError:
+        # Parent missing (fresh project): build the whole chain in one call
+        os.makedirs(target, exist_ok=True)
+        return True
+
+
+def setup_project(project_path: str, dry_run: bool = False, leaves: list = None,
+                  version: int = None, full: bool = False) -> dict:
+    """
+    Quiet, stamp-aware single-project setup (bulk mode, dashboard project open).
+    Same status shape as create_structure, reported per leaf directory, plus
+    'layout': 'current' (stamp matches, nothing checked), 'upgraded' (only
+    directories added since the old stamp were checked) or 'applied' (full check).
+    """
+    project = os.path.abspath(project_path)
+    leaves = leaves or leaf_dirs()
+    version = LAYOUT_VERSION if version is None else version
+    status = {'project': project, 'success': True, 'layout': 'applied',
+              'created': [], 'skipped': [], 'errors': []}
+
+    # Fast path: one stat for a project already on this layout version
+    if not full and layout_is_current(project, version):
+        status['layout'] = 'current'
+        return status
+
+    if not os.path.isdir(project):
+        status['success'] = False
+        status['errors'].append('Path not found')
+        return status
+
+    todo = leaves
+    stamp = None if full else read_latest_stamp(project)
+    if stamp:
+        already = set(stamp[1])
+        todo = [rel_path for rel_path in leaves if rel_path not in already]
+        status['layout'] = 'upgraded'
+
+    for rel_path in todo:
+        target = os.path.join(project, *rel_path.split('/'))
+        try:
             if dry_run:
-                print(f"  [DRY-RUN] Would create: {target}")
+                created = not os.path.isdir(target)
             else:
-                try:
-                    if not target.exists():
-                        target.mkdir(parents=True, exist_ok=True)
-                        status['created'].append(str(target))
-                        print(f"  [CREATE] {parent}/{sub}/")
-                    else:
-                        status['skipped'].append(str(target))
-                        print(f"  [EXISTS] {parent}/{sub}/")
-                except Exception as e:
-                    status['errors'].append(str(e))
-                    status['success'] = False
-                    print(f"  [ERROR] Could not create {target}: {e}")
+                created = ensure_dir(target)
+        except OSError as e:
+            status['success'] = False
+            status['errors'].append(f"{rel_path}: {e}")
+            continue
+        status['created' if created else 'skipped'].append(rel_path)
+
+    if status['success'] and not dry_run:
+        try:
+            write_stamp(project, version, leaves)
+        except OSError as e:
+            status['success'] = False
+            status['errors'].append(f"stamp: {e}")
 
     return status
 
+
+def expand_project_paths(patterns: list, manifest: str = None) -> list:
+    """
+    Project roots from paths/glob patterns and an optional manifest file
+    (one path or pattern per line, '#' comments, or a JSON list).
+    Order is preserved and duplicates are dropped.
+    """
+    entries = list(patterns)
+    if manifest:
+        text = Path(manifest).read_text(encoding='utf-8-sig')
+        if manifest.endswith('.json'):
+            entries.extend(json.loads(text))
+        else:
+            entries.extend(line.strip() for line in text.splitlines()
+                           if line.strip() and not line.strip().startswith('#'))
+
+    projects = []
+    seen = set()
+    for entry in entries:
+        # Literal paths pass through even if missing, so they are reported as errors
+        matches = sorted(glob.glob(entry)) if glob.has_magic(entry) else [entry]
+        for match in matches:
+            key = os.path.normcase(os.path.abspath(match))
+            if key not in seen:
+                seen.add(key)
+                projects.append(match)
+    return projects
+
+
+def create_structures(project_paths: list, dry_run: bool = False, jobs: int = DEFAULT_JOBS,
+                      verbose: bool = False, full: bool = False) -> dict:
+    """
+    Bulk setup: run setup_project for every project on a thread pool.
+    Returns an aggregated, JSON-serializable status; per-project results keep input order.
+    """
+    leaves = leaf_dirs()
+
+    def run(path):
+        return setup_project(path, dry_run, leaves, LAYOUT_VERSION, full)
+
+    if jobs <= 1 or len(project_paths) <= 1:
+        results = [run(path) for path in project_paths]
+    else:
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(run, project_paths))
+
+    summary = {
+        'success': all(r['success'] for r in results),
+        'dry_run': dry_run,
+        'projects': len(results),
+        'failed': sum(1 for r in results if not r['success']),
+        'created': sum(len(r['created']) for r in results),
+        'skipped': sum(len(r['skipped']) for r in results),
+        'current': sum(1 for r in results if r['layout'] == 'current'),
+        'layout_version': LAYOUT_VERSION,
+        'results': results,
+    }
+
+    if verbose:
+        for r in results:
+            tag = 'OK' if r['success'] else 'ERROR'
+            print(f"[{tag}] {r['project']} ({r['layout']}): {len(r['created'])} created, "
+                  f"{len(r['skipped'])} existing")
+            for error in r['errors']:
+                print(f"  [ERROR] {error}")
+
+    return summary
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Initialize Coderef directory structure')
-    parser.add_argument('project_path', nargs='?', default='.', help='Project root directory')
+    parser.add_argument('project_path', nargs='*', default=[],
+                        help='Project root directory; several paths or glob patterns run in bulk mode')
     parser.add_argument('--dry-run', action='store_true', help='Simulate without creating directories')
-    
+    parser.add_argument('--manifest', help='File listing project roots (one per line, or a JSON list)')
+    parser.add_argument('--jobs', '-j', type=int, default=DEFAULT_JOBS,
+                        help=f'Worker threads in bulk mode (default: {DEFAULT_JOBS})')
+    parser.add_argument('--json', action='store_true', help='Bulk mode: print the full status as JSON')
+    parser.add_argument('--verbose', '-v', action='store_true', help='Bulk mode: one line per project')
+    parser.add_argument('--full', action='store_true',
+                        help='Ignore layout stamps and re-check every directory')
+
     args = parser.parse_args()
-    
-    result = create_structure(args.project_path, args.dry_run)
-    
+
+    bulk = (args.manifest or len(args.project_path) > 1
+            or any(glob.has_magic(p) for p in args.project_path))
+
+    if not bulk:
+        result = create_structure(args.project_path[0] if args.project_path else '.', args.dry_run, args.full)
+    else:
+        projects = expand_project_paths(args.project_path, args.manifest)
+        result = create_structures(projects, args.dry_run, args.jobs, args.verbose, args.full)
+        if args.json:
+            print(json.dumps(result, indent=2))
+        else:
+            print(f"{result['projects']} projects (layout v{result['layout_version']}, "
+                  f"{result['current']} already current): {result['created']} directories created, "
+                  f"{result['skipped']} existing, {result['failed']} failed")
+
     if not result['success']:
         sys.exit(1)
@@ -9,12 +9,15 @@ import unittest
 import tempfile
 import shutil
 import os
+import subprocess
 from pathlib import Path
 import sys
 
 # Add the script to the path so we can import it
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-from setup_coderef_dirs import create_structure
+import json
+from setup_coderef_dirs import (LAYOUT_VERSION, create_structure, create_structures, expand_project_paths,
+                                leaf_dirs, setup_project, stamp_path, write_stamp)
 
 class TestSetupCoderefDirs(unittest.TestCase):
     def setUp(self):
@@ -73,9 +76,115 @@ class TestSetupCoderefDirs(unittest.TestCase):
         # Second run
         result2 = create_structure(str(self.project_path), dry_run=False)
         self.assertTrue(result2['success'])
-        
-        # Should have skipped everything the second time
-        self.assertTrue(len(result2['skipped']) > 0)
+
+        # The stamp short-circuits the second run: nothing is checked or created
+        self.assertEqual(result2['layout'], 'current')
+        self.assertEqual(result2['created'] + result2['skipped'], [])
+
+        # A full re-check finds everything already there
+        result3 = create_structure(str(self.project_path), dry_run=False, full=True)
+        self.assertTrue(result3['success'])
+        self.assertEqual(result3['created'], [])
+        self.assertTrue(len(result3['skipped']) > 0)
+
+    def test_bulk_creates_all_projects(self):
+        """Test that bulk mode sets up every project and reports missing ones."""
+        projects = [self.project_path / f'project{i}' for i in range(3)]
+        for project in projects:
+            project.mkdir()
+        missing = self.project_path / 'missing'
+
+        result = create_structures([str(p) for p in projects] + [str(missing)], jobs=4)
+
+        self.assertFalse(result['success'])
+        self.assertEqual(result['projects'], 4)
+        self.assertEqual(result['failed'], 1)
+        self.assertEqual(result['created'], 3 * len(leaf_dirs()))
+        self.assertEqual(result['results'][3]['errors'], ['Path not found'])
+        for project in projects:
+            for rel_path in leaf_dirs():
+                self.assertTrue((project / rel_path).is_dir(), f"Expected {rel_path} in {project}")
+
+        # Second run: every project is stamped current, nothing is re-checked
+        result2 = create_structures([str(p) for p in projects], jobs=4)
+        self.assertTrue(result2['success'])
+        self.assertEqual(result2['current'], 3)
+        self.assertEqual(result2['created'], 0)
+
+        # Full re-check: everything already exists
+        result3 = create_structures([str(p) for p in projects], jobs=4, full=True)
+        self.assertEqual(result3['skipped'], 3 * len(leaf_dirs()))
+
+    def test_expand_project_paths_glob_and_manifest(self):
+        """Test that globs and manifest entries expand in order without duplicates."""
+        for name in ('a', 'b'):
+            (self.project_path / name).mkdir()
+        manifest = self.project_path / 'projects.txt'
+        manifest.write_text(f"# checkouts\n{self.project_path / 'b'}\n{self.project_path / 'c'}\n",
+                            encoding='utf-8')
+
+        projects = expand_project_paths([str(self.project_path / '[ab]')], str(manifest))
+
+        self.assertEqual([Path(p).name for p in projects], ['a', 'b', 'c'])
+
+    def test_stamp_makes_current_project_a_no_op(self):
+        """Test that a stamped project is recognised without checking its directories."""
+        create_structure(str(self.project_path))
+        self.assertTrue(os.path.exists(stamp_path(str(self.project_path), LAYOUT_VERSION)))
+
+        # Even a deleted directory is left alone while the stamp is current...
+        (self.project_path / 'coderef' / 'notes').rmdir()
+        result = setup_project(str(self.project_path))
+        self.assertTrue(result['success'])
+        self.assertEqual(result['layout'], 'current')
+        self.assertEqual(result['created'] + result['skipped'], [])
+
+        # ...and restored by a full re-check
+        result = setup_project(str(self.project_path), full=True)
+        self.assertEqual(result['layout'], 'applied')
+        self.assertEqual(result['created'], ['coderef/notes'])
+
+    def test_upgrade_applies_only_new_directories(self):
+        """Test that an older stamp only gets the directories missing from it."""
+        leaves = leaf_dirs()
+        old_leaves = leaves[:-2]
+        setup_project(str(self.project_path), leaves=old_leaves, version=LAYOUT_VERSION)
+        old_stamp = Path(stamp_path(str(self.project_path), LAYOUT_VERSION))
+        old_stamp.rename(stamp_path(str(self.project_path), 0))
+
+        result = setup_project(str(self.project_path), leaves=leaves, version=LAYOUT_VERSION)
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['layout'], 'upgraded')
+        self.assertEqual(result['created'], leaves[-2:])
+        self.assertEqual(result['skipped'], [])
+        self.assertFalse(os.path.exists(stamp_path(str(self.project_path), 0)))
+        with open(stamp_path(str(self.project_path), LAYOUT_VERSION), encoding='utf-8') as f:
+            self.assertEqual(json.load(f)['directories'], leaves)
+    def test_cli_upgrades_an_older_stamp(self):
+        """Test that the single-project CLI applies only the directories added since an older stamp."""
+        leaves = leaf_dirs()
+        for rel_path in leaves[:-2]:
+            (self.project_path / rel_path).mkdir(parents=True)
+        write_stamp(str(self.project_path), LAYOUT_VERSION - 1, leaves[:-2])
+        (self.project_path / 'coderef' / 'notes').rmdir()
+
+        script = Path(__file__).parent / 'setup_coderef_dirs.py'
+        run = subprocess.run([sys.executable, str(script), str(self.project_path)],
+                             capture_output=True, text=True)
+
+        self.assertEqual(run.returncode, 0, run.stderr)
+        self.assertIn('[UPGRADE]', run.stdout)
+        self.assertEqual([line.split()[-1] for line in run.stdout.splitlines() if '[CREATE]' in line],
+                         [f'{rel_path}/' for rel_path in leaves[-2:]])
+        # Directories from the old stamp are trusted, not re-checked
+        self.assertFalse((self.project_path / 'coderef' / 'notes').exists())
+        self.assertFalse(os.path.exists(stamp_path(str(self.project_path), LAYOUT_VERSION - 1)))
+        with open(stamp_path(str(self.project_path), LAYOUT_VERSION), encoding='utf-8') as f:
+            self.assertEqual(json.load(f)['directories'], leaves)
+
+        result = create_structure(str(self.project_path))
+        self.assertEqual(result['layout'], 'current')
 
 if __name__ == '__main__':
     unittest.main()
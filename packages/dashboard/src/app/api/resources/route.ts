@@ -1,6 +1,8 @@
-import { NextResponse } from 'next/server';
-import { readFileSync } from 'fs';
+import { NextRequest, NextResponse } from 'next/server';
+import { createHash } from 'crypto';
+import { existsSync, readFileSync, statSync } from 'fs';
 import { join } from 'path';
+import { gunzipSync } from 'zlib';
 import { parse } from 'csv-parse/sync';
 
 export interface Resource {
@@ -15,7 +17,57 @@ export interface Resource {
   LastUpdated: string;
 }
 
-export async function GET() {
+// SHA-256 of the CSV, recomputed only when its mtime or size changes
+let csvHashCache: { key: string; sha256: string } | null = null;
+
+function csvSha256(csvPath: string): string {
+  const stat = statSync(csvPath);
+  const key = `${csvPath}:${stat.mtimeMs}:${stat.size}`;
+  if (!csvHashCache || csvHashCache.key !== key) {
+    csvHashCache = { key, sha256: createHash('sha256').update(readFileSync(csvPath)).digest('hex') };
+  }
+  return csvHashCache.sha256;
+}
+
+/**
+ * Serve the pre-serialized snapshot written by the Python pipeline
+ * (tools-and-commands.json.gz + .sha256 sidecar) without parsing the CSV.
+ * The sidecar holds the content hash (ETag) and the SHA-256 of the CSV the
+ * snapshot was built from; returns null when there is no snapshot or the CSV
+ * no longer matches it.
+ */
+function serveSnapshot(request: NextRequest, csvPath: string): NextResponse | null {
+  const snapshotPath = csvPath.replace(/\.csv$/, '.json.gz');
+  const hashPath = `${snapshotPath}.sha256`;
+  if (!existsSync(snapshotPath) || !existsSync(hashPath)) {
+    return null;
+  }
+  const [contentHash, sourceHash] = readFileSync(hashPath, 'utf-8').split(/\s+/);
+  if (!sourceHash || sourceHash !== csvSha256(csvPath)) {
+    return null;
+  }
+
+  const etag = `"${contentHash}"`;
+  const headers = {
+    'ETag': etag,
+    'Cache-Control': 'no-cache',
+    'Content-Type': 'application/json; charset=utf-8',
+    // The body is gzip or identity depending on Accept-Encoding: caches must key on it
+    'Vary': 'Accept-Encoding',
+  };
+
+  if (request.headers.get('if-none-match') === etag) {
+    return new NextResponse(null, { status: 304, headers });
+  }
+
+  const body = readFileSync(snapshotPath);
+  if ((request.headers.get('accept-encoding') || '').includes('gzip')) {
+    return new NextResponse(new Uint8Array(body), { headers: { ...headers, 'Content-Encoding': 'gzip' } });
+  }
+  return new NextResponse(new Uint8Array(gunzipSync(body)), { headers });
+}
+
+export async function GET(request: NextRequest) {
   try {
     // Path to CSV file - adjust for monorepo structure
     // In dev: cwd is the monorepo root
@@ -23,12 +75,17 @@ export async function GET() {
     let csvPath = join(process.cwd(), 'packages', 'dashboard', 'src', 'app', 'resources', 'coderef', 'tools-and-commands.csv');
 
     // Check if path exists, if not try relative path from src directory
-    const { existsSync } = await import('fs');
     if (!existsSync(csvPath)) {
       // Try from dashboard package root
       csvPath = join(process.cwd(), 'src', 'app', 'resources', 'coderef', 'tools-and-commands.csv');
     }
 
+    // Fast path: stream the precomputed snapshot as-is
+    const snapshot = serveSnapshot(request, csvPath);
+    if (snapshot) {
+      return snapshot;
+    }
+
     // Read and parse CSV
     const csvContent = readFileSync(csvPath, 'utf-8');
     const resources: Resource[] = parse(csvContent, {
@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+"""
+Benchmark the resource catalog pipeline
+Generates a synthetic ecosystem, times every scanner stage, the merge and the
+validation, records peak memory, and compares against a stored baseline
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Shared pipeline modules live next to this script
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from catalog_db import write_catalog_db
+from catalog_io import iter_catalog, write_sorted_csv
+from catalog_rules import select_rules
+from catalog_search import SearchIndex
+from catalog_snapshot import write_snapshot
+
+RESOURCES_DIR = Path(__file__).parent
+RESULTS_JSON = RESOURCES_DIR / ".coderef" / "benchmark-results.json"
+
+# Server names the tool scanner knows about (it looks for these directories)
+MCP_SERVER_NAMES = ['coderef-context', 'coderef-docs', 'coderef-personas',
+                    'coderef-workflow', 'coderef-testing', 'papertrail']
+COMMAND_SERVERS = ['coderef-workflow', 'coderef-docs', 'coderef-personas', 'coderef-testing']
+
+# Scanner stages in pipeline order: (stage name, task builder method)
+SCANNER_STAGES = [
+    ('tools', 'mcp_tool_tasks'),
+    ('commands', 'slash_command_tasks'),
+    ('scripts', 'script_tasks'),
+    ('validators', 'validator_tasks'),
+    ('schemas', 'schema_tasks'),
+    ('resource_sheets', 'resource_sheet_tasks'),
+    ('tabs', 'dashboard_tab_tasks'),
+]
+
+# Stages faster than this are reported but never flagged as regressions (timer noise)
+MIN_COMPARABLE_SECONDS = 0.01
+
+
+def load_pipeline_script(filename: str):
+    """Import a sibling pipeline script (hyphenated names are not importable directly)"""
+    spec = importlib.util.spec_from_file_location(filename[:-3].replace('-', '_'), RESOURCES_DIR / filename)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# ========== SYNTHETIC ECOSYSTEM ==========
+
+def _write(path: Path, text: str):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding='utf-8')
+
+
+def _git(repo: Path, *args: str):
+    subprocess.run(['git', '-c', 'user.name=bench', '-c', 'user.email=bench@example.com', *args],
+                   cwd=repo, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def generate_ecosystem(root: Path, params: Dict[str, int], seed: int = 1) -> Dict[str, Path]:
+    """
+    Write a synthetic ecosystem under root and return its scan roots by name.
+    Counts come from params: servers, tools, commands, scripts, schemas,
+    validators, sheets and git_commits (0 = no git repositories).
+    """
+    rng = random.Random(seed)
+    roots = {
+        'MCP_SERVERS': root / 'mcp-servers',
+        'ASSISTANT': root / 'assistant',
+        'DASHBOARD': root / 'coderef-dashboard',
+        'CODEREF_SYSTEM': root / 'coderef-system',
+        'CLAUDE_COMMANDS': root / 'claude' / 'commands',
+    }
+    mcp = roots['MCP_SERVERS']
+
+    # MCP servers with Tool(...) definitions
+    servers = MCP_SERVER_NAMES[:max(1, min(params['servers'], len(MCP_SERVER_NAMES)))]
+    for server in servers:
+        module = server.replace('-', '_')
+        tools = '\n'.join(
+            f'    Tool(\n        name="{module}_tool_{i}",\n'
+            f'        description="Tool {i} of {server}: does thing {rng.randint(0, 999)}",\n'
+            f'        inputSchema={{"type": "object"}}\n    ),'
+            for i in range(params['tools'])
+        )
+        _write(mcp / server / 'server.py', f'"""{server} MCP server"""\nfrom mcp.types import Tool\n\nTOOLS = [\n{tools}\n]\n')
+
+    # Slash commands spread over every command directory
+    command_dirs = [roots['CLAUDE_COMMANDS'], roots['DASHBOARD'] / '.claude' / 'commands']
+    command_dirs += [mcp / server / '.claude' / 'commands' for server in COMMAND_SERVERS]
+    for i in range(params['commands']):
+        cmd_dir = command_dirs[i % len(command_dirs)]
+        _write(cmd_dir / f'command-{i}.md',
+               f'---\ndescription: **Command** {i} for the synthetic ecosystem\n---\n\n# Command {i}\n\nBody text.\n')
+
+    # Scripts, nested a few levels deep, plus pruned junk
+    script_dirs = [roots['ASSISTANT'] / 'scripts', roots['CODEREF_SYSTEM'] / 'scripts',
+                   mcp / 'coderef-workflow' / 'generators', mcp / 'coderef-docs' / 'generators',
+                   mcp / 'papertrail' / 'scripts']
+    for i in range(params['scripts']):
+        if i % 4 == 0:
+            base = roots['CODEREF_SYSTEM'] / 'packages' / f'pkg{i % 20}' / 'src'
+        else:
+            base = script_dirs[i % len(script_dirs)] / f'group{i % 7}'
+        prefix = ['generate', 'validate', 'scan', 'export', 'util'][i % 5]
+        body = f'"""{prefix.capitalize()} helper {i}"""\n' if i % 3 else f'# {prefix} helper {i}\nimport os\n'
+        _write(base / f'{prefix}_{i}.py', body + 'def main():\n    return 0\n')
+    for i in range(min(20, params['scripts'])):
+        _write(roots['CODEREF_SYSTEM'] / 'packages' / f'pkg{i}' / 'node_modules' / 'dep' / 'index.py', 'x = 1\n')
+
+    # Schemas and validators (papertrail)
+    for i in range(params['schemas']):
+        _write(mcp / 'papertrail' / 'schemas' / f'group{i % 5}' / f'doc{i}-schema.json',
+               json.dumps({'description': f'Schema {i}', 'type': 'object'}))
+    for i in range(params['validators']):
+        _write(mcp / 'papertrail' / 'papertrail' / 'validators' / f'kind_{i}.py',
+               f'class Kind{i}Validator:\n    """Validates kind {i}"""\n\n\nclass Extra{i}Validator:\n    pass\n')
+
+    # Resource sheets
+    sheet_dirs = [roots['DASHBOARD'] / 'coderef' / 'resources-sheets' / 'components',
+                  roots['DASHBOARD'] / 'coderef' / 'resources-sheets' / 'systems',
+                  roots['ASSISTANT'] / 'coderef' / 'analysis',
+                  mcp / 'coderef-workflow' / 'coderef' / 'api']
+    for i in range(params['sheets']):
+        _write(sheet_dirs[i % len(sheet_dirs)] / f'Thing{i}-RESOURCE-SHEET.md',
+               f'---\nsubject: Thing {i}\ndescription: Synthetic resource sheet {i}\n---\n\n# Thing {i}\n')
+
+    _write(roots['DASHBOARD'] / 'packages' / 'dashboard' / 'src' / 'app' / 'resources' / 'page.tsx',
+           'export default function Page() { return null; }\n')
+
+    # Optional git history: one repository per root, extra commits touch random files
+    if params['git_commits'] > 0:
+        for name in ('MCP_SERVERS', 'ASSISTANT', 'DASHBOARD', 'CODEREF_SYSTEM'):
+            repo = roots[name]
+            _git(repo, 'init', '-q')
+            _git(repo, 'add', '-A')
+            _git(repo, 'commit', '-qm', 'initial')
+            files = [p for p in repo.rglob('*') if p.is_file() and '.git' not in p.parts]
+            for commit in range(params['git_commits'] - 1):
+                for path in rng.sample(files, min(len(files), 5)):
+                    with open(path, 'a', encoding='utf-8') as f:
+                        f.write('\n' if path.suffix != '.json' else ' ')
+                _git(repo, 'commit', '-qam', f'change {commit}')
+
+    return roots
+
+
+def write_scan_config(roots: Dict[str, Path], config_path: Path):
+    """Scan config pointing every root at the synthetic ecosystem"""
+    config = {'version': 1, 'roots': [{'name': name, 'path': str(path)} for name, path in roots.items()]}
+    _write(config_path, json.dumps(config, indent=2))
+
+
+# ========== STAGES ==========
+
+class StageTimer:
+    """Times named stages of one pipeline run; optionally tracks peak traced memory"""
+
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self.seconds: Dict[str, float] = {}
+        self.peak_kib: Dict[str, int] = {}
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] = time.perf_counter() - start
+            if self.trace_memory:
+                self.peak_kib[name] = tracemalloc.get_traced_memory()[1] // 1024
+
+
+def run_pipeline(bsot, merge, validate, roots_config: Path, work: Path, jobs: int,
+                 timer: StageTimer) -> Dict[str, int]:
+    """One full pipeline run, stage by stage; returns row counts"""
+    roots = bsot.load_scan_config(roots_config)
+    scanned_csv = work / 'scanned.csv'
+    final_csv = work / 'final.csv'
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        scanner = bsot.ResourceScanner(jobs=jobs, roots=roots)
+        scanner.verbose = False
+
+        with timer.stage('discovery'):
+            scanner.discover()
+
+        with timer.stage('git-index'):
+            for root in roots.values():
+                scanner.git_index.lookup(root.path / '.benchmark-probe')
+
+        rows = []
+        for name, builder in SCANNER_STAGES:
+            with timer.stage(f'scan:{name}'):
+                rows.extend(scanner.run_tasks(getattr(scanner, builder)()))
+        rows.extend(scanner.workflow_rows())
+        rows.extend(scanner.output_format_rows())
+
+        with timer.stage('write-csv'):
+            scanned_rows, _ = write_sorted_csv(rows, scanned_csv)
+
+        # End-to-end scans through the persistent cache: first run fills it, second hits it
+        cache_path = work / 'scan-cache.json'
+        workorder_index = work / 'workorder-index.json'
+        for path in (cache_path, workorder_index):
+            if path.exists():
+                path.unlink()
+        for stage in ('scan:cache-cold', 'scan:cache-warm'):
+            cache = bsot.ScanCache(cache_path)
+            cache.load()
+            with timer.stage(stage):
+                bsot.ResourceScanner(jobs=jobs, cache=cache, roots=roots,
+                                     workorder_index=workorder_index).scan_to_csv(work / 'cached.csv')
+
+        merge.SCANNED_CSV = scanned_csv
+        merge.OLD_CSV = scanned_csv
+        with timer.stage('merge'):
+            final_rows = merge.merge_csvs(final_csv, report_path=None)
+
+        with timer.stage('sqlite'):
+            write_catalog_db(iter_catalog(final_csv), work / 'final.db')
+
+        with timer.stage('snapshot'):
+            write_snapshot(iter_catalog(final_csv), work / 'final.json.gz')
+
+        with timer.stage('search-index'):
+            SearchIndex.build(iter_catalog(final_csv)).save(work / 'final.search.idx')
+
+        with timer.stage('validate'):
+            validate.collect_stats(final_csv, select_rules(), max(jobs, 1))
+
+    return {'scanned_rows': scanned_rows, 'final_rows': final_rows}
+
+
+def run_benchmark(params: Dict[str, int], jobs: int, repeat: int, workdir: Path,
+                  measure_memory: bool = True) -> Dict:
+    """Generate the ecosystem once, run the pipeline repeat times, collect results"""
+    bsot = load_pipeline_script('build-source-of-truth.py')
+    merge = load_pipeline_script('merge-and-dedupe.py')
+    validate = load_pipeline_script('validate-csv.py')
+
+    start = time.perf_counter()
+    roots = generate_ecosystem(workdir / 'ecosystem', params)
+    generate_seconds = time.perf_counter() - start
+    config_path = workdir / 'scan-config.json'
+    write_scan_config(roots, config_path)
+
+    runs: List[StageTimer] = []
+    counts: Dict[str, int] = {}
+    for i in range(repeat):
+        run_dir = workdir / f'run{i}'
+        run_dir.mkdir()
+        timer = StageTimer()
+        counts = run_pipeline(bsot, merge, validate, config_path, run_dir, jobs, timer)
+        runs.append(timer)
+
+    peaks: Dict[str, int] = {}
+    if measure_memory:
+        timer = StageTimer(trace_memory=True)
+        (workdir / 'memory').mkdir()
+        tracemalloc.start()
+        try:
+            run_pipeline(bsot, merge, validate, config_path, workdir / 'memory', jobs, timer)
+        finally:
+            tracemalloc.stop()
+        peaks = timer.peak_kib
+
+    stages = {}
+    for name in runs[0].seconds:
+        samples = [run.seconds[name] for run in runs]
+        stages[name] = {
+            'seconds': min(samples),
+            'median': statistics.median(samples),
+            'runs': [round(sample, 6) for sample in samples],
+        }
+        if name in peaks:
+            stages[name]['peak_kib'] = peaks[name]
+
+    scan_stages = ['discovery', 'git-index'] + [f'scan:{name}' for name, _ in SCANNER_STAGES] + ['write-csv']
+    stages['scan:total'] = {'seconds': sum(stages[name]['seconds'] for name in scan_stages)}
+
+    max_rss_kib = None
+    try:
+        import resource
+        max_rss_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform == 'darwin':
+            max_rss_kib //= 1024
+    except ImportError:
+        pass
+
+    return {
+        'meta': {
+            'created': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'params': params,
+            'jobs': jobs,
+            'repeat': repeat,
+            'generate_seconds': round(generate_seconds, 3),
+            'max_rss_kib': max_rss_kib,
+            **counts,
+        },
+        'stages': stages,
+    }
+
+
+# ========== BASELINE COMPARISON ==========
+
+def compare(results: Dict, baseline: Dict, threshold: float) -> List[Tuple[str, float, float, float, str]]:
+    """(stage, baseline seconds, current seconds, ratio, status) for stages in both runs"""
+    rows = []
+    for name, stage in results['stages'].items():
+        base = baseline.get('stages', {}).get(name)
+        if base is None:
+            continue
+        before, after = base['seconds'], stage['seconds']
+        ratio = after / before if before > 0 else 1.0
+        if max(before, after) < MIN_COMPARABLE_SECONDS:
+            status = 'noise'
+        elif ratio > threshold:
+            status = 'SLOWER'
+        elif ratio < 1 / threshold:
+            status = 'faster'
+        else:
+            status = 'same'
+        rows.append((name, before, after, ratio, status))
+    return rows
+
+
+def print_results(results: Dict, comparison: Optional[List] = None):
+    meta = results['meta']
+    print("=" * 60)
+    print("PIPELINE BENCHMARK")
+    print("=" * 60)
+    print(f"Params: {meta['params']}  jobs={meta['jobs']}  repeat={meta['repeat']}")
+    print(f"Rows: {meta.get('scanned_rows')} scanned, {meta.get('final_rows')} merged")
+    print(f"\n  {'Stage':22} {'Best (s)':>10} {'Median (s)':>11} {'Peak KiB':>10}")
+    for name, stage in results['stages'].items():
+        median = f"{stage['median']:.4f}" if 'median' in stage else ''
+        peak = stage.get('peak_kib', '')
+        print(f"  {name:22} {stage['seconds']:10.4f} {median:>11} {peak:>10}")
+    if meta.get('max_rss_kib'):
+        print(f"\nProcess peak RSS: {meta['max_rss_kib']} KiB")
+
+    if comparison is not None:
+        print(f"\n  {'Stage':22} {'Baseline':>10} {'Now':>10} {'Ratio':>7}")
+        for name, before, after, ratio, status in comparison:
+            print(f"  {name:22} {before:10.4f} {after:10.4f} {ratio:7.2f}  {status}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark scan, merge and validation on a synthetic ecosystem')
+    parser.add_argument('--servers', type=int, default=6, help=f'MCP servers (max {len(MCP_SERVER_NAMES)})')
+    parser.add_argument('--tools', type=int, default=50, help='Tools per server')
+    parser.add_argument('--commands', type=int, default=2000, help='Slash command .md files')
+    parser.add_argument('--scripts', type=int, default=1000, help='Python scripts')
+    parser.add_argument('--schemas', type=int, default=200, help='JSON schemas')
+    parser.add_argument('--validators', type=int, default=50, help='Validator modules (2 classes each)')
+    parser.add_argument('--sheets', type=int, default=300, help='Resource sheets')
+    parser.add_argument('--git-commits', type=int, default=0,
+                        help='Commits of history per repository (default: 0, no git)')
+    parser.add_argument('--jobs', '-j', type=int, default=1, help='Scanner workers (default: 1)')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per stage; best is reported')
+    parser.add_argument('--no-memory', action='store_true', help='Skip the tracemalloc run')
+    parser.add_argument('--workdir', type=Path, default=None, help='Keep the ecosystem and outputs here')
+    parser.add_argument('--output', type=Path, default=RESULTS_JSON, help='Results JSON')
+    parser.add_argument('--baseline', type=Path, default=None, help='Compare against this results JSON')
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help='Slowdown ratio flagged as a regression (default: 1.2)')
+    parser.add_argument('--fail-on-regression', action='store_true', help='Exit 1 if any stage regressed')
+    args = parser.parse_args()
+
+    params = {
+        'servers': args.servers, 'tools': args.tools, 'commands': args.commands, 'scripts': args.scripts,
+        'schemas': args.schemas, 'validators': args.validators, 'sheets': args.sheets,
+        'git_commits': args.git_commits,
+    }
+
+    if args.workdir:
+        if args.workdir.exists() and any(args.workdir.iterdir()):
+            parser.error(f"--workdir must be empty or missing: {args.workdir}")
+        args.workdir.mkdir(parents=True, exist_ok=True)
+        workdir = args.workdir
+    else:
+        workdir = Path(tempfile.mkdtemp(prefix='coderef-bench-'))
+
+    try:
+        results = run_benchmark(params, args.jobs, max(1, args.repeat), workdir, not args.no_memory)
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    comparison = None
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        base_meta = baseline.get('meta', {})
+        if (base_meta.get('params'), base_meta.get('jobs')) != (params, args.jobs):
+            print(f"[WARN] Baseline was recorded with different settings: "
+                  f"{base_meta.get('params')} jobs={base_meta.get('jobs')}")
+        comparison = compare(results, baseline, args.threshold)
+        results['comparison'] = {
+            'baseline': str(args.baseline),
+            'threshold': args.threshold,
+            'stages': {name: {'baseline': before, 'now': after, 'ratio': round(ratio, 3), 'status': status}
+                       for name, before, after, ratio, status in comparison},
+        }
+
+    print_results(results, comparison)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n[OK] Results written to: {args.output}")
+
+    if args.fail_on_regression and comparison and any(row[4] == 'SLOWER' for row in comparison):
+        print("[ERROR] Regression against baseline")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
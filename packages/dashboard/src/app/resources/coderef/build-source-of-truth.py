@@ -4,16 +4,37 @@ Build Single Source of Truth CSV
 Comprehensive scan of entire CodeRef ecosystem
 """
 
+import argparse
 import ast
-import csv
+import fnmatch
+import hashlib
+import importlib.util
 import json
+import os
 import re
 import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from pathlib import Path
-from typing import List, Tuple, Dict, Optional
+from typing import Any, Callable, FrozenSet, Iterable, Iterator, List, NamedTuple, Tuple, Dict, Optional
 from datetime import datetime
 
-# Base paths
+# Shared pipeline modules live next to this script
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from catalog_db import catalog_db_path, write_catalog_db
+from catalog_delta import catalog_delta_path
+from catalog_io import Resource, iter_catalog, write_sorted_csv
+from catalog_profile import PROFILER, add_profile_arguments, profile_session
+from catalog_search import catalog_search_path, update_search_index
+from catalog_shards import file_sha256, shard_manifest_path, write_shard_manifest
+from catalog_snapshot import catalog_snapshot_path, write_snapshot
+from catalog_workorders import WorkorderIndex, workorder_rows
+
+# Base paths (defaults when there is no scan-config.json)
 RESOURCES_DIR = Path(__file__).parent
 MCP_SERVERS = Path(r"C:\Users\willh\.mcp-servers")
 ASSISTANT = Path(r"C:\Users\willh\Desktop\assistant")
@@ -22,40 +43,593 @@ CODEREF_SYSTEM = Path(r"C:\Users\willh\Desktop\projects\coderef-system")
 CLAUDE_COMMANDS = Path(r"C:\Users\willh\.claude\commands")
 
 OUTPUT_CSV = RESOURCES_DIR / "scanned-resources-temp.csv"
+CATALOG_CSV = RESOURCES_DIR / "tools-and-commands.csv"
+SCAN_CACHE = RESOURCES_DIR / ".coderef" / "scan-cache.json"
+WORKORDER_INDEX = RESOURCES_DIR / ".coderef" / "workorder-index.json"
+
+# Scan roots and per-root scanner profiles (override with --config or CODEREF_SCAN_CONFIG)
+SCAN_CONFIG = RESOURCES_DIR / "scan-config.json"
+
+# Scanners a root profile can enable
+SCANNER_NAMES = ('tools', 'commands', 'scripts', 'validators', 'schemas', 'resource_sheets', 'tabs', 'workorders')
+
+# Bump to drop every cached row (the cache is also invalidated whenever this file changes)
+SCAN_CACHE_VERSION = 2
 
+# Directories file discovery never descends into
+PRUNE_DIRS = frozenset(['node_modules', '.git', 'dist', '__pycache__'])
 
-class ResourceScanner:
-    """Comprehensive resource scanner for entire ecosystem"""
+# Scanner each per-file parser belongs to (profiling stage names)
+PARSER_SCANNERS = {
+    '_parse_server_file': 'tools',
+    '_parse_command_file': 'commands',
+    '_parse_script_file': 'scripts',
+    '_parse_validator_file': 'validators',
+    '_parse_schema_file': 'schemas',
+    '_parse_resource_sheet': 'resource_sheets',
+    '_dashboard_tab_rows': 'tabs',
+}
+
+# (parse function, args, error label) - one unit of per-file scan work
+ScanTask = Tuple[Callable[..., List[Resource]], Tuple[Any, ...], str]
+
+
+def task_key(task: ScanTask) -> str:
+    """Stable identity of a scan task: parser name plus its arguments"""
+    parse, args, _ = task
+    return '|'.join([parse.__name__] + [str(arg) for arg in args])
+
+
+# ========== PYTHON MODULE FACTS ==========
+
+class ModuleFacts(NamedTuple):
+    """Everything the scanners need from one Python module, from a single ast.parse"""
+    docstring: Optional[str]
+    tools: List[Tuple[str, str]]                    # (name, description) in source order
+    validators: List[Tuple[str, Optional[str]]]     # (class name, docstring)
+
+
+def _string_value(node: Optional[ast.AST], constants: Dict[str, str]) -> Optional[str]:
+    """Literal string, or a module-level string constant referenced by name"""
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    if isinstance(node, ast.Name):
+        return constants.get(node.id)
+    return None
+
+
+def _is_tool_constructor(node: ast.Call) -> bool:
+    func = node.func
+    return (isinstance(func, ast.Name) and func.id == 'Tool') or \
+        (isinstance(func, ast.Attribute) and func.attr == 'Tool')
+
+
+def extract_module_facts(source: str) -> ModuleFacts:
+    """
+    Walk the tree once, collecting Tool(name=..., description=...) constructors,
+    @<server>.call_tool("name") handlers and *Validator classes.
+    """
+    tree = ast.parse(source)
+
+    constants: Dict[str, str] = {}
+    for stmt in tree.body:
+        if isinstance(stmt, ast.Assign) and isinstance(stmt.value, ast.Constant) \
+                and isinstance(stmt.value.value, str):
+            for target in stmt.targets:
+                if isinstance(target, ast.Name):
+                    constants[target.id] = stmt.value.value
+
+    found: List[Tuple[int, int, str, str]] = []
+    validators: List[Tuple[str, Optional[str]]] = []
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call) and _is_tool_constructor(node):
+            keywords = {kw.arg: kw.value for kw in node.keywords if kw.arg}
+            name = _string_value(keywords.get('name'), constants)
+            if name:
+                description = _string_value(keywords.get('description'), constants) or ''
+                found.append((node.lineno, node.col_offset, name, description))
+
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            for decorator in node.decorator_list:
+                if isinstance(decorator, ast.Call) and isinstance(decorator.func, ast.Attribute) \
+                        and decorator.func.attr == 'call_tool' and decorator.args:
+                    name = _string_value(decorator.args[0], constants)
+                    if name:
+                        description = (ast.get_docstring(node) or '').split('\n\n')[0]
+                        found.append((decorator.lineno, decorator.col_offset, name, description))
+
+        elif isinstance(node, ast.ClassDef) and node.name.endswith('Validator'):
+            validators.append((node.name, ast.get_docstring(node)))
+
+    # Keep the first definition of each tool; a later one may only fill a missing description
+    tools: Dict[str, str] = {}
+    for _, _, name, description in sorted(found):
+        if not tools.get(name):
+            tools[name] = ' '.join(description.split())
+
+    return ModuleFacts(ast.get_docstring(tree), list(tools.items()), validators)
+
+
+class ModuleFactsCache:
+    """Shares one parse per file (keyed by path, mtime and size) across scanners"""
 
     def __init__(self):
-        self.resources: List[Dict] = []
-        self.errors: List[str] = []
+        self._facts: Dict[str, Tuple[Tuple[int, int], ModuleFacts]] = {}
+        self._lock = threading.Lock()
 
-    def get_git_timestamps(self, file_path: Path) -> Tuple[Optional[str], Optional[str]]:
-        """Get creation and last update timestamps from git"""
+    def get(self, file_path: Path) -> ModuleFacts:
+        """Facts for file_path; raises SyntaxError/OSError like ast.parse/open"""
+        stat = file_path.stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+        key = str(file_path)
+
+        with self._lock:
+            cached = self._facts.get(key)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+        with open(file_path, 'r', encoding='utf-8') as f:
+            PROFILER.file_read(f)
+            facts = extract_module_facts(f.read())
+
+        with self._lock:
+            self._facts[key] = (signature, facts)
+        return facts
+
+
+class GitTimestampIndex:
+    """Path -> (created, last_updated) map built from one git log walk per repository"""
+
+    def __init__(self):
+        self._repo_roots: Dict[Path, Optional[Path]] = {}
+        self._repos: Dict[Path, Dict[str, Tuple[Optional[str], Optional[str]]]] = {}
+        self._lock = threading.Lock()
+        self._repo_locks: Dict[Path, threading.Lock] = {}
+        self._heads: Dict[Path, str] = {}
+
+    @staticmethod
+    def _key(path: Path) -> str:
+        return os.path.normcase(str(path))
+
+    def find_repo_root(self, directory: Path) -> Optional[Path]:
+        """Walk up from directory to the nearest folder containing .git"""
+        visited = []
+        current = directory
+        root = None
+        while True:
+            if current in self._repo_roots:
+                root = self._repo_roots[current]
+                break
+            visited.append(current)
+            if (current / '.git').exists():
+                root = current
+                break
+            if current.parent == current:
+                break
+            current = current.parent
+
+        for d in visited:
+            self._repo_roots[d] = root
+        return root
+
+    def _build(self, repo_root: Path) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+        """Single `git log` walk: newest commit per path is the update, oldest add is the creation"""
+        created: Dict[str, str] = {}
+        updated: Dict[str, str] = {}
+        PROFILER.count('subprocesses')
         try:
-            # Get first commit (creation)
-            result = subprocess.run(
-                ['git', 'log', '--diff-filter=A', '--format=%aI', '--', str(file_path)],
-                capture_output=True,
-                text=True,
-                cwd=file_path.parent
-            )
-            created = result.stdout.strip().split('\n')[-1] if result.stdout.strip() else None
-
-            # Get last commit (update)
-            result = subprocess.run(
-                ['git', 'log', '-1', '--format=%aI', '--', str(file_path)],
-                capture_output=True,
-                text=True,
-                cwd=file_path.parent
-            )
-            updated = result.stdout.strip() if result.stdout.strip() else None
+            with PROFILER.stage('git log'):
+                result = subprocess.run(
+                    ['git', '-c', 'core.quotepath=off', 'log', '--no-renames',
+                     '--name-status', '--format=%x01%aI'],
+                    capture_output=True,
+                    text=True,
+                    encoding='utf-8',
+                    errors='replace',
+                    cwd=repo_root
+                )
+            output = result.stdout if result.returncode == 0 else ''
+        except Exception:
+            output = ''
 
-            return created, updated
+        date = None
+        for line in output.splitlines():
+            if not line:
+                continue
+            if line.startswith('\x01'):
+                date = line[1:].strip()
+                continue
+            status, _, rel_path = line.partition('\t')
+            if not rel_path or date is None:
+                continue
+            key = self._key(repo_root / rel_path)
+            # Log is newest first: first sighting is the last update,
+            # last 'A' sighting is the original creation
+            if key not in updated:
+                updated[key] = date
+            if status == 'A':
+                created[key] = date
+
+        index = {key: (created.get(key), updated[key]) for key in updated}
+        print(f"  Indexed git history: {repo_root} ({len(index)} paths)")
+        return index
+
+    def _read_head(self, repo_root: Path) -> str:
+        """Resolve HEAD to a commit id by reading .git directly (no subprocess)"""
+        git_dir = repo_root / '.git'
+        try:
+            if git_dir.is_file():
+                # Worktrees and submodules: ".git" is a "gitdir: <path>" pointer
+                pointer = git_dir.read_text(encoding='utf-8').strip()
+                git_dir = (repo_root / pointer.partition('gitdir:')[2].strip()).resolve()
+
+            head = (git_dir / 'HEAD').read_text(encoding='utf-8').strip()
+            if not head.startswith('ref:'):
+                return head
+
+            ref = head[4:].strip()
+            ref_file = git_dir / ref
+            if ref_file.exists():
+                return ref_file.read_text(encoding='utf-8').strip()
+
+            packed = git_dir / 'packed-refs'
+            if packed.exists():
+                for line in packed.read_text(encoding='utf-8').splitlines():
+                    if line.endswith(' ' + ref):
+                        return line.split(' ', 1)[0]
+            return head
         except Exception:
+            return ''
+
+    def refresh_heads(self) -> List[Path]:
+        """Re-read HEAD of every known repo; drop the log index of repos that moved"""
+        moved = []
+        for repo_root, head in list(self._heads.items()):
+            current = self._read_head(repo_root)
+            if current != head:
+                self._heads[repo_root] = current
+                self._repos.pop(repo_root, None)
+                moved.append(repo_root)
+        return moved
+
+    def head_for(self, file_path: Path) -> str:
+        """HEAD commit of the repository containing file_path ('' if untracked)"""
+        try:
+            repo_root = self.find_repo_root(file_path.resolve().parent)
+        except Exception:
+            return ''
+        if repo_root is None:
+            return ''
+        if repo_root not in self._heads:
+            self._heads[repo_root] = self._read_head(repo_root)
+        return self._heads[repo_root]
+
+    def lookup(self, file_path: Path) -> Tuple[Optional[str], Optional[str]]:
+        """Return (created, last_updated) for a tracked file, or (None, None)"""
+        try:
+            resolved = file_path.resolve()
+        except Exception:
+            return None, None
+
+        repo_root = self.find_repo_root(resolved.parent)
+        if repo_root is None:
             return None, None
 
+        if repo_root not in self._repos:
+            # Per-repo lock: concurrent scanners wait for one walk instead of repeating it
+            with self._lock:
+                repo_lock = self._repo_locks.setdefault(repo_root, threading.Lock())
+            with repo_lock:
+                if repo_root not in self._repos:
+                    self._repos[repo_root] = self._build(repo_root)
+
+        return self._repos[repo_root].get(self._key(resolved), (None, None))
+
+
+# ========== FILE DISCOVERY ==========
+
+class FilePattern(NamedTuple):
+    """Files one scanner wants: names matching glob under root, recursively or not"""
+    root: Path
+    glob: str
+    recursive: bool = True
+
+
+def _path_key(path: Path) -> str:
+    return os.path.normcase(os.path.abspath(str(path)))
+
+
+def _within(key: str, root_key: str) -> bool:
+    return key == root_key or key.startswith(root_key.rstrip(os.sep) + os.sep)
+
+
+class FileDiscovery:
+    """
+    Finds the files for many FilePatterns with one os.scandir walk per distinct
+    root; a root nested inside another is covered by the enclosing walk.
+    Per pattern, files come out in the same order as Path.glob/rglob, minus
+    anything under PRUNE_DIRS.
+    """
+
+    def __init__(self, patterns: Iterable[FilePattern]):
+        self.patterns = list(dict.fromkeys(patterns))
+        self.dirs_scanned = 0
+        self._found: Dict[FilePattern, List[Path]] = {pattern: [] for pattern in self.patterns}
+
+        # (root key, pattern, name matcher); fnmatch semantics incl. case rules
+        self._subs = [
+            (_path_key(pattern.root), pattern,
+             re.compile(fnmatch.translate(os.path.normcase(pattern.glob))).match)
+            for pattern in self.patterns
+        ]
+        self._walk()
+
+    def files(self, pattern: FilePattern) -> List[Path]:
+        """Matches for a pattern given to the constructor"""
+        return self._found[pattern]
+
+    def _walk(self):
+        roots: Dict[str, Path] = {}
+        for key, pattern, _ in self._subs:
+            roots.setdefault(key, pattern.root)
+
+        for key, root in roots.items():
+            if any(other != key and _within(key, other) for other in roots):
+                continue
+            self._walk_root(str(root), key, [sub for sub in self._subs if _within(sub[0], key)])
+
+    def _walk_root(self, root: str, root_key: str, subs):
+        # Pre-order DFS: a directory's files, then its subdirectories in scandir order
+        stack = [(root, root_key, subs)]
+        while stack:
+            dir_path, dir_key, subs = stack.pop()
+            active = [(pattern, match) for key, pattern, match in subs
+                      if key == dir_key or (pattern.recursive and _within(dir_key, key))]
+            try:
+                with os.scandir(dir_path) as it:
+                    entries = list(it)
+            except OSError:
+                continue
+            self.dirs_scanned += 1
+
+            children = []
+            for entry in entries:
+                try:
+                    if entry.is_dir():
+                        if entry.name not in PRUNE_DIRS and not entry.is_symlink():
+                            children.append(entry)
+                        continue
+                    if not entry.is_file():
+                        continue
+                except OSError:
+                    continue
+                name = os.path.normcase(entry.name)
+                for pattern, match in active:
+                    if match(name):
+                        self._found[pattern].append(Path(entry.path))
+
+            pushed = []
+            for entry in children:
+                child_key = os.path.join(dir_key, os.path.normcase(entry.name))
+                # Descend only where some pattern still applies, or toward a nested root
+                child_subs = [sub for sub in subs
+                              if (sub[1].recursive and _within(child_key, sub[0])) or _within(sub[0], child_key)]
+                if child_subs:
+                    pushed.append((entry.path, child_key, child_subs))
+            stack.extend(reversed(pushed))
+
+
+# ========== SCAN ROOTS ==========
+
+class ScanRoot(NamedTuple):
+    """A scan root and its profile: enabled scanners, file filters, parse concurrency"""
+    name: str
+    path: Path
+    scanners: FrozenSet[str] = frozenset(SCANNER_NAMES)
+    include: Tuple[str, ...] = ()   # globs on the root-relative path ('/' separators); empty = all
+    exclude: Tuple[str, ...] = ()
+    jobs: int = 0                   # max files parsed at once under this root; 0 = no limit
+
+    def allows_file(self, file_path: Path) -> bool:
+        """Include/exclude filters for a file under this root"""
+        if not self.include and not self.exclude:
+            return True
+        rel = os.path.relpath(str(file_path), str(self.path)).replace(os.sep, '/')
+        if self.include and not any(fnmatch.fnmatch(rel, glob) for glob in self.include):
+            return False
+        return not any(fnmatch.fnmatch(rel, glob) for glob in self.exclude)
+
+
+def default_scan_roots() -> Dict[str, ScanRoot]:
+    """Every scanner on the built-in root paths"""
+    roots = [('MCP_SERVERS', MCP_SERVERS), ('ASSISTANT', ASSISTANT), ('DASHBOARD', DASHBOARD),
+             ('CODEREF_SYSTEM', CODEREF_SYSTEM), ('CLAUDE_COMMANDS', CLAUDE_COMMANDS)]
+    return {name: ScanRoot(name, path) for name, path in roots}
+
+
+def load_scan_config(config_path: Path) -> Dict[str, ScanRoot]:
+    """
+    Read scan roots from a JSON config. Root paths may use ~ and environment
+    variables; relative paths are resolved against the config file.
+    Raises ValueError on an invalid config.
+    """
+    config_path = Path(config_path)
+    with open(config_path, 'r', encoding='utf-8-sig') as f:
+        config = json.load(f)
+
+    roots: Dict[str, ScanRoot] = {}
+    for entry in config.get('roots', []):
+        try:
+            name = entry['name']
+            raw_path = os.path.expandvars(os.path.expanduser(entry['path']))
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"{config_path}: every root needs a name and a path ({e})") from e
+
+        scanners = frozenset(entry.get('scanners', SCANNER_NAMES))
+        unknown = scanners - set(SCANNER_NAMES)
+        if unknown:
+            raise ValueError(f"{config_path}: root {name} has unknown scanners {sorted(unknown)}")
+
+        roots[name] = ScanRoot(
+            name, config_path.parent / raw_path, scanners,
+            tuple(entry.get('include', ())), tuple(entry.get('exclude', ())),
+            int(entry.get('jobs', 0)),
+        )
+    return roots
+
+
+def scanner_fingerprint() -> str:
+    """Hash of the scanner sources: any change to parsing, categorizer or record logic invalidates the cache"""
+    digest = hashlib.sha256(str(SCAN_CACHE_VERSION).encode())
+    digest.update(Path(__file__).read_bytes())
+    digest.update((RESOURCES_DIR / 'catalog_io.py').read_bytes())
+    return digest.hexdigest()
+
+
+class ScanCache:
+    """Persistent per-file cache of extracted resource rows"""
+
+    def __init__(self, path: Path, use_hash: bool = False):
+        self.path = path
+        self.use_hash = use_hash
+        self.fingerprint = scanner_fingerprint()
+        self.entries: Dict[str, Dict] = {}
+        self.seen = set()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _file_hash(file_path: Path) -> str:
+        return hashlib.sha256(file_path.read_bytes()).hexdigest()
+
+    def load(self):
+        """Load cached entries, discarding them if the scanner has changed"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        if data.get('fingerprint') == self.fingerprint:
+            self.entries = data.get('entries', {})
+
+    def save(self):
+        """Write entries seen during this scan (atomic replace)"""
+        entries = {key: self.entries[key] for key in sorted(self.seen) if key in self.entries}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(self.path.name + '.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'fingerprint': self.fingerprint, 'entries': entries}, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"[WARN] Could not write scan cache {self.path}: {e}")
+
+    def get(self, key: str, file_path: Path) -> Optional[Dict]:
+        """Return the cached entry if file_path is unchanged, else None"""
+        with self._lock:
+            self.seen.add(key)
+        entry = self.entries.get(key)
+
+        try:
+            stat = file_path.stat()
+        except OSError:
+            entry = None
+
+        if entry is not None and (entry['mtime_ns'] != stat.st_mtime_ns or entry['size'] != stat.st_size):
+            # Touched but possibly identical (e.g. after a checkout): compare content
+            if self.use_hash and entry.get('hash') and entry['size'] == stat.st_size \
+                    and entry['hash'] == self._file_hash(file_path):
+                entry['mtime_ns'] = stat.st_mtime_ns
+            else:
+                entry = None
+
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return entry
+
+    def put(self, key: str, file_path: Path, head: str, rows: List[Resource]):
+        """Store rows extracted from file_path"""
+        try:
+            stat = file_path.stat()
+        except OSError:
+            return
+
+        entry = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'head': head,
+                 'rows': [list(row) for row in rows]}
+        if self.use_hash:
+            entry['hash'] = self._file_hash(file_path)
+        self.entries[key] = entry
+
+
+class ResourceScanner:
+    """Comprehensive resource scanner for entire ecosystem"""
+
+    def __init__(self, jobs: int = 1, cache: Optional[ScanCache] = None,
+                 roots: Optional[Dict[str, ScanRoot]] = None, workorder_index: Optional[Path] = None):
+        self.resources: List[Resource] = []
+        self.errors: List[str] = []
+        self.jobs = max(1, jobs)
+        self.cache = cache
+        # Persistent workorder index; None parses every workorder file on each scan
+        self.workorder_index = workorder_index
+        self.verbose = True
+        self.git_index = GitTimestampIndex()
+        self.module_facts = ModuleFactsCache()
+        self.discovery: Optional[FileDiscovery] = None
+        self.roots = default_scan_roots() if roots is None else roots
+        self._root_keys = sorted(((_path_key(root.path), root) for root in self.roots.values()),
+                                 key=lambda item: len(item[0]), reverse=True)
+        self._root_limits = {name: threading.BoundedSemaphore(root.jobs)
+                             for name, root in self.roots.items() if root.jobs > 0}
+
+    # ========== SCAN ROOTS ==========
+
+    def root_path(self, name: str) -> Path:
+        """Configured path of a root (built-in default if the root is not configured)"""
+        root = self.roots.get(name)
+        return root.path if root else default_scan_roots()[name].path
+
+    def owner(self, path: Path) -> Optional[ScanRoot]:
+        """Innermost configured root containing path"""
+        key = _path_key(path)
+        for root_key, root in self._root_keys:
+            if _within(key, root_key):
+                return root
+        return None
+
+    def enabled(self, scanner: str, path: Path) -> bool:
+        """True if path lies under a configured root whose profile runs scanner"""
+        root = self.owner(path)
+        return root is not None and scanner in root.scanners
+
+    def accepts(self, scanner: str, file_path: Path) -> bool:
+        """enabled() plus the owning root's include/exclude filters"""
+        root = self.owner(file_path)
+        return root is not None and scanner in root.scanners and root.allows_file(file_path)
+
+    def parse_limit(self, file_path: Path):
+        """Context manager enforcing the owning root's concurrency limit, if it has one"""
+        if self._root_limits:
+            root = self.owner(file_path)
+            if root is not None and root.name in self._root_limits:
+                return self._root_limits[root.name]
+        return nullcontext()
+
+    def log(self, message: str):
+        """Progress output, silenced in watch mode"""
+        if self.verbose:
+            print(message)
+
+    def get_git_timestamps(self, file_path: Path) -> Tuple[Optional[str], Optional[str]]:
+        """Get creation and last update timestamps from the git index"""
+        return self.git_index.lookup(file_path)
+
     def get_filesystem_timestamps(self, file_path: Path) -> Tuple[str, str]:
         """Fallback to filesystem timestamps"""
         try:
@@ -67,43 +641,165 @@ class ResourceScanner:
             now = datetime.now().isoformat()
             return now, now
 
+    def resolve_timestamps(self, file_path: Path) -> Tuple[str, str]:
+        """Try git first, fallback to filesystem"""
+        created, updated = self.get_git_timestamps(file_path)
+        if not created or not updated:
+            created, updated = self.get_filesystem_timestamps(file_path)
+        return created or '', updated or ''
+
+    def make_resource(self, type_: str, server: str, category: str, name: str,
+                      description: str, status: str, path: str) -> Resource:
+        """Build a resource row with timestamps"""
+        created, updated = self.resolve_timestamps(Path(path))
+
+        return Resource(type_, server, category, name, description, status, path, created, updated)
+
+    def restamp(self, resource: Resource) -> Resource:
+        """Same resource with freshly resolved timestamps"""
+        created, updated = self.resolve_timestamps(Path(resource.Path))
+        return resource._replace(Created=created, LastUpdated=updated)
+
     def add_resource(self, type_: str, server: str, category: str, name: str,
                     description: str, status: str, path: str):
         """Add a resource with timestamps"""
-        file_path = Path(path)
+        self.resources.append(
+            self.make_resource(type_, server, category, name, description, status, path)
+        )
+
+    # ========== SCAN ENGINE ==========
+
+    def _run_task(self, task: ScanTask) -> Tuple[List[Resource], Optional[str]]:
+        """Run one per-file task, returning its rows or an error message"""
+        start = time.perf_counter()
+        outcome = self._execute_task(task)
+        parse, args, _ = task
+        PROFILER.record_file(f"scan:{PARSER_SCANNERS.get(parse.__name__, parse.__name__)}",
+                             args[0], time.perf_counter() - start)
+        return outcome
+
+    def _execute_task(self, task: ScanTask) -> Tuple[List[Resource], Optional[str]]:
+        parse, args, label = task
+        file_path = args[0]
+
+        if self.cache is not None:
+            key = task_key(task)
+            head = self.git_index.head_for(file_path)
+            entry = self.cache.get(key, file_path)
+            if entry is not None:
+                PROFILER.count('cache_hits')
+                rows = [Resource.from_values(values) for values in entry['rows']]
+                if entry['head'] != head:
+                    # File unchanged but new commits: only the timestamps can be stale
+                    rows = [self.restamp(row) for row in rows]
+                    entry['rows'] = [list(row) for row in rows]
+                    entry['head'] = head
+                return rows, None
 
-        # Try git first, fallback to filesystem
-        created, updated = self.get_git_timestamps(file_path)
-        if not created or not updated:
-            created, updated = self.get_filesystem_timestamps(file_path)
+        try:
+            with self.parse_limit(file_path):
+                rows = parse(*args)
+        except Exception as e:
+            return [], f"{label}: {e}"
+
+        if self.cache is not None:
+            self.cache.put(key, file_path, head, rows)
+        return rows, None
+
+    def map_tasks(self, tasks: List[ScanTask]) -> List[Tuple[List[Resource], Optional[str]]]:
+        """(rows, error) for each task, in task order"""
+        if self.jobs > 1 and len(tasks) > 1:
+            with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+                return list(pool.map(self._run_task, tasks))
+        return [self._run_task(task) for task in tasks]
+
+    def iter_tasks(self, tasks: List[ScanTask]) -> Iterator[Resource]:
+        """
+        Stream rows from per-file tasks, serially or on a thread pool.
+        Rows and errors come out in task order, so output never depends on --jobs;
+        the pool only runs a few tasks ahead of the consumer.
+        """
+        if self.jobs <= 1:
+            outcomes = map(self._run_task, tasks)
+            for task_rows, error in outcomes:
+                if error:
+                    self.errors.append(error)
+                yield from task_rows
+            return
 
-        self.resources.append({
-            'Type': type_,
-            'Server': server,
-            'Category': category,
-            'Name': name,
-            'Description': description,
-            'Status': status,
-            'Path': path,
-            'Created': created or '',
-            'LastUpdated': updated or ''
-        })
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            pending = deque()
+            for task in tasks:
+                pending.append(pool.submit(self._run_task, task))
+                while len(pending) > self.jobs * 4 or (pending and pending[0].done()):
+                    task_rows, error = pending.popleft().result()
+                    if error:
+                        self.errors.append(error)
+                    yield from task_rows
+
+            while pending:
+                task_rows, error = pending.popleft().result()
+                if error:
+                    self.errors.append(error)
+                yield from task_rows
+
+    def run_tasks(self, tasks: List[ScanTask]) -> List[Resource]:
+        """Run per-file tasks and collect their rows in task order"""
+        return list(self.iter_tasks(tasks))
+
+    # ========== FILE DISCOVERY ==========
+
+    def file_patterns(self) -> List[FilePattern]:
+        """Every file pattern the file scanners look for"""
+        patterns = [pattern for pattern, _ in self.slash_command_patterns()]
+        patterns.extend(pattern for pattern, _ in self.script_patterns())
+        patterns.append(self.validator_pattern())
+        patterns.append(self.schema_pattern())
+        patterns.extend(self.resource_sheet_patterns())
+        return patterns
+
+    def discover(self) -> FileDiscovery:
+        """Walk every scanned root once and remember the matches"""
+        with PROFILER.stage('discovery'):
+            self.discovery = FileDiscovery(self.file_patterns())
+        PROFILER.count('dirs_scanned', self.discovery.dirs_scanned)
+        return self.discovery
+
+    def find_files(self, pattern: FilePattern, scanner: str) -> List[Path]:
+        """
+        Files matching pattern from the current discovery (walks if there is none yet),
+        filtered by the owning root's profile
+        """
+        if self.discovery is None or pattern not in self.discovery.patterns:
+            self.discover()
+        return [file_path for file_path in self.discovery.files(pattern) if self.accepts(scanner, file_path)]
 
     # ========== MCP TOOLS ==========
 
     def scan_mcp_tools(self):
         """Scan all MCP server.py files for tool definitions"""
-        print("Scanning MCP tools...")
+        self.resources.extend(self.run_tasks(self.mcp_tool_tasks()))
+
+    def mcp_tool_tasks(self) -> List[ScanTask]:
+        """Locate each MCP server.py file"""
+        self.log("Scanning MCP tools...")
+
+        return [(self._parse_server_file, (server_file, server_name), f"Error parsing {server_file}")
+                for server_file, server_name in self.server_files()]
 
+    def server_files(self) -> List[Tuple[Path, str]]:
+        """(server.py, server name) for each MCP server the tools scanner parses"""
+        mcp_servers = self.root_path('MCP_SERVERS')
         servers = {
-            'coderef-context': MCP_SERVERS / 'coderef-context',
-            'coderef-docs': MCP_SERVERS / 'coderef-docs',
-            'coderef-personas': MCP_SERVERS / 'coderef-personas',
-            'coderef-workflow': MCP_SERVERS / 'coderef-workflow',
-            'coderef-testing': MCP_SERVERS / 'coderef-testing',
-            'papertrail': MCP_SERVERS / 'papertrail'
+            'coderef-context': mcp_servers / 'coderef-context',
+            'coderef-docs': mcp_servers / 'coderef-docs',
+            'coderef-personas': mcp_servers / 'coderef-personas',
+            'coderef-workflow': mcp_servers / 'coderef-workflow',
+            'coderef-testing': mcp_servers / 'coderef-testing',
+            'papertrail': mcp_servers / 'papertrail'
         }
 
+        found = []
         for server_name, server_path in servers.items():
             # Try multiple possible locations
             server_files = [
@@ -113,49 +809,22 @@ class ResourceScanner:
             ]
 
             for server_file in server_files:
-                if server_file.exists():
-                    self._parse_server_file(server_file, server_name)
+                if server_file.exists() and self.accepts('tools', server_file):
+                    found.append((server_file, server_name))
                     break
 
-    def _parse_server_file(self, server_file: Path, server_name: str):
-        """Parse server.py to extract tool definitions"""
-        try:
-            with open(server_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-
-            # Extract tool names and descriptions via regex (AST is complex for this)
-            # Look for @server.call_tool or Tool() patterns
-            tool_pattern = r'(?:name=|@server\.call_tool\(["\'])([a-z_]+)(?:["\']|,)'
-            desc_pattern = r'description=["\'](.*?)["\']'
-
-            lines = content.split('\n')
-            i = 0
-            while i < len(lines):
-                line = lines[i]
-
-                # Check if this line has a tool definition
-                tool_match = re.search(tool_pattern, line)
-                if tool_match:
-                    tool_name = tool_match.group(1)
-
-                    # Look for description in next 5 lines
-                    description = ""
-                    for j in range(i, min(i+10, len(lines))):
-                        desc_match = re.search(desc_pattern, lines[j])
-                        if desc_match:
-                            description = desc_match.group(1)
-                            break
-
-                    category = self._categorize_tool(server_name, tool_name)
-                    self.add_resource(
-                        'Tool', server_name, category, tool_name,
-                        description, 'active', str(server_file)
-                    )
-
-                i += 1
+        return found
 
-        except Exception as e:
-            self.errors.append(f"Error parsing {server_file}: {e}")
+    def _parse_server_file(self, server_file: Path, server_name: str) -> List[Resource]:
+        """Parse server.py to extract tool definitions"""
+        rows = []
+        for tool_name, description in self.module_facts.get(server_file).tools:
+            category = self._categorize_tool(server_name, tool_name)
+            rows.append(self.make_resource(
+                'Tool', server_name, category, tool_name,
+                description, 'active', str(server_file)
+            ))
+        return rows
 
     def _categorize_tool(self, server: str, tool_name: str) -> str:
         """Categorize tool based on server and name"""
@@ -173,42 +842,54 @@ class ResourceScanner:
 
     def scan_slash_commands(self):
         """Scan all .claude/commands/ directories for slash commands"""
-        print("Scanning slash commands...")
+        self.resources.extend(self.run_tasks(self.slash_command_tasks()))
 
+    def slash_command_tasks(self) -> List[ScanTask]:
+        """List slash command .md files"""
+        self.log("Scanning slash commands...")
+
+        tasks = []
+        for pattern, server in self.slash_command_patterns():
+            for md_file in self.find_files(pattern, 'commands'):
+                tasks.append((self._parse_command_file, (md_file, server),
+                              f"Error reading {md_file}"))
+
+        return tasks
+
+    def slash_command_patterns(self) -> List[Tuple[FilePattern, str]]:
+        """commands/*.md directories and the server each belongs to"""
+        mcp_servers = self.root_path('MCP_SERVERS')
         command_dirs = [
-            (CLAUDE_COMMANDS, 'assistant'),
-            (DASHBOARD / '.claude' / 'commands', 'coderef-dashboard'),
-            (MCP_SERVERS / 'coderef-workflow' / '.claude' / 'commands', 'coderef-workflow'),
-            (MCP_SERVERS / 'coderef-docs' / '.claude' / 'commands', 'coderef-docs'),
-            (MCP_SERVERS / 'coderef-personas' / '.claude' / 'commands', 'coderef-personas'),
-            (MCP_SERVERS / 'coderef-testing' / '.claude' / 'commands', 'coderef-testing'),
+            (self.root_path('CLAUDE_COMMANDS'), 'assistant'),
+            (self.root_path('DASHBOARD') / '.claude' / 'commands', 'coderef-dashboard'),
+            (mcp_servers / 'coderef-workflow' / '.claude' / 'commands', 'coderef-workflow'),
+            (mcp_servers / 'coderef-docs' / '.claude' / 'commands', 'coderef-docs'),
+            (mcp_servers / 'coderef-personas' / '.claude' / 'commands', 'coderef-personas'),
+            (mcp_servers / 'coderef-testing' / '.claude' / 'commands', 'coderef-testing'),
         ]
+        return [(FilePattern(cmd_dir, '*.md', recursive=False), server)
+                for cmd_dir, server in command_dirs if self.enabled('commands', cmd_dir)]
 
-        for cmd_dir, server in command_dirs:
-            if not cmd_dir.exists():
-                continue
-
-            for md_file in cmd_dir.glob('*.md'):
-                try:
-                    with open(md_file, 'r', encoding='utf-8') as f:
-                        content = f.read()
+    def _parse_command_file(self, md_file: Path, server: str) -> List[Resource]:
+        """Parse a slash command .md file"""
+        with open(md_file, 'r', encoding='utf-8') as f:
+            PROFILER.file_read(f)
+            content = f.read()
 
-                    # Extract frontmatter description
-                    desc_match = re.search(r'^---\s*\ndescription:\s*(.+?)\n---', content, re.MULTILINE | re.DOTALL)
-                    description = desc_match.group(1).strip() if desc_match else content.split('\n')[0][:100]
+        # Extract frontmatter description
+        desc_match = re.search(r'^---\s*\ndescription:\s*(.+?)\n---', content, re.MULTILINE | re.DOTALL)
+        description = desc_match.group(1).strip() if desc_match else content.split('\n')[0][:100]
 
-                    # Remove markdown formatting
-                    description = description.replace('**', '').replace('*', '').strip()
+        # Remove markdown formatting
+        description = description.replace('**', '').replace('*', '').strip()
 
-                    name = '/' + md_file.stem
-                    category = self._categorize_command(name, server)
+        name = '/' + md_file.stem
+        category = self._categorize_command(name, server)
 
-                    self.add_resource(
-                        'Command', server, category, name,
-                        description, 'active', str(md_file)
-                    )
-                except Exception as e:
-                    self.errors.append(f"Error reading {md_file}: {e}")
+        return [self.make_resource(
+            'Command', server, category, name,
+            description, 'active', str(md_file)
+        )]
 
     def _categorize_command(self, name: str, server: str) -> str:
         """Categorize command based on name and server"""
@@ -228,49 +909,78 @@ class ResourceScanner:
 
     def scan_scripts(self):
         """Scan all Python scripts"""
-        print("Scanning scripts...")
+        self.resources.extend(self.run_tasks(self.script_tasks()))
 
-        script_locations = [
-            (ASSISTANT / 'scripts', 'Orchestrator'),
-            (CODEREF_SYSTEM / 'scripts', 'System'),
-            (CODEREF_SYSTEM / 'packages', 'System'),
-            (MCP_SERVERS / 'coderef-workflow' / 'generators', 'Workflow'),
-            (MCP_SERVERS / 'coderef-docs' / 'generators', 'coderef-docs'),
-            (MCP_SERVERS / 'coderef-context' / 'src' / 'coderef_context', 'coderef-context'),
-            (MCP_SERVERS / 'papertrail' / 'scripts', 'papertrail'),
-        ]
+    def script_tasks(self) -> List[ScanTask]:
+        """List Python scripts"""
+        self.log("Scanning scripts...")
 
-        for script_dir, server in script_locations:
-            if not script_dir.exists():
-                continue
+        # Modules the tools scanner parses anyway; other scripts only need their header
+        parsed = {str(server_file) for server_file, _ in self.server_files()}
 
-            for script_file in script_dir.rglob('*.py'):
+        tasks = []
+        for pattern, server in self.script_patterns():
+            for script_file in self.find_files(pattern, 'scripts'):
                 if script_file.name.startswith('__'):
                     continue
 
-                try:
-                    with open(script_file, 'r', encoding='utf-8') as f:
-                        first_lines = [f.readline() for _ in range(5)]
-
-                    # Extract docstring or first comment
-                    description = ""
-                    for line in first_lines:
-                        if '"""' in line or "'''" in line or line.strip().startswith('#'):
-                            description = line.strip().replace('"""', '').replace("'''", '').replace('#', '').strip()
-                            if description:
-                                break
-
-                    if not description:
-                        description = f"Python script: {script_file.stem}"
+                tasks.append((self._parse_script_file, (script_file, server, str(script_file) in parsed),
+                              f"Error reading {script_file}"))
 
-                    category = self._categorize_script(script_file.stem)
+        return tasks
 
-                    self.add_resource(
-                        'Script', server, category, script_file.name,
-                        description, 'active', str(script_file)
-                    )
-                except Exception as e:
-                    self.errors.append(f"Error reading {script_file}: {e}")
+    def script_patterns(self) -> List[Tuple[FilePattern, str]]:
+        """Script trees (searched recursively) and the server each belongs to"""
+        mcp_servers = self.root_path('MCP_SERVERS')
+        coderef_system = self.root_path('CODEREF_SYSTEM')
+        script_locations = [
+            (self.root_path('ASSISTANT') / 'scripts', 'Orchestrator'),
+            (coderef_system / 'scripts', 'System'),
+            (coderef_system / 'packages', 'System'),
+            (mcp_servers / 'coderef-workflow' / 'generators', 'Workflow'),
+            (mcp_servers / 'coderef-docs' / 'generators', 'coderef-docs'),
+            (mcp_servers / 'coderef-context' / 'src' / 'coderef_context', 'coderef-context'),
+            (mcp_servers / 'papertrail' / 'scripts', 'papertrail'),
+        ]
+        return [(FilePattern(script_dir, '*.py'), server)
+                for script_dir, server in script_locations if self.enabled('scripts', script_dir)]
+
+    def _parse_script_file(self, script_file: Path, server: str, parsed: bool = False) -> List[Resource]:
+        """
+        Describe a Python script from its docstring or first comment. The full
+        docstring is only used when the module is parsed for tools anyway (parsed);
+        every other script costs a read of its first 5 lines.
+        """
+        docstring = None
+        if parsed:
+            try:
+                docstring = self.module_facts.get(script_file).docstring
+            except SyntaxError:
+                pass
+
+        description = ""
+        if docstring:
+            description = docstring.strip().split('\n')[0].strip()
+        else:
+            # Docstring opener or first comment line in the header
+            with open(script_file, 'r', encoding='utf-8') as f:
+                first_lines = [f.readline() for _ in range(5)]
+
+            for line in first_lines:
+                if '"""' in line or "'''" in line or line.strip().startswith('#'):
+                    description = line.strip().replace('"""', '').replace("'''", '').replace('#', '').strip()
+                    if description:
+                        break
+
+        if not description:
+            description = f"Python script: {script_file.stem}"
+
+        category = self._categorize_script(script_file.stem)
+
+        return [self.make_resource(
+            'Script', server, category, script_file.name,
+            description, 'active', str(script_file)
+        )]
 
     def _categorize_script(self, name: str) -> str:
         """Categorize script based on name"""
@@ -288,35 +998,41 @@ class ResourceScanner:
 
     def scan_validators(self):
         """Scan papertrail validators"""
-        print("Scanning validators...")
+        self.resources.extend(self.run_tasks(self.validator_tasks()))
 
-        validator_dir = MCP_SERVERS / 'papertrail' / 'papertrail' / 'validators'
-        if not validator_dir.exists():
-            return
+    def validator_tasks(self) -> List[ScanTask]:
+        """List papertrail validator modules"""
+        self.log("Scanning validators...")
 
-        for py_file in validator_dir.glob('*.py'):
+        tasks = []
+        for py_file in self.find_files(self.validator_pattern(), 'validators'):
             if py_file.name == '__init__.py':
                 continue
 
-            try:
-                with open(py_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
+            tasks.append((self._parse_validator_file, (py_file,),
+                          f"Error parsing {py_file}"))
+
+        return tasks
 
-                tree = ast.parse(content)
+    def validator_pattern(self) -> FilePattern:
+        return FilePattern(self.root_path('MCP_SERVERS') / 'papertrail' / 'papertrail' / 'validators',
+                           '*.py', recursive=False)
 
-                for node in ast.walk(tree):
-                    if isinstance(node, ast.ClassDef) and node.name.endswith('Validator'):
-                        desc = ast.get_docstring(node) or f"Validator for {node.name.replace('Validator', '').lower()}"
-                        desc = desc.split('\n')[0][:100]
+    def _parse_validator_file(self, py_file: Path) -> List[Resource]:
+        """Extract *Validator classes from a validator module"""
+        rows = []
+        for class_name, docstring in self.module_facts.get(py_file).validators:
+            desc = docstring or f"Validator for {class_name.replace('Validator', '').lower()}"
+            desc = desc.split('\n')[0][:100]
 
-                        category = self._categorize_validator(py_file.stem)
+            category = self._categorize_validator(py_file.stem)
 
-                        self.add_resource(
-                            'Validator', 'papertrail', category, node.name,
-                            desc, 'active', str(py_file)
-                        )
-            except Exception as e:
-                self.errors.append(f"Error parsing {py_file}: {e}")
+            rows.append(self.make_resource(
+                'Validator', 'papertrail', category, class_name,
+                desc, 'active', str(py_file)
+            ))
+
+        return rows
 
     def _categorize_validator(self, filename: str) -> str:
         """Categorize validator"""
@@ -332,83 +1048,100 @@ class ResourceScanner:
 
     def scan_schemas(self):
         """Scan all JSON schemas"""
-        print("Scanning schemas...")
+        self.resources.extend(self.run_tasks(self.schema_tasks()))
 
-        schema_dir = MCP_SERVERS / 'papertrail' / 'schemas'
-        if not schema_dir.exists():
-            return
+    def schema_tasks(self) -> List[ScanTask]:
+        """List JSON schema files"""
+        self.log("Scanning schemas...")
 
-        for json_file in schema_dir.rglob('*-schema.json'):
-            try:
-                with open(json_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+        return [
+            (self._parse_schema_file, (json_file,), f"Error reading {json_file}")
+            for json_file in self.find_files(self.schema_pattern(), 'schemas')
+        ]
 
-                desc = data.get('description', f"JSON Schema for {json_file.stem.replace('-schema', '')}")
-                category = json_file.parent.name.capitalize()
+    def schema_pattern(self) -> FilePattern:
+        return FilePattern(self.root_path('MCP_SERVERS') / 'papertrail' / 'schemas', '*-schema.json')
 
-                self.add_resource(
-                    'Schema', 'papertrail', category, json_file.name,
-                    desc, 'active', str(json_file)
-                )
-            except Exception as e:
-                self.errors.append(f"Error reading {json_file}: {e}")
+    def _parse_schema_file(self, json_file: Path) -> List[Resource]:
+        """Describe a JSON schema"""
+        with open(json_file, 'r', encoding='utf-8') as f:
+            PROFILER.file_read(f)
+            data = json.load(f)
+
+        desc = data.get('description', f"JSON Schema for {json_file.stem.replace('-schema', '')}")
+        category = json_file.parent.name.capitalize()
+
+        return [self.make_resource(
+            'Schema', 'papertrail', category, json_file.name,
+            desc, 'active', str(json_file)
+        )]
 
     # ========== RESOURCE SHEETS ==========
 
     def scan_resource_sheets(self):
         """Scan all resource sheet documents"""
-        print("Scanning resource sheets...")
+        self.resources.extend(self.run_tasks(self.resource_sheet_tasks()))
 
+    def resource_sheet_tasks(self) -> List[ScanTask]:
+        """List resource sheet documents"""
+        self.log("Scanning resource sheets...")
+
+        tasks = []
+        for pattern in self.resource_sheet_patterns():
+            for sheet_file in self.find_files(pattern, 'resource_sheets'):
+                tasks.append((self._parse_resource_sheet, (sheet_file,),
+                              f"Error reading {sheet_file}"))
+
+        return tasks
+
+    def resource_sheet_patterns(self) -> List[FilePattern]:
         sheet_locations = [
-            DASHBOARD / 'coderef' / 'resources-sheets',
-            ASSISTANT / 'coderef',
-            MCP_SERVERS / 'coderef-workflow' / 'coderef',
+            self.root_path('DASHBOARD') / 'coderef' / 'resources-sheets',
+            self.root_path('ASSISTANT') / 'coderef',
+            self.root_path('MCP_SERVERS') / 'coderef-workflow' / 'coderef',
         ]
+        return [FilePattern(location, '*-RESOURCE-SHEET.md')
+                for location in sheet_locations if self.enabled('resource_sheets', location)]
 
-        for location in sheet_locations:
-            if not location.exists():
-                continue
-
-            for sheet_file in location.rglob('*-RESOURCE-SHEET.md'):
-                try:
-                    with open(sheet_file, 'r', encoding='utf-8') as f:
-                        content = f.read()
+    def _parse_resource_sheet(self, sheet_file: Path) -> List[Resource]:
+        """Extract subject and description from a resource sheet"""
+        with open(sheet_file, 'r', encoding='utf-8') as f:
+            PROFILER.file_read(f)
+            content = f.read()
 
-                    # Extract YAML frontmatter
-                    yaml_match = re.search(r'^---\s*\n(.*?)\n---', content, re.MULTILINE | re.DOTALL)
+        # Extract YAML frontmatter
+        yaml_match = re.search(r'^---\s*\n(.*?)\n---', content, re.MULTILINE | re.DOTALL)
 
-                    subject = ""
-                    description = ""
+        subject = ""
+        description = ""
 
-                    if yaml_match:
-                        yaml_content = yaml_match.group(1)
-                        subject_match = re.search(r'^subject:\s*(.+)$', yaml_content, re.MULTILINE)
-                        desc_match = re.search(r'^description:\s*(.+)$', yaml_content, re.MULTILINE)
+        if yaml_match:
+            yaml_content = yaml_match.group(1)
+            subject_match = re.search(r'^subject:\s*(.+)$', yaml_content, re.MULTILINE)
+            desc_match = re.search(r'^description:\s*(.+)$', yaml_content, re.MULTILINE)
 
-                        if subject_match:
-                            subject = subject_match.group(1).strip()
-                        if desc_match:
-                            description = desc_match.group(1).strip()
+            if subject_match:
+                subject = subject_match.group(1).strip()
+            if desc_match:
+                description = desc_match.group(1).strip()
 
-                    if not subject:
-                        subject = sheet_file.stem.replace('-RESOURCE-SHEET', '').replace('-', ' ')
+        if not subject:
+            subject = sheet_file.stem.replace('-RESOURCE-SHEET', '').replace('-', ' ')
 
-                    if not description:
-                        # Use first line after frontmatter
-                        lines = content.split('\n')
-                        for line in lines:
-                            if line.strip() and not line.startswith('#') and not line.startswith('---'):
-                                description = line.strip()[:100]
-                                break
+        if not description:
+            # Use first line after frontmatter
+            lines = content.split('\n')
+            for line in lines:
+                if line.strip() and not line.startswith('#') and not line.startswith('---'):
+                    description = line.strip()[:100]
+                    break
 
-                    category = self._categorize_resource_sheet(sheet_file)
+        category = self._categorize_resource_sheet(sheet_file)
 
-                    self.add_resource(
-                        'ResourceSheet', 'documentation', category, subject,
-                        description, 'active', str(sheet_file)
-                    )
-                except Exception as e:
-                    self.errors.append(f"Error reading {sheet_file}: {e}")
+        return [self.make_resource(
+            'ResourceSheet', 'documentation', category, subject,
+            description, 'active', str(sheet_file)
+        )]
 
     def _categorize_resource_sheet(self, file_path: Path) -> str:
         """Categorize resource sheet by directory"""
@@ -429,7 +1162,11 @@ class ResourceScanner:
 
     def scan_workflows(self):
         """Add known workflows"""
-        print("Scanning workflows...")
+        self.resources.extend(self.workflow_rows())
+
+    def workflow_rows(self) -> List[Resource]:
+        """Known multi-step workflows"""
+        self.log("Scanning workflows...")
 
         workflows = [
             ('Workflow', 'Multi-Component', 'Feature Implementation', 'Complete Feature Implementation',
@@ -449,24 +1186,17 @@ class ResourceScanner:
              'active', 'git tag → /add-changelog-entry → gh release create'),
         ]
 
-        for wf in workflows:
-            self.resources.append({
-                'Type': wf[0],
-                'Server': wf[1],
-                'Category': wf[2],
-                'Name': wf[3],
-                'Description': wf[4],
-                'Status': wf[5],
-                'Path': wf[6],
-                'Created': '',
-                'LastUpdated': ''
-            })
+        return [Resource(*wf) for wf in workflows]
 
     # ========== OUTPUT FORMATS ==========
 
     def scan_output_formats(self):
         """Add known output formats"""
-        print("Scanning output formats...")
+        self.resources.extend(self.output_format_rows())
+
+    def output_format_rows(self) -> List[Resource]:
+        """Known output formats"""
+        self.log("Scanning output formats...")
 
         formats = [
             ('Output', 'System', 'Data Format', 'JSON', 'Structured data format (index.json plan.json communication.json)', 'active', '.json'),
@@ -477,27 +1207,25 @@ class ResourceScanner:
             ('Output', 'coderef-dashboard', 'Web', 'HTML', 'Dashboard UI (index.html workorders dashboard)', 'active', '.html'),
         ]
 
-        for fmt in formats:
-            self.resources.append({
-                'Type': fmt[0],
-                'Server': fmt[1],
-                'Category': fmt[2],
-                'Name': fmt[3],
-                'Description': fmt[4],
-                'Status': fmt[5],
-                'Path': fmt[6],
-                'Created': '',
-                'LastUpdated': ''
-            })
+        return [Resource(*fmt) for fmt in formats]
 
     # ========== DASHBOARD TABS ==========
 
     def scan_dashboard_tabs(self):
         """Add dashboard UI tabs"""
-        print("Scanning dashboard tabs...")
+        self.log("Scanning dashboard tabs...")
 
-        tabs_file = DASHBOARD / 'packages' / 'dashboard' / 'src' / 'app' / 'resources' / 'page.tsx'
+        self.resources.extend(self.run_tasks(self.dashboard_tab_tasks()))
 
+    def dashboard_tab_tasks(self) -> List[ScanTask]:
+        """Tabs are stamped from the resources page file"""
+        tabs_file = self.root_path('DASHBOARD') / 'packages' / 'dashboard' / 'src' / 'app' / 'resources' / 'page.tsx'
+        if not self.accepts('tabs', tabs_file):
+            return []
+        return [(self._dashboard_tab_rows, (tabs_file,), f"Error reading {tabs_file}")]
+
+    def _dashboard_tab_rows(self, tabs_file: Path) -> List[Resource]:
+        """Known tabs on the resources page"""
         tabs = [
             ('Tab', 'coderef-dashboard', 'UI Navigation', 'Commands', 'Slash commands reference', 'active', str(tabs_file)),
             ('Tab', 'coderef-dashboard', 'UI Navigation', 'Tools', 'MCP tools reference', 'active', str(tabs_file)),
@@ -507,72 +1235,372 @@ class ResourceScanner:
             ('Tab', 'coderef-dashboard', 'UI Navigation', 'Output', 'Output formats and file structure', 'active', str(tabs_file)),
         ]
 
-        for tab in tabs:
-            self.add_resource(*tab)
+        return [self.make_resource(*tab) for tab in tabs]
+
+    # ========== WORKORDERS ==========
+
+    def workorder_roots(self) -> List[ScanRoot]:
+        """Roots whose profile scans workorders and that have a coderef/ folder"""
+        return [root for root in self.roots.values()
+                if 'workorders' in root.scanners and (root.path / 'coderef').is_dir()]
+
+    def workorder_signatures(self) -> Dict[str, Tuple[Tuple[str, int, int], ...]]:
+        """Workorder folder -> (file name, mtime_ns, size) of its JSON files, from one stat pass"""
+        folders, stats = WorkorderIndex.stat([root.path / 'coderef' for root in self.workorder_roots()])
+        return {str(folder): tuple((name, *stats[file_path]) for name, file_path in found.items())
+                for folder, _, found in folders}
+
+    def workorder_rows(self) -> List[Resource]:
+        """
+        One row per folder in <root>/coderef/workorder and coderef/archived.
+        The JSON files are parsed on a process pool (--jobs); with a workorder
+        index, files unchanged since the last scan are not reopened.
+        """
+        roots = self.workorder_roots()
+        if not roots:
+            return []
+        self.log("Scanning workorders...")
+
+        index = WorkorderIndex(self.workorder_index, self.jobs)
+        index.load()
+        with PROFILER.stage('scan:workorders'):
+            summaries = index.scan([root.path / 'coderef' for root in roots])
+        try:
+            index.save()
+        except OSError as e:
+            print(f"[WARN] Could not write workorder index {self.workorder_index}: {e}")
+        self.errors.extend(index.errors)
+        self.log(f"  Workorder files: {index.parsed} parsed, {index.skipped} unchanged")
+
+        rows = []
+        for root in roots:
+            owned = [wo for wo in summaries
+                     if self.owner(Path(wo.path)) is root and root.allows_file(Path(wo.path))]
+            rows.extend(workorder_rows(owned, root.path.name))
+        return rows
 
     # ========== MAIN EXECUTION ==========
 
-    def scan_all(self):
-        """Scan everything"""
+    def file_tasks(self) -> List[ScanTask]:
+        """Every per-file task, in scanner order, from one fresh discovery walk"""
+        self.discover()
+        tasks: List[ScanTask] = []
+        tasks.extend(self.mcp_tool_tasks())
+        tasks.extend(self.slash_command_tasks())
+        tasks.extend(self.script_tasks())
+        tasks.extend(self.validator_tasks())
+        tasks.extend(self.schema_tasks())
+        tasks.extend(self.resource_sheet_tasks())
+        return tasks
+
+    def iter_resources(self) -> Iterator[Resource]:
+        """Stream every resource row; file scanners run lazily as rows are consumed"""
+        # File scanners share one task list so --jobs spreads work across all of them
+        yield from self.iter_tasks(self.file_tasks())
+        yield from self.workflow_rows()
+        yield from self.output_format_rows()
+        self.log("Scanning dashboard tabs...")
+        yield from self.iter_tasks(self.dashboard_tab_tasks())
+        yield from self.workorder_rows()
+
+    def _print_banner(self):
         print("="*60)
         print("COMPREHENSIVE ECOSYSTEM SCAN")
         print("="*60)
+        for root in self.roots.values():
+            state = "" if root.path.is_dir() else " [missing]"
+            print(f"  {root.name:16} {root.path}{state}")
 
-        self.scan_mcp_tools()
-        self.scan_slash_commands()
-        self.scan_scripts()
-        self.scan_validators()
-        self.scan_schemas()
-        self.scan_resource_sheets()
-        self.scan_workflows()
-        self.scan_output_formats()
-        self.scan_dashboard_tabs()
+    def _print_summary(self, total: int):
+        print(f"\nTotal resources scanned: {total}")
 
-        print(f"\nTotal resources scanned: {len(self.resources)}")
+        if self.cache is not None:
+            with PROFILER.stage('cache save'):
+                self.cache.save()
+            print(f"Scan cache: {self.cache.hits} unchanged, {self.cache.misses} re-parsed")
 
         if self.errors:
             print(f"\nWarnings: {len(self.errors)}")
             for error in self.errors[:10]:
                 print(f"  - {error}")
 
+    def scan_all(self):
+        """Scan everything into self.resources"""
+        self._print_banner()
+        self.resources.extend(self.iter_resources())
+        self._print_summary(len(self.resources))
         return self.resources
 
-    def write_csv(self, output_path: Path):
-        """Write resources to CSV"""
-        # Sort by Type, Server, Category, Name
-        sorted_resources = sorted(self.resources, key=lambda x: (x['Type'], x['Server'], x['Category'], x['Name']))
+    def scan_to_csv(self, output_path: Path, db_path: Optional[Path] = None,
+                    snapshot_path: Optional[Path] = None, search_path: Optional[Path] = None) -> int:
+        """Scan everything straight into the sorted CSV writer without building self.resources"""
+        self._print_banner()
+        with PROFILER.stage('scan + write csv'):
+            total = self.write_csv(output_path, self.iter_resources())
+        if db_path:
+            with PROFILER.stage('sqlite'):
+                self.write_db(output_path, db_path)
+        if snapshot_path:
+            with PROFILER.stage('snapshot'):
+                self.write_snapshot(output_path, snapshot_path)
+        if search_path:
+            with PROFILER.stage('search index'):
+                self.write_search_index(output_path, search_path)
+        self._print_summary(total)
+        return total
+
+    def write_shard_manifest(self, output_path: Path, total: int):
+        """Mark a scan output as a mergeable shard: row count, content hash, provenance"""
+        manifest = write_shard_manifest(output_path, total, {
+            'roots': {name: {'path': str(root.path), 'scanners': sorted(root.scanners)}
+                      for name, root in self.roots.items()},
+            'scanner': scanner_fingerprint(),
+            'errors': len(self.errors),
+        })
+        print(f"[OK] Shard manifest written to: {shard_manifest_path(output_path)} ({manifest['sha256'][:12]})")
 
-        with open(output_path, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=[
-                'Type', 'Server', 'Category', 'Name', 'Description', 'Status', 'Path', 'Created', 'LastUpdated'
-            ])
-            writer.writeheader()
-            writer.writerows(sorted_resources)
+    def write_csv(self, output_path: Path, resources: Optional[Iterable[Resource]] = None) -> int:
+        """Write resources (default: self.resources) to CSV sorted by Type, Server, Category, Name"""
+        rows = self.resources if resources is None else resources
+        total, type_counts = write_sorted_csv(rows, output_path)
 
         print(f"\n[OK] CSV written to: {output_path}")
-        print(f"[OK] Total rows: {len(sorted_resources)}")
+        print(f"[OK] Total rows: {total}")
 
         # Print breakdown
-        type_counts = {}
-        for r in sorted_resources:
-            type_counts[r['Type']] = type_counts.get(r['Type'], 0) + 1
-
         print("\nBreakdown by type:")
         for rtype, count in sorted(type_counts.items()):
             print(f"  {rtype:15} {count:4}")
 
+        return total
+
+    def write_db(self, csv_path: Path, db_path: Path):
+        """Load a written CSV into an indexed SQLite catalog (same rows, same order)"""
+        write_catalog_db(iter_catalog(csv_path), db_path)
+        print(f"[OK] SQLite catalog written to: {db_path}")
+
+    def write_snapshot(self, csv_path: Path, snapshot_path: Path):
+        """Gzip JSON snapshot of a written CSV; left untouched if its content hash is unchanged"""
+        content_hash, rewritten = write_snapshot(iter_catalog(csv_path), snapshot_path, file_sha256(csv_path))
+        state = 'written to' if rewritten else 'unchanged at'
+        print(f"[OK] JSON snapshot {state}: {snapshot_path} ({content_hash[:12]})")
+
+    def write_search_index(self, csv_path: Path, search_path: Path):
+        """Search index of a written CSV; an existing index only re-indexes changed rows"""
+        _, counts = update_search_index(iter_catalog(csv_path), search_path, csv_path)
+        state = 'rebuilt' if counts is None else 'updated'
+        print(f"[OK] Search index {state}: {search_path}")
+
+
+# ========== WATCH MODE ==========
+
+def load_pipeline_script(filename: str):
+    """Import a sibling pipeline script (hyphenated names are not importable directly)"""
+    spec = importlib.util.spec_from_file_location(filename[:-3].replace('-', '_'), RESOURCES_DIR / filename)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class CatalogWatcher:
+    """
+    Keeps scanned rows in memory, polls the scanned roots, re-parses only changed
+    files and atomically rewrites the merged catalog after changes settle.
+    """
+
+    def __init__(self, scanner: ResourceScanner, output_path: Path,
+                 interval: float = 1.0, debounce: float = 0.3):
+        self.scanner = scanner
+        self.output_path = output_path
+        self.interval = interval
+        self.debounce = debounce
+        self.merge = load_pipeline_script('merge-and-dedupe.py')
+        self.old_resources: List[Resource] = []
+        self.static_rows: List[Resource] = []
+        self.order: List[str] = []
+        self.rows: Dict[str, List[Resource]] = {}
+        self.signatures: Dict[str, Optional[tuple]] = {}
+
+    def _signature(self, file_path: Path) -> Optional[Tuple[int, int, str]]:
+        try:
+            stat = file_path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, self.scanner.git_index.head_for(file_path)
+
+    def snapshot(self) -> Tuple[List[ScanTask], Dict[str, Optional[tuple]]]:
+        """Discover current tasks and stat their files, plus every workorder folder's JSON files"""
+        self.scanner.git_index.refresh_heads()
+        tasks = self.scanner.file_tasks() + self.scanner.dashboard_tab_tasks()
+        signatures = {task_key(task): self._signature(task[1][0]) for task in tasks}
+        # Workorder rows are rebuilt in write_catalog; their files only need to trigger it
+        signatures.update((f'workorder|{folder}', files)
+                          for folder, files in self.scanner.workorder_signatures().items())
+        return tasks, signatures
+
+    def apply(self, tasks: List[ScanTask], signatures: Dict) -> Tuple[int, int]:
+        """Re-parse changed tasks, drop removed ones; returns (changed, removed)"""
+        dirty = [task for task in tasks
+                 if task_key(task) not in self.rows or signatures[task_key(task)] != self.signatures.get(task_key(task))]
+        removed = set(self.rows) - set(signatures)
+
+        self.scanner.errors = []
+        for task, (rows, error) in zip(dirty, self.scanner.map_tasks(dirty)):
+            self.rows[task_key(task)] = rows
+            if error:
+                self.scanner.errors.append(error)
+        for key in removed:
+            del self.rows[key]
+
+        self.order = [task_key(task) for task in tasks]
+        self.signatures = signatures
+        return len(dirty), len(removed)
+
+    def write_catalog(self):
+        """Merge in-memory rows with the old CSV and replace the catalog"""
+        scanned = [row for key in self.order for row in self.rows[key]]
+        scanned.extend(self.static_rows)
+        # Workorder JSON is re-checked on every rebuild (only changed files are parsed)
+        scanned.extend(self.scanner.workorder_rows())
+        merged, _ = self.merge.merge_resources(scanned, self.old_resources)
+        # Delta against the catalog's previous version: what this rebuild changed
+        self.merge.write_csv(merged, self.output_path,
+                             db_path=catalog_db_path(self.output_path),
+                             snapshot_path=catalog_snapshot_path(self.output_path),
+                             delta_path=catalog_delta_path(self.output_path),
+                             delta_base=self.output_path,
+                             search_path=catalog_search_path(self.output_path))
+
+    def rebuild(self, tasks: List[ScanTask], signatures: Dict) -> Tuple[int, int]:
+        """Apply a settled snapshot and rewrite the catalog; returns (changed, removed)"""
+        changed, removed = self.apply(tasks, signatures)
+        self.write_catalog()
+        return changed, removed
+
+    def start(self):
+        """Initial full scan into memory"""
+        self.old_resources = self.merge.read_csv(self.merge.OLD_CSV)
+
+        self.static_rows = self.scanner.workflow_rows() + self.scanner.output_format_rows()
+
+        self.scanner.verbose = False
+        changed, _ = self.rebuild(*self.snapshot())
+        print(f"[WATCH] Initial scan: {changed} files")
+
+    def run(self):
+        """Poll until interrupted"""
+        self.start()
+        print(f"[WATCH] Watching for changes every {self.interval}s (Ctrl+C to stop)")
+
+        try:
+            while True:
+                time.sleep(self.interval)
+                tasks, signatures = self.snapshot()
+                if signatures == self.signatures:
+                    continue
+
+                # Debounce: wait until a burst of edits (e.g. git checkout) settles
+                while True:
+                    time.sleep(self.debounce)
+                    next_tasks, next_signatures = self.snapshot()
+                    if next_signatures == signatures:
+                        break
+                    tasks, signatures = next_tasks, next_signatures
+
+                started = time.perf_counter()
+                changed, removed = self.rebuild(tasks, signatures)
+                elapsed = (time.perf_counter() - started) * 1000
+                print(f"[WATCH] {changed} changed, {removed} removed -> catalog updated in {elapsed:.0f} ms")
+                for error in self.scanner.errors[:10]:
+                    print(f"  - {error}")
+        except KeyboardInterrupt:
+            print("\n[WATCH] Stopped")
+        finally:
+            if self.scanner.cache is not None:
+                self.scanner.cache.save()
+
 
 def main():
     """Main execution"""
-    scanner = ResourceScanner()
-    scanner.scan_all()
-    scanner.write_csv(OUTPUT_CSV)
+    parser = argparse.ArgumentParser(description='Build single source of truth CSV')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='Parallel scan workers (default: 1, serial)')
+    parser.add_argument('--full', action='store_true',
+                        help='Ignore the scan cache and re-parse every file')
+    parser.add_argument('--hash', action='store_true',
+                        help='Also compare content hashes when mtime/size changed')
+    parser.add_argument('--watch', action='store_true',
+                        help='Keep running and rewrite the merged catalog when files change')
+    parser.add_argument('--interval', type=float, default=1.0,
+                        help='Watch mode poll interval in seconds (default: 1.0)')
+    parser.add_argument('--debounce', type=float, default=0.3,
+                        help='Watch mode quiet period before rebuilding (default: 0.3)')
+    parser.add_argument('--catalog', type=Path, default=CATALOG_CSV,
+                        help='Watch mode output (default: tools-and-commands.csv)')
+    parser.add_argument('--sqlite', action='store_true',
+                        help='Also write an indexed SQLite catalog next to the output CSV')
+    parser.add_argument('--snapshot', action='store_true',
+                        help='Also write the gzip JSON snapshot next to the output CSV')
+    parser.add_argument('--search', action='store_true',
+                        help='Also write the search index next to the output CSV')
+    parser.add_argument('--config', type=Path, default=Path(os.environ.get('CODEREF_SCAN_CONFIG', SCAN_CONFIG)),
+                        help='Scan roots and profiles (default: scan-config.json, or $CODEREF_SCAN_CONFIG)')
+    parser.add_argument('--roots', default=None,
+                        help='Comma-separated root names to scan (default: all configured roots)')
+    parser.add_argument('--output', '-o', type=Path, default=OUTPUT_CSV,
+                        help='Scan output CSV (default: scanned-resources-temp.csv)')
+    parser.add_argument('--shard', action='store_true',
+                        help='Also write <output>.manifest.json so merge-and-dedupe.py --shards can combine outputs')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    if args.watch and (args.timings or args.profile):
+        parser.error("--timings/--profile profile a single scan; they cannot be combined with --watch")
+
+    if args.config.exists():
+        try:
+            roots = load_scan_config(args.config)
+        except (ValueError, json.JSONDecodeError) as e:
+            parser.error(f"Invalid scan config: {e}")
+    else:
+        print(f"[WARN] No scan config at {args.config}; using built-in roots")
+        roots = default_scan_roots()
+
+    if args.roots:
+        selected = [name.strip() for name in args.roots.split(',') if name.strip()]
+        unknown = [name for name in selected if name not in roots]
+        if unknown:
+            parser.error(f"Unknown root(s): {', '.join(unknown)} (configured: {', '.join(roots)})")
+        roots = {name: roots[name] for name in selected}
+
+    cache = ScanCache(SCAN_CACHE, use_hash=args.hash)
+    if not args.full:
+        cache.load()
+
+    scanner = ResourceScanner(jobs=args.jobs, cache=cache, roots=roots, workorder_index=WORKORDER_INDEX)
+
+    if args.watch:
+        watcher = CatalogWatcher(scanner, args.catalog, args.interval, args.debounce)
+        try:
+            watcher.run()
+        except FileNotFoundError as e:
+            print(f"[ERROR] Watch mode needs the merge inputs: {e}")
+            sys.exit(1)
+        return
+
+    with profile_session(args, 'total'):
+        total = scanner.scan_to_csv(args.output,
+                                    catalog_db_path(args.output) if args.sqlite else None,
+                                    catalog_snapshot_path(args.output) if args.snapshot else None,
+                                    catalog_search_path(args.output) if args.search else None)
+        if args.shard:
+            scanner.write_shard_manifest(args.output, total)
 
     print("\n" + "="*60)
     print("SCAN COMPLETE")
     print("="*60)
     print(f"\nNext steps:")
-    print(f"1. Review: {OUTPUT_CSV}")
+    print(f"1. Review: {args.output}")
     print(f"2. Delete old CSV files")
     print(f"3. Rename FINAL-tools-and-commands.csv → tools-and-commands.csv")
 
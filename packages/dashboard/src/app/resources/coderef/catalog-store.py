@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Catalog snapshot store
+Take, list and restore deduplicated snapshots of catalog CSVs (replaces full backup copies)
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+# Shared pipeline modules live next to this script
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from catalog_store import CatalogStore
+
+RESOURCES_DIR = Path(__file__).parent
+STORE_DIR = RESOURCES_DIR / "catalog-store"
+CATALOG_CSV = RESOURCES_DIR / "tools-and-commands.csv"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Deduplicated snapshots of resource catalog CSVs')
+    parser.add_argument('--store', type=Path, default=STORE_DIR, help='Store directory (default: catalog-store/)')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    snapshot = commands.add_parser('snapshot', help='Snapshot one or more CSVs, in the order given')
+    snapshot.add_argument('csv', type=Path, nargs='*', default=[CATALOG_CSV],
+                          help='CSV files (default: tools-and-commands.csv)')
+    snapshot.add_argument('--label', default='',
+                          help='Note stored with the snapshot, or added to it if the content is unchanged (default: file name)')
+
+    commands.add_parser('list', help='List snapshots and store size')
+
+    restore = commands.add_parser('restore', help='Write a snapshot back to CSV')
+    restore.add_argument('id', help='Snapshot id (see list)')
+    restore.add_argument('--output', '-o', type=Path, required=True, help='CSV to write')
+    args = parser.parse_args()
+
+    store = CatalogStore(args.store)
+    try:
+        if args.command == 'snapshot':
+            for csv_path in args.csv:
+                snapshot_id, new_rows = store.snapshot(csv_path, args.label or csv_path.name)
+                info = store.info(snapshot_id)
+                print(f"[OK] {csv_path.name}: snapshot {snapshot_id} ({info.rows} rows, {new_rows} newly stored)")
+
+        elif args.command == 'list':
+            snapshots = store.list()
+            print(f"  {'Id':6} {'Created':26} {'Rows':>6}  Label")
+            for info in snapshots:
+                print(f"  {info.id:6} {info.created[:19]:26} {info.rows:6}  {', '.join(info.labels)}")
+            print(f"\n{len(snapshots)} snapshot(s), {store.disk_usage() / 1024:.1f} KiB on disk, "
+                  f"{len(store.pack_index())} distinct rows")
+
+        else:
+            identical = store.restore(args.id, args.output)
+            print(f"[OK] Snapshot {args.id} restored to: {args.output}")
+            if not identical:
+                print("[WARN] Restored file is not byte-identical to the original")
+    except (OSError, ValueError) as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
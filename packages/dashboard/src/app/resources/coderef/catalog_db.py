@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+SQLite catalog output
+Same rows as the catalog CSV, indexed for paging/filtering plus FTS5 search
+"""
+
+import os
+import sqlite3
+from pathlib import Path
+from typing import Iterable
+
+from catalog_io import FIELDNAMES, Resource
+
+SCHEMA_VERSION = 1
+
+# Columns with a plain B-tree index (filters and sort keys used by the dashboard)
+INDEXED_FIELDS = ['Type', 'Server', 'Category', 'Name']
+
+_COLUMNS = ', '.join(FIELDNAMES)
+_PLACEHOLDERS = ', '.join('?' * len(FIELDNAMES))
+
+
+def catalog_db_path(csv_path: Path) -> Path:
+    """The SQLite file written next to a catalog CSV"""
+    csv_path = Path(csv_path)
+    return csv_path.with_suffix('.db')
+
+
+def _create_schema(conn: sqlite3.Connection) -> bool:
+    """Create tables and indexes; returns False if this SQLite build lacks FTS5"""
+    columns = ', '.join(f'{field} TEXT NOT NULL' for field in FIELDNAMES)
+    conn.execute(f'CREATE TABLE resources (id INTEGER PRIMARY KEY, {columns})')
+    for field in INDEXED_FIELDS:
+        conn.execute(f'CREATE INDEX idx_resources_{field.lower()} ON resources ({field})')
+    conn.execute('CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+    conn.execute("INSERT INTO meta VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),))
+
+    try:
+        # External-content table: the text lives once, in resources
+        conn.execute("CREATE VIRTUAL TABLE resources_fts USING fts5("
+                     "Name, Description, content='resources', content_rowid='id')")
+    except sqlite3.OperationalError:
+        return False
+    return True
+
+
+def write_catalog_db(rows: Iterable[Resource], db_path: Path) -> int:
+    """
+    Build a fresh SQLite catalog from rows (kept in the given order) and atomically
+    replace db_path. All inserts run in one transaction. Returns the row count.
+    """
+    db_path = Path(db_path)
+    tmp_path = db_path.with_name(db_path.name + '.tmp')
+    if tmp_path.exists():
+        tmp_path.unlink()
+
+    conn = sqlite3.connect(tmp_path)
+    try:
+        # Throwaway file until the rename: no journal, no fsync per page
+        conn.execute('PRAGMA journal_mode = OFF')
+        conn.execute('PRAGMA synchronous = OFF')
+        with conn:
+            has_fts = _create_schema(conn)
+            cursor = conn.executemany(f'INSERT INTO resources ({_COLUMNS}) VALUES ({_PLACEHOLDERS})', rows)
+            count = cursor.rowcount
+            if has_fts:
+                conn.execute("INSERT INTO resources_fts (resources_fts) VALUES ('rebuild')")
+            conn.execute("INSERT INTO meta VALUES ('row_count', ?)", (str(count),))
+        conn.execute('PRAGMA optimize')
+    finally:
+        conn.close()
+
+    if not has_fts:
+        print(f"[WARN] SQLite {sqlite3.sqlite_version} has no FTS5; {db_path.name} has no search table")
+
+    os.replace(tmp_path, db_path)
+    return count
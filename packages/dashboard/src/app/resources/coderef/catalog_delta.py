@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Catalog deltas
+Added, removed and changed rows between two catalog CSVs, keyed on (Type, Server, Name),
+written as JSON Lines so consumers can patch their copy instead of re-fetching it
+"""
+
+import json
+import os
+from itertools import groupby
+from operator import itemgetter
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from catalog_io import FIELDNAMES, Resource, iter_catalog, sorted_rows, write_sorted_csv
+from catalog_shards import file_sha256
+
+DELTA_FORMAT = 1
+
+KEY_FIELDS = ['Type', 'Server', 'Name']
+VALUE_FIELDS = [field for field in FIELDNAMES if field not in KEY_FIELDS]
+
+# Catalogs are sorted by Type, Server first: rows sharing a key are always in one group
+group_key = itemgetter(0, 1)
+
+Key = Tuple[str, str, str]
+
+
+class DeltaOp(NamedTuple):
+    """One row-level change; row is the new row for add/change and the old row for remove"""
+    op: str  # 'add', 'remove' or 'change'
+    key: Key
+    row: Resource
+    fields: Dict[str, Tuple[str, str]]  # change only: field -> (old, new)
+
+
+class UnsortedCatalog(ValueError):
+    """A row stream is not grouped by (Type, Server) in ascending order"""
+
+
+def catalog_delta_path(csv_path: Path) -> Path:
+    """The delta file written next to a catalog CSV"""
+    return Path(csv_path).with_suffix('.delta.jsonl')
+
+
+# ========== DIFF ==========
+
+def _groups(rows: Iterable[Resource]) -> Iterator[Tuple[Tuple[str, str], List[Resource]]]:
+    previous = None
+    for group, members in groupby(rows, key=group_key):
+        if previous is not None and group <= previous:
+            raise UnsortedCatalog(f"rows are not sorted by Type, Server (at {'/'.join(group)})")
+        previous = group
+        yield group, list(members)
+
+
+def _diff_group(old_rows: List[Resource], new_rows: List[Resource], stats: Dict) -> Iterator[DeltaOp]:
+    """Hash join of one (Type, Server) group on Name; the first row wins on repeated keys"""
+    old_by_name: Dict[str, Resource] = {}
+    for row in old_rows:
+        if old_by_name.setdefault(row.Name, row) is not row:
+            stats['duplicates'] += 1
+
+    seen = set()
+    for row in new_rows:
+        if row.Name in seen:
+            stats['duplicates'] += 1
+            continue
+        seen.add(row.Name)
+
+        old = old_by_name.pop(row.Name, None)
+        if old is None:
+            stats['added'] += 1
+            yield DeltaOp('add', row.key, row, {})
+        elif old != row:
+            stats['changed'] += 1
+            fields = {field: (getattr(old, field), getattr(row, field))
+                      for field in VALUE_FIELDS if getattr(old, field) != getattr(row, field)}
+            yield DeltaOp('change', row.key, row, fields)
+        else:
+            stats['unchanged'] += 1
+
+    for row in old_by_name.values():
+        stats['removed'] += 1
+        yield DeltaOp('remove', row.key, row, {})
+
+
+def diff_rows(old_rows: Iterable[Resource], new_rows: Iterable[Resource],
+              stats: Optional[Dict] = None) -> Iterator[DeltaOp]:
+    """
+    Merge-join two row streams sorted by (Type, Server), hash-joining each group on Name.
+    Linear time; memory is the largest (Type, Server) group. Raises UnsortedCatalog
+    (possibly after some ops were yielded) if either stream is out of order.
+    """
+    if stats is None:
+        stats = {}
+    stats.update({'added': 0, 'removed': 0, 'changed': 0, 'unchanged': 0, 'duplicates': 0})
+
+    old_groups, new_groups = _groups(old_rows), _groups(new_rows)
+    old, new = next(old_groups, None), next(new_groups, None)
+    while old is not None or new is not None:
+        if new is None or (old is not None and old[0] < new[0]):
+            yield from _diff_group(old[1], [], stats)
+            old = next(old_groups, None)
+        elif old is None or new[0] < old[0]:
+            yield from _diff_group([], new[1], stats)
+            new = next(new_groups, None)
+        else:
+            yield from _diff_group(old[1], new[1], stats)
+            old, new = next(old_groups, None), next(new_groups, None)
+
+
+def _catalog_rows(path: Path, presort: bool) -> Iterator[Resource]:
+    rows = iter_catalog(path)
+    # Stable external sort: rows keep their file order within a group
+    return sorted_rows(rows, key=group_key) if presort else rows
+
+
+# ========== DELTA FILES ==========
+
+def _encode(op: DeltaOp) -> Dict:
+    if op.op == 'add':
+        return {'op': 'add', 'row': op.row.to_row()}
+    if op.op == 'remove':
+        return {'op': 'remove', 'key': list(op.key)}
+    return {'op': 'change', 'key': list(op.key), 'fields': {field: list(pair) for field, pair in op.fields.items()}}
+
+
+def write_delta(old_path: Path, new_path: Path, delta_path: Path, old_name: Optional[str] = None) -> Dict:
+    """
+    Diff two catalog files into delta_path and return the summary counts.
+    old_name labels the earlier catalog when old_path is a temporary copy.
+    Pipeline catalogs are already sorted; anything else (e.g. an old hand-edited
+    backup) is detected and diffed again through an external sort.
+    """
+    old_path, new_path, delta_path = Path(old_path), Path(new_path), Path(delta_path)
+    header = {
+        'format': DELTA_FORMAT,
+        'key': KEY_FIELDS,
+        'from': {'file': old_name or old_path.name, 'sha256': file_sha256(old_path)},
+        'to': {'file': new_path.name, 'sha256': file_sha256(new_path)},
+    }
+    tmp_path = delta_path.with_name(delta_path.name + '.tmp')
+
+    for presort in (False, True):
+        stats: Dict = {}
+        try:
+            with open(tmp_path, 'w', encoding='utf-8', newline='\n') as f:
+                f.write(json.dumps(header, ensure_ascii=False) + '\n')
+                ops = diff_rows(_catalog_rows(old_path, presort), _catalog_rows(new_path, presort), stats)
+                for op in ops:
+                    f.write(json.dumps(_encode(op), ensure_ascii=False) + '\n')
+                f.write(json.dumps({'summary': stats}) + '\n')
+            break
+        except UnsortedCatalog:
+            if presort:
+                tmp_path.unlink(missing_ok=True)
+                raise
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+    os.replace(tmp_path, delta_path)
+    return stats
+
+
+def read_delta(delta_path: Path) -> Tuple[Dict, List[Dict], Dict]:
+    """(header, ops, summary) of a delta file; raises ValueError if it is not one"""
+    with open(delta_path, 'r', encoding='utf-8') as f:
+        lines = [json.loads(line) for line in f if line.strip()]
+    if len(lines) < 2 or lines[0].get('format') != DELTA_FORMAT or 'summary' not in lines[-1]:
+        raise ValueError(f"{delta_path}: not a format {DELTA_FORMAT} catalog delta")
+    return lines[0], lines[1:-1], lines[-1]['summary']
+
+
+def apply_delta(base_path: Path, delta_path: Path, output_path: Path) -> Tuple[int, bool]:
+    """
+    Patch base_path with a delta and write the sorted result to output_path.
+    The base must be the delta's "from" catalog (checked by hash), and every
+    changed row must still hold its old values. Returns (rows written, whether
+    the output is byte-identical to the delta's "to" catalog).
+    """
+    header, ops, _ = read_delta(delta_path)
+    if file_sha256(base_path) != header['from']['sha256']:
+        raise ValueError(f"{base_path} is not the catalog this delta was made from ({header['from']['file']})")
+
+    removed = {tuple(op['key']) for op in ops if op['op'] == 'remove'}
+    changed = {tuple(op['key']): op['fields'] for op in ops if op['op'] == 'change'}
+    added = [Resource.from_row(op['row']) for op in ops if op['op'] == 'add']
+
+    def patched() -> Iterator[Resource]:
+        for row in iter_catalog(base_path):
+            if row.key in removed:
+                continue
+            fields = changed.get(row.key)
+            if fields:
+                for field, (old, _) in fields.items():
+                    if getattr(row, field) != old:
+                        raise ValueError(f"{'/'.join(row.key)}: {field} does not match the delta's old value")
+                row = row._replace(**{field: new for field, (_, new) in fields.items()})
+            yield row
+        yield from added
+
+    count, _ = write_sorted_csv(patched(), output_path)
+    return count, file_sha256(output_path) == header['to']['sha256']
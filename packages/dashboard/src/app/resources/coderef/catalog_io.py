@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Catalog record type and CSV streaming helpers
+Shared by build-source-of-truth.py, merge-and-dedupe.py and validate-csv.py
+"""
+
+import codecs
+import csv
+import heapq
+import io
+import os
+import sys
+import tempfile
+from operator import itemgetter
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, TextIO, Tuple
+
+from catalog_profile import PROFILER
+
+FIELDNAMES = ['Type', 'Server', 'Category', 'Name', 'Description', 'Status', 'Path', 'Created', 'LastUpdated']
+
+# Low-cardinality columns: one shared string object per distinct value
+INTERNED_FIELDS = frozenset(['Type', 'Server', 'Category', 'Status'])
+
+# Rows held in memory before sorted runs are spilled to disk
+EXTERNAL_SORT_THRESHOLD = 50_000
+
+# Bytes inspected to pick an encoding when there is no BOM
+ENCODING_SAMPLE_BYTES = 64 * 1024
+
+# Longest BOMs first: the UTF-32 LE BOM starts with the UTF-16 LE one
+_BOMS = [
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
+# Last resort when the detected encoding fails past the sample
+FALLBACK_ENCODING = 'cp1252'
+
+
+class Resource(NamedTuple):
+    """One catalog row; field order matches the CSV columns"""
+    Type: str
+    Server: str
+    Category: str
+    Name: str
+    Description: str = ''
+    Status: str = ''
+    Path: str = ''
+    Created: str = ''
+    LastUpdated: str = ''
+
+    @classmethod
+    def from_values(cls, values: Sequence[Optional[str]]) -> 'Resource':
+        """Build from a CSV value list in FIELDNAMES order, interning repeated strings"""
+        values = [value or '' for value in values]
+        for i in _INTERNED_INDEXES:
+            values[i] = sys.intern(values[i])
+        return cls._make(values)
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Optional[str]]) -> 'Resource':
+        """Build from a csv.DictReader row; missing columns become ''"""
+        return cls.from_values([row.get(field) for field in FIELDNAMES])
+
+    def to_row(self) -> Dict[str, str]:
+        """csv.DictWriter-compatible row"""
+        return self._asdict()
+
+    @property
+    def key(self) -> Tuple[str, str, str]:
+        """Dedupe identity: (Type, Server, Name)"""
+        return self.Type, self.Server, self.Name
+
+
+_INTERNED_INDEXES = [i for i, field in enumerate(FIELDNAMES) if field in INTERNED_FIELDS]
+
+# Sort by Type, Server, Category, Name (C-level tuple slice, no per-row lambda)
+sort_key: Callable[[Resource], Tuple[str, str, str, str]] = itemgetter(0, 1, 2, 3)
+
+
+def read_resources(f: TextIO) -> Iterator[Resource]:
+    """Stream Resource records from an open CSV file with a header row"""
+    for row in csv.DictReader(f):
+        yield Resource.from_row(row)
+
+
+def detect_encoding(sample: bytes) -> str:
+    """Pick an encoding from the BOM, else from a bounded sample of the file"""
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return encoding
+
+    # BOM-less UTF-16: mostly-ASCII text has a NUL in every other byte
+    if sample.count(b'\x00') > len(sample) // 4:
+        return 'utf-16-le' if sample[1:2] == b'\x00' else 'utf-16-be'
+
+    try:
+        # Incremental decode: a multi-byte character cut off at the sample end is fine
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return FALLBACK_ENCODING
+
+
+def iter_catalog(path: Path, encoding: Optional[str] = None) -> Iterator[Resource]:
+    """
+    Stream Resource records from a catalog CSV in one decode-and-parse pass.
+    The encoding is detected from the first ENCODING_SAMPLE_BYTES unless given.
+    """
+    with open(path, 'rb') as raw:
+        PROFILER.file_read(raw)
+        if encoding is None:
+            encoding = detect_encoding(raw.read(ENCODING_SAMPLE_BYTES))
+            raw.seek(0)
+        with io.TextIOWrapper(raw, encoding=encoding, newline='') as text:
+            yield from read_resources(text)
+
+
+def load_catalog(path: Path) -> List[Resource]:
+    """
+    Read a whole catalog CSV (any backup encoding) into a list.
+    If a byte past the sample breaks the detected encoding, the partial result is
+    discarded and the file is parsed again as FALLBACK_ENCODING.
+    """
+    try:
+        return list(iter_catalog(path))
+    except UnicodeDecodeError:
+        pass
+
+    try:
+        return list(iter_catalog(path, FALLBACK_ENCODING))
+    except UnicodeDecodeError as e:
+        raise ValueError(f"Could not read {path}: {e}") from e
+
+
+def _spill(rows: List[Resource]):
+    """Write one sorted run to an anonymous temp file"""
+    run = tempfile.TemporaryFile('w+', newline='', encoding='utf-8')
+    csv.writer(run).writerows(rows)
+    run.seek(0)
+    return run
+
+
+def _read_run(run) -> Iterator[Resource]:
+    for values in csv.reader(run):
+        yield Resource.from_values(values)
+
+
+def sorted_rows(rows: Iterable[Resource], key: Callable[[Resource], Tuple] = sort_key,
+                threshold: int = EXTERNAL_SORT_THRESHOLD) -> Iterator[Resource]:
+    """
+    Stable sort of a row stream with bounded memory.
+    Below threshold rows this is a plain in-memory sort; above it, sorted runs of
+    threshold rows are spilled to temp files and heap-merged.
+    """
+    buffer: List[Resource] = []
+    runs = []
+    try:
+        for row in rows:
+            buffer.append(row)
+            if len(buffer) >= threshold:
+                buffer.sort(key=key)
+                runs.append(_spill(buffer))
+                buffer = []
+
+        buffer.sort(key=key)
+        if not runs:
+            yield from buffer
+            return
+
+        # heapq.merge takes ties from earlier runs first, so the merge stays stable
+        runs.append(_spill(buffer))
+        buffer = []
+        yield from heapq.merge(*(_read_run(run) for run in runs), key=key)
+    finally:
+        for run in runs:
+            run.close()
+
+
+def write_sorted_csv(rows: Iterable[Resource], output_path: Path,
+                     threshold: int = EXTERNAL_SORT_THRESHOLD) -> Tuple[int, Dict[str, int]]:
+    """
+    Sort and write rows to output_path via temp file + rename.
+    Returns (row count, counts by Type).
+    """
+    output_path = Path(output_path)
+    tmp_path = output_path.with_name(output_path.name + '.tmp')
+    count = 0
+    type_counts: Dict[str, int] = {}
+
+    try:
+        with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(FIELDNAMES)
+            for row in sorted_rows(rows, threshold=threshold):
+                writer.writerow(row)
+                count += 1
+                type_counts[row.Type] = type_counts.get(row.Type, 0) + 1
+    except BaseException:
+        # A failing input stream (e.g. a bad shard) must not leave a partial file behind
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    os.replace(tmp_path, output_path)
+    return count, type_counts
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Pipeline timing and profiling hooks
+Stage and per-file timings, counters (subprocesses, files and bytes read) and an
+optional cProfile dump, shared by the scanner, merge-and-dedupe.py and validate-csv.py
+"""
+
+import argparse
+import cProfile
+import heapq
+import json
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, IO, List, Tuple
+
+# Slowest files listed in the summary (--profile-top)
+PROFILE_TOP = 10
+
+
+class Profiler:
+    """
+    Collects timings from any thread. Every hook is a cheap no-op until enable(),
+    so the pipeline calls them unconditionally.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.top = PROFILE_TOP
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.stages: Dict[str, List[float]] = {}   # name -> [seconds, calls]
+        self.counters: Counter = Counter()
+        self._slowest: List[Tuple[float, str, str]] = []  # min-heap of (seconds, stage, path)
+
+    def enable(self, top: int = PROFILE_TOP):
+        self.enabled = True
+        self.top = top
+
+    def add_time(self, name: str, seconds: float):
+        with self._lock:
+            entry = self.stages.setdefault(name, [0.0, 0])
+            entry[0] += seconds
+            entry[1] += 1
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time a block; repeated and concurrent blocks with one name add up"""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def record_file(self, stage: str, path, seconds: float):
+        """Per-file time: added to the stage and kept if among the slowest files"""
+        if not self.enabled:
+            return
+        self.add_time(stage, seconds)
+        item = (seconds, stage, str(path))
+        with self._lock:
+            if len(self._slowest) < self.top:
+                heapq.heappush(self._slowest, item)
+            elif item > self._slowest[0]:
+                heapq.heapreplace(self._slowest, item)
+
+    def count(self, name: str, n: int = 1):
+        if self.enabled:
+            with self._lock:
+                self.counters[name] += n
+
+    def file_read(self, f: IO):
+        """Count a file about to be read in full (size from the open descriptor)"""
+        if self.enabled:
+            self.count('files_read')
+            self.count('bytes_read', os.fstat(f.fileno()).st_size)
+
+    def slowest(self) -> List[Tuple[float, str, str]]:
+        return sorted(self._slowest, reverse=True)
+
+    def to_dict(self) -> Dict:
+        return {
+            'stages': {name: {'seconds': round(seconds, 6), 'calls': calls}
+                       for name, (seconds, calls) in self.stages.items()},
+            'counters': dict(self.counters),
+            'slowest_files': [{'seconds': round(seconds, 6), 'stage': stage, 'path': path}
+                              for seconds, stage, path in self.slowest()],
+        }
+
+    def report(self):
+        """Print the timing summary"""
+        print("\n" + "=" * 60)
+        print("PROFILE")
+        print("=" * 60)
+        print("Stages (inclusive; file stages add up time across worker threads):")
+        for name, (seconds, calls) in self.stages.items():
+            print(f"  {name:28} {seconds:9.3f}s  {calls:6} calls")
+
+        if self.counters:
+            print("\nCounters:")
+            for name, value in sorted(self.counters.items()):
+                print(f"  {name:28} {value:>12}")
+
+        slowest = self.slowest()
+        if slowest:
+            print(f"\nSlowest {len(slowest)} files:")
+            for seconds, stage, path in slowest:
+                print(f"  {seconds * 1000:9.1f} ms  {stage:22} {path}")
+
+
+# Process-wide profiler the pipeline modules report to
+PROFILER = Profiler()
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser):
+    """--timings / --profile / --profile-top, same meaning in every pipeline script"""
+    parser.add_argument('--timings', action='store_true',
+                        help='Print per-stage and per-file timings, counters and the slowest files')
+    parser.add_argument('--profile', type=Path, default=None, metavar='PATH',
+                        help='Also write a cProfile dump (pstats; readable by snakeviz, '
+                             'flameprof, gprof2dot) and PATH.json with the timings (implies --timings)')
+    parser.add_argument('--profile-top', type=int, default=PROFILE_TOP, metavar='N',
+                        help=f'Slowest files listed (default: {PROFILE_TOP})')
+
+
+@contextmanager
+def profile_session(args: argparse.Namespace, name: str):
+    """
+    Enable the profiler around a script's main work when --timings/--profile is set,
+    print the summary afterwards and write the dumps. name is the outermost stage.
+    cProfile only sees the main thread; per-file timings also cover worker threads.
+    """
+    if not (args.timings or args.profile):
+        yield
+        return
+
+    PROFILER.enable(args.profile_top)
+    profile = cProfile.Profile() if args.profile else None
+    if profile:
+        profile.enable()
+    try:
+        with PROFILER.stage(name):
+            yield
+    finally:
+        if profile:
+            profile.disable()
+        PROFILER.report()
+        if args.profile:
+            profile.dump_stats(args.profile)
+            with open(Path(str(args.profile) + '.json'), 'w', encoding='utf-8') as f:
+                json.dump(PROFILER.to_dict(), f, indent=2)
+            print(f"\n[OK] cProfile dump written to: {args.profile} (timings: {args.profile}.json)")
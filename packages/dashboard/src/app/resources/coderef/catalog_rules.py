@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Pluggable row validation rules for catalog CSVs
+Used by validate-csv.py; any pipeline step can run the same engine on its rows
+"""
+
+import ntpath
+import os
+import stat
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from catalog_io import Resource
+from catalog_profile import PROFILER
+
+# Distinct paths whose stat result is remembered (parent dirs are shared by many rows)
+STAT_CACHE_SIZE = 4096
+
+# Types whose Path is a description (workflow steps, file extension), not a file
+NON_FILE_TYPES = frozenset(['Workflow', 'Output'])
+
+# Types whose Path points at a directory rather than a file (Workorder rows are
+# folders; Tab rows point at the resources page.tsx, so they are files)
+DIRECTORY_TYPES = frozenset(['Workorder'])
+
+VALID_STATUSES = frozenset(['active', 'deprecated', 'experimental'])
+
+REQUIRED_FIELDS = ['Description', 'Status', 'Path']
+
+# (rule name, message)
+Issue = Tuple[str, str]
+Check = Callable[[Resource], Optional[str]]
+
+
+class Rule(NamedTuple):
+    """A registered rule; stateful rules are factories called once per run"""
+    name: str
+    check: Callable
+    io: bool = False        # touches the filesystem: runs on the thread pool
+    stateful: bool = False  # check() builds a fresh per-run checker
+
+
+RULES: Dict[str, Rule] = {}
+
+
+def rule(name: str, io: bool = False, stateful: bool = False):
+    """Register a rule: a function returning an error message, or None if the row passes"""
+    def register(fn):
+        RULES[name] = Rule(name, fn, io, stateful)
+        return fn
+    return register
+
+
+class RowResult(NamedTuple):
+    """All rule outcomes for one data row (1-based, header excluded)"""
+    row: int
+    resource: Resource
+    issues: List[Issue]
+
+
+# ========== FILESYSTEM ==========
+
+@lru_cache(maxsize=STAT_CACHE_SIZE)
+def stat_path(path: str) -> Optional[os.stat_result]:
+    """Cached os.stat; None if the path does not exist or is unreadable"""
+    try:
+        return os.stat(path)
+    except (OSError, ValueError):
+        return None
+
+
+def is_filesystem_path(resource: Resource) -> bool:
+    """True if Path should name a file or directory on disk"""
+    if resource.Type in NON_FILE_TYPES or not resource.Path:
+        return False
+    # Catalog paths are usually Windows paths, even when validated elsewhere
+    return os.path.isabs(resource.Path) or ntpath.isabs(resource.Path)
+
+
+# ========== RULES ==========
+
+@rule('required-fields')
+def check_required_fields(r: Resource) -> Optional[str]:
+    missing = [field for field in REQUIRED_FIELDS if not getattr(r, field)]
+    if missing:
+        return f"empty {', '.join(missing)}"
+    return None
+
+
+@rule('status')
+def check_status(r: Resource) -> Optional[str]:
+    if r.Status and r.Status not in VALID_STATUSES:
+        return f"unknown Status '{r.Status}'"
+    return None
+
+
+@rule('iso-dates')
+def check_iso_dates(r: Resource) -> Optional[str]:
+    bad = []
+    for field in ('Created', 'LastUpdated'):
+        value = getattr(r, field)
+        if not value:
+            continue
+        try:
+            datetime.fromisoformat(value)
+        except ValueError:
+            bad.append(f"{field} '{value}'")
+    if bad:
+        return f"not ISO 8601: {', '.join(bad)}"
+    return None
+
+
+@rule('unique-key', stateful=True)
+def unique_key() -> Check:
+    """(Type, Server, Name) must appear once; reports the first row that used it"""
+    seen: Dict[Tuple[str, str, str], int] = {}
+    count = 0
+
+    def check(r: Resource) -> Optional[str]:
+        nonlocal count
+        count += 1
+        first = seen.setdefault(r.key, count)
+        if first != count:
+            return f"duplicate (Type, Server, Name) of row {first}"
+        return None
+
+    return check
+
+
+@rule('path-exists', io=True)
+def check_path_exists(r: Resource) -> Optional[str]:
+    if not is_filesystem_path(r):
+        return None
+    # Stat the (shared) parent first so a missing root costs one cached lookup
+    parent = os.path.dirname(r.Path) or ntpath.dirname(r.Path)
+    if parent and stat_path(parent) is None:
+        return f"parent directory not found: {parent}"
+    st = stat_path(r.Path)
+    if st is None:
+        return f"path not found: {r.Path}"
+
+    is_dir = stat.S_ISDIR(st.st_mode)
+    if r.Type in DIRECTORY_TYPES and not is_dir:
+        return f"expected a directory: {r.Path}"
+    if r.Type not in DIRECTORY_TYPES and is_dir:
+        return f"expected a file: {r.Path}"
+    return None
+
+
+# ========== ENGINE ==========
+
+def select_rules(names: Optional[Sequence[str]] = None) -> List[Rule]:
+    """Registered rules by name (all of them by default)"""
+    if names is None:
+        return list(RULES.values())
+    unknown = [name for name in names if name not in RULES]
+    if unknown:
+        raise ValueError(f"Unknown rule(s): {', '.join(unknown)} (available: {', '.join(RULES)})")
+    return [RULES[name] for name in names]
+
+
+def _run_checks(checks: List[Tuple[str, Check]], r: Resource) -> List[Issue]:
+    issues = []
+    for name, check in checks:
+        if PROFILER.enabled:
+            start = time.perf_counter()
+            message = check(r)
+            PROFILER.add_time(f'rule:{name}', time.perf_counter() - start)
+        else:
+            message = check(r)
+        if message:
+            issues.append((name, message))
+    return issues
+
+
+def check_rows(rows: Iterable[Resource], rules: Optional[List[Rule]] = None,
+               jobs: int = 8) -> Iterator[RowResult]:
+    """
+    Run rules over a row stream and yield one RowResult per row, in input order.
+    In-memory rules run inline; filesystem rules run on a thread pool that stays
+    a bounded number of rows ahead of the consumer.
+    """
+    if rules is None:
+        rules = select_rules()
+    inline = [(r.name, r.check() if r.stateful else r.check) for r in rules if not r.io]
+    io_checks = [(r.name, r.check() if r.stateful else r.check) for r in rules if r.io]
+
+    if not io_checks or jobs <= 1:
+        for n, resource in enumerate(rows, start=1):
+            issues = _run_checks(inline, resource) + _run_checks(io_checks, resource)
+            yield RowResult(n, resource, issues)
+        return
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        pending = deque()
+        for n, resource in enumerate(rows, start=1):
+            issues = _run_checks(inline, resource)
+            pending.append((n, resource, issues, pool.submit(_run_checks, io_checks, resource)))
+            while len(pending) > jobs * 4 or (pending and pending[0][3].done()):
+                n_done, done, done_issues, future = pending.popleft()
+                yield RowResult(n_done, done, done_issues + future.result())
+
+        while pending:
+            n_done, done, done_issues, future = pending.popleft()
+            yield RowResult(n_done, done, done_issues + future.result())
@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+"""
+Catalog search index
+Token inverted index with BM25 ranking over Name and Description, plus a
+character-trigram index over the vocabulary for prefix and typo-tolerant lookups
+"""
+
+import hashlib
+import heapq
+import marshal
+import math
+import os
+import re
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from catalog_io import Resource
+from catalog_shards import file_sha256
+
+SEARCH_FORMAT = 1
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# A Name token counts as this many Description tokens
+FIELD_WEIGHTS = {'Name': 3, 'Description': 1}
+
+# Per-posting BM25 term-frequency component, quantized to one byte
+IMPACT_LEVELS = 255
+
+# Minimum Dice similarity of trigram sets for a fuzzy match
+FUZZY_THRESHOLD = 0.5
+
+# Vocabulary terms a query token may expand to (prefix or fuzzy), most frequent first
+MAX_EXPANSIONS = 16
+
+# Score multiplier for terms that only match as a prefix or fuzzily
+PREFIX_WEIGHT = 0.6
+
+# Incremental updates leave avgdl and the vocabulary order as they were at the
+# last full build; rebuild from scratch once this share of documents has changed
+REBUILD_RATIO = 0.25
+
+_TOKEN = re.compile(r'[^\W_]+')
+_CAMEL = re.compile(r'(?<=[a-z0-9])(?=[A-Z])')
+
+Ident = Tuple[str, str, str, int]
+
+
+class SearchHit(NamedTuple):
+    key: Tuple[str, str, str]
+    score: float
+
+
+def catalog_search_path(csv_path: Path) -> Path:
+    """The search index written next to a catalog CSV"""
+    return Path(csv_path).with_suffix('.search.idx')
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens; camelCase, snake_case and kebab-case names are split"""
+    return _TOKEN.findall(_CAMEL.sub(' ', text).lower())
+
+
+def trigrams(term: str) -> Set[str]:
+    padded = f'  {term} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _content_hash(row: Resource) -> bytes:
+    return hashlib.blake2b(f'{row.Name}\0{row.Description}'.encode('utf-8'), digest_size=8).digest()
+
+
+def _doc_terms(row: Resource) -> Tuple[Counter, int]:
+    """(weighted term frequencies, weighted length) of a row"""
+    tf: Counter = Counter()
+    for field, weight in FIELD_WEIGHTS.items():
+        for token in tokenize(getattr(row, field)):
+            tf[token] += weight
+    return tf, sum(tf.values())
+
+
+def _idents(rows: Iterable[Resource]):
+    """(ident, row): the key plus an occurrence number, so repeated keys stay distinct"""
+    seen: Counter = Counter()
+    for row in rows:
+        key = row.key
+        yield key + (seen[key],), row
+        seen[key] += 1
+
+
+class SearchIndex:
+    """
+    Documents are catalog rows; doc ids are stable across incremental updates
+    (removed rows leave a None key that a later added row may reuse).
+    postings[term] holds ascending doc ids and impacts[term] the matching
+    quantized BM25 tf components.
+    """
+
+    def __init__(self):
+        self.source: Dict = {}
+        self.avgdl = 1.0
+        self.stale = 0
+        self.size = 0  # live documents
+        self.keys: List[Optional[Ident]] = []
+        self.hashes: List[Optional[bytes]] = []
+        self.doc_terms: List[array] = []
+        self.terms: List[str] = []
+        self.sorted_terms = 0  # terms[:sorted_terms] are in lexicographic order
+        self.term_ids: Dict[str, int] = {}
+        self.postings: List[array] = []
+        self.impacts: List[bytearray] = []
+        self.trigram_index: Dict[str, array] = {}
+
+    # ========== BUILD ==========
+
+    @classmethod
+    def build(cls, rows: Iterable[Resource]) -> 'SearchIndex':
+        index = cls()
+        docs = [(ident, _content_hash(row), *_doc_terms(row)) for ident, row in _idents(rows)]
+        index.avgdl = (sum(dl for *_, dl in docs) / len(docs)) if docs else 1.0
+        for term in sorted({term for *_, tf, _ in docs for term in tf}):
+            index._add_term(term)
+        index.sorted_terms = len(index.terms)
+        index.size = len(docs)
+
+        for doc, (ident, digest, tf, dl) in enumerate(docs):
+            index.keys.append(ident)
+            index.hashes.append(digest)
+            index.doc_terms.append(array('I', sorted(index.term_ids[term] for term in tf)))
+            for term, freq in tf.items():
+                # Docs arrive in id order: appending keeps the postings sorted
+                term_id = index.term_ids[term]
+                index.postings[term_id].append(doc)
+                index.impacts[term_id].append(index._impact(freq, dl))
+        return index
+
+    def update(self, rows: Iterable[Resource]) -> Optional[Dict[str, int]]:
+        """
+        Bring the index in line with rows, touching only the postings of added,
+        removed and changed rows. Returns the counts, or None if so much changed
+        that the caller should build a fresh index instead.
+        """
+        old = {ident: doc for doc, ident in enumerate(self.keys) if ident is not None}
+        added, changed = [], []
+        for ident, row in _idents(rows):
+            doc = old.pop(ident, None)
+            if doc is None:
+                added.append((ident, row))
+            elif self.hashes[doc] != _content_hash(row):
+                changed.append((doc, row))
+        removed = list(old.values())
+
+        touched = len(added) + len(changed) + len(removed)
+        if self.stale + touched > REBUILD_RATIO * max(len(self.keys), 1):
+            return None
+
+        for doc in removed:
+            self._unpost(doc)
+            self.keys[doc] = self.hashes[doc] = None
+            self.doc_terms[doc] = array('I')
+        for doc, row in changed:
+            self._unpost(doc)
+            self._post(doc, row)
+
+        free = [doc for doc, ident in enumerate(self.keys) if ident is None]
+        free.reverse()
+        for ident, row in added:
+            if free:
+                doc = free.pop()
+            else:
+                doc = len(self.keys)
+                self.keys.append(None)
+                self.hashes.append(None)
+                self.doc_terms.append(array('I'))
+            self.keys[doc] = ident
+            self._post(doc, row)
+
+        self.size += len(added) - len(removed)
+        self.stale += touched
+        return {'added': len(added), 'removed': len(removed), 'changed': len(changed)}
+
+    def _impact(self, freq: int, dl: int) -> int:
+        tf_part = freq / (freq + K1 * (1 - B + B * dl / self.avgdl))
+        return max(1, round(IMPACT_LEVELS * tf_part))
+
+    def _add_term(self, term: str) -> int:
+        term_id = len(self.terms)
+        self.terms.append(term)
+        self.term_ids[term] = term_id
+        self.postings.append(array('I'))
+        self.impacts.append(bytearray())
+        for gram in trigrams(term):
+            self.trigram_index.setdefault(gram, array('I')).append(term_id)
+        return term_id
+
+    def _unpost(self, doc: int):
+        for term_id in self.doc_terms[doc]:
+            postings = self.postings[term_id]
+            i = bisect_left(postings, doc)
+            del postings[i]
+            del self.impacts[term_id][i]
+
+    def _post(self, doc: int, row: Resource):
+        tf, dl = _doc_terms(row)
+        self.hashes[doc] = _content_hash(row)
+        term_ids = []
+        for term, freq in tf.items():
+            term_id = self.term_ids.get(term)
+            if term_id is None:
+                term_id = self._add_term(term)
+            postings = self.postings[term_id]
+            i = bisect_left(postings, doc)
+            postings.insert(i, doc)
+            self.impacts[term_id].insert(i, self._impact(freq, dl))
+            term_ids.append(term_id)
+        self.doc_terms[doc] = array('I', sorted(term_ids))
+
+    # ========== QUERY ==========
+
+    def _idf(self, term_id: int) -> float:
+        df = len(self.postings[term_id])
+        return math.log(1 + (self.size - df + 0.5) / (df + 0.5))
+
+    def _prefix_terms(self, prefix: str) -> List[int]:
+        lo = bisect_left(self.terms, prefix, 0, self.sorted_terms)
+        hi = bisect_left(self.terms, prefix + '\U0010ffff', lo, self.sorted_terms)
+        matches = list(range(lo, hi))
+        matches.extend(term_id for term_id in range(self.sorted_terms, len(self.terms))
+                       if self.terms[term_id].startswith(prefix))
+        return matches
+
+    def _fuzzy_terms(self, token: str) -> List[Tuple[int, float]]:
+        """Vocabulary terms whose trigram sets have Dice similarity >= FUZZY_THRESHOLD"""
+        grams = trigrams(token)
+        # A match shares at least `needed` trigrams, so it shares one of the
+        # len(grams) - needed + 1 rarest: only those lists need scanning
+        needed = math.ceil(FUZZY_THRESHOLD * len(grams) / (2 - FUZZY_THRESHOLD))
+        lists = sorted((self.trigram_index.get(gram, ()) for gram in grams), key=len)
+        candidates = set()
+        for term_ids in lists[:len(grams) - needed + 1]:
+            candidates.update(term_ids)
+
+        matches = []
+        for term_id in candidates:
+            term_grams = trigrams(self.terms[term_id])
+            dice = 2 * len(grams & term_grams) / (len(grams) + len(term_grams))
+            if dice >= FUZZY_THRESHOLD:
+                matches.append((term_id, dice))
+        return matches
+
+    def expand(self, token: str, prefix: bool = False, fuzzy: bool = True) -> List[Tuple[int, float]]:
+        """(term id, weight) pairs a query token matches: exact, then prefix, then fuzzy"""
+        matches = []
+        exact = self.term_ids.get(token)
+        if exact is not None:
+            matches.append((exact, 1.0))
+        if prefix and len(token) >= 2:
+            matches.extend((term_id, PREFIX_WEIGHT) for term_id in self._prefix_terms(token) if term_id != exact)
+        if not matches and fuzzy:
+            matches = [(term_id, PREFIX_WEIGHT * dice) for term_id, dice in self._fuzzy_terms(token)]
+
+        matches = [(term_id, weight) for term_id, weight in matches if self.postings[term_id]]
+        if len(matches) > MAX_EXPANSIONS:
+            matches = heapq.nlargest(MAX_EXPANSIONS, matches,
+                                     key=lambda m: (m[1], len(self.postings[m[0]])))
+        return matches
+
+    def _group_scores(self, group: List[Tuple[int, float]], within: Optional[Dict[int, float]]) -> Dict[int, float]:
+        """doc -> best score of any term in the group, for docs in `within` if given"""
+        scores: Dict[int, float] = {}
+        for term_id, weight in group:
+            postings, impacts = self.postings[term_id], self.impacts[term_id]
+            factor = weight * self._idf(term_id) * (K1 + 1) / IMPACT_LEVELS
+            if within is not None and len(within) * 8 < len(postings):
+                # Few candidates left: binary-search them in this term's postings
+                pairs = []
+                for doc in within:
+                    i = bisect_left(postings, doc)
+                    if i < len(postings) and postings[i] == doc:
+                        pairs.append((doc, impacts[i]))
+            else:
+                pairs = zip(postings, impacts)
+                if within is not None:
+                    pairs = ((doc, impact) for doc, impact in pairs if doc in within)
+            for doc, impact in pairs:
+                score = factor * impact
+                if score > scores.get(doc, 0.0):
+                    scores[doc] = score
+        return scores
+
+    def _top_single(self, term_id: int, factor: float, limit: int) -> List[Tuple[int, float]]:
+        """Top docs of one term: scan the impact bytes from the highest level down"""
+        postings, impacts = self.postings[term_id], self.impacts[term_id]
+        hits: List[Tuple[int, float]] = []
+        for level in range(max(impacts), 0, -1):
+            i = impacts.find(level)
+            while i != -1 and len(hits) < limit:
+                hits.append((postings[i], factor * level))
+                i = impacts.find(level, i + 1)
+            if len(hits) >= limit:
+                break
+        return hits
+
+    def search(self, query: str, limit: int = 20, match_all: bool = True,
+               prefix: bool = True, fuzzy: bool = True) -> List[SearchHit]:
+        """
+        Rows matching query, best BM25 score first. With match_all every query
+        token must match (as a word, a prefix of one if it is the last token,
+        or fuzzily); otherwise any token may.
+        """
+        tokens = tokenize(query)
+        groups = [self.expand(token, prefix and i == len(tokens) - 1, fuzzy) for i, token in enumerate(tokens)]
+        if match_all and not all(groups):
+            return []
+        groups = [group for group in groups if group]
+        if not groups or limit <= 0:
+            return []
+
+        if len(groups) == 1:
+            # A doc's score is its best term's score, so the top docs are among
+            # each term's own top docs
+            best: Dict[int, float] = {}
+            for term_id, weight in groups[0]:
+                factor = weight * self._idf(term_id) * (K1 + 1) / IMPACT_LEVELS
+                for doc, score in self._top_single(term_id, factor, limit):
+                    if score > best.get(doc, 0.0):
+                        best[doc] = score
+            top = heapq.nlargest(limit, best.items(), key=lambda item: (item[1], -item[0]))
+        else:
+            # Smallest groups first: under match_all each narrows the candidates
+            groups.sort(key=lambda group: sum(len(self.postings[term_id]) for term_id, _ in group))
+            totals: Optional[Dict[int, float]] = None
+            for group in groups:
+                scores = self._group_scores(group, totals if match_all else None)
+                if totals is None:
+                    totals = scores
+                elif match_all:
+                    totals = {doc: totals[doc] + score for doc, score in scores.items()}
+                else:
+                    for doc, score in scores.items():
+                        totals[doc] = totals.get(doc, 0.0) + score
+                if match_all and not totals:
+                    return []
+            top = heapq.nlargest(limit, totals.items(), key=lambda item: (item[1], -item[0]))
+
+        return [SearchHit(self.keys[doc][:3], round(score, 4)) for doc, score in top]
+
+    # ========== FILES ==========
+
+    def save(self, path: Path, csv_path: Optional[Path] = None):
+        """Serialize to path atomically; csv_path records which catalog it indexes"""
+        path = Path(path)
+        if csv_path is not None:
+            self.source = {'file': Path(csv_path).name, 'sha256': file_sha256(csv_path)}
+        data = {
+            'format': SEARCH_FORMAT,
+            'itemsize': array('I').itemsize,
+            'source': self.source,
+            'avgdl': self.avgdl,
+            'stale': self.stale,
+            'keys': self.keys,
+            'hashes': self.hashes,
+            'doc_terms': [terms.tobytes() for terms in self.doc_terms],
+            'terms': self.terms,
+            'sorted_terms': self.sorted_terms,
+            'postings': [postings.tobytes() for postings in self.postings],
+            'impacts': [bytes(impacts) for impacts in self.impacts],
+            'trigrams': {gram: term_ids.tobytes() for gram, term_ids in self.trigram_index.items()},
+        }
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            marshal.dump(data, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> 'SearchIndex':
+        """Raises ValueError if path is not a search index this code can read"""
+        try:
+            with open(path, 'rb') as f:
+                # One read, then decode: marshal.load on a file object reads piecemeal
+                data = marshal.loads(f.read())
+        except (EOFError, TypeError, ValueError):
+            raise ValueError(f"{path}: not a catalog search index")
+        if not isinstance(data, dict) or data.get('format') != SEARCH_FORMAT \
+                or data.get('itemsize') != array('I').itemsize:
+            raise ValueError(f"{path}: not a format {SEARCH_FORMAT} catalog search index")
+
+        def ids(raw: bytes) -> array:
+            values = array('I')
+            values.frombytes(raw)
+            return values
+
+        index = cls()
+        index.source = data['source']
+        index.avgdl = data['avgdl']
+        index.stale = data['stale']
+        index.keys = data['keys']
+        index.size = sum(1 for key in index.keys if key is not None)
+        index.hashes = data['hashes']
+        index.doc_terms = [ids(raw) for raw in data['doc_terms']]
+        index.terms = data['terms']
+        index.sorted_terms = data['sorted_terms']
+        index.term_ids = {term: term_id for term_id, term in enumerate(index.terms)}
+        index.postings = [ids(raw) for raw in data['postings']]
+        index.impacts = [bytearray(raw) for raw in data['impacts']]
+        index.trigram_index = {gram: ids(raw) for gram, raw in data['trigrams'].items()}
+        return index
+
+
+def update_search_index(csv_rows: Iterable[Resource], index_path: Path,
+                        csv_path: Optional[Path] = None) -> Tuple[SearchIndex, Optional[Dict[str, int]]]:
+    """
+    Update the index at index_path to match the rows (building it if it is
+    missing, unreadable or too stale) and save it. Returns (index, counts of
+    added/removed/changed rows), with None counts for a full build.
+    """
+    rows = list(csv_rows)
+    index_path = Path(index_path)
+    counts = None
+    index = None
+    if index_path.exists():
+        try:
+            index = SearchIndex.load(index_path)
+        except ValueError:
+            index = None
+        if index is not None:
+            counts = index.update(rows)
+    if counts is None:
+        index = SearchIndex.build(rows)
+    index.save(index_path, csv_path)
+    return index, counts
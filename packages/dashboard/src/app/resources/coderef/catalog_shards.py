@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Sharded scan outputs
+Each build agent scans a subset of roots into a sorted CSV plus a manifest
+(row count, content hash, provenance); merge-and-dedupe.py k-way merges them
+"""
+
+import hashlib
+import heapq
+import json
+import socket
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from catalog_io import FIELDNAMES, Resource, iter_catalog, sort_key
+
+SHARD_FORMAT = 1
+
+
+def shard_manifest_path(csv_path: Path) -> Path:
+    """Manifest written next to a shard CSV"""
+    csv_path = Path(csv_path)
+    return csv_path.with_name(csv_path.name + '.manifest.json')
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_shard_manifest(csv_path: Path, rows: int, provenance: Dict) -> Dict:
+    """Describe a finished shard CSV; host and creation time are added to provenance"""
+    manifest = {
+        'format': SHARD_FORMAT,
+        'file': Path(csv_path).name,
+        'rows': rows,
+        'sha256': file_sha256(csv_path),
+        'columns': FIELDNAMES,
+        'sorted_by': FIELDNAMES[:4],
+        'provenance': {
+            'host': socket.gethostname(),
+            'created': datetime.now(timezone.utc).isoformat(),
+            **provenance,
+        },
+    }
+    manifest_path = shard_manifest_path(csv_path)
+    tmp_path = manifest_path.with_name(manifest_path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    tmp_path.replace(manifest_path)
+    return manifest
+
+
+def verify_shard(csv_path: Path) -> Dict:
+    """Load a shard's manifest and check format and content hash; raises ValueError"""
+    manifest_path = shard_manifest_path(csv_path)
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ValueError(f"{csv_path}: missing or unreadable shard manifest {manifest_path.name} ({e})") from e
+
+    if manifest.get('format') != SHARD_FORMAT:
+        raise ValueError(f"{csv_path}: unsupported shard format {manifest.get('format')!r}")
+    if manifest.get('sha256') != file_sha256(csv_path):
+        raise ValueError(f"{csv_path}: content hash does not match its manifest")
+    return manifest
+
+
+def iter_shard(csv_path: Path) -> Iterator[Resource]:
+    """Stream a shard's rows, failing if they are not in catalog sort order"""
+    previous = None
+    for row in iter_catalog(csv_path):
+        current = sort_key(row)
+        if previous is not None and current < previous:
+            raise ValueError(f"{csv_path}: rows are not sorted by {', '.join(FIELDNAMES[:4])}")
+        previous = current
+        yield row
+
+
+def merge_shards(paths: List[Path], stats: Optional[Dict] = None) -> Iterator[Resource]:
+    """
+    K-way merge of sorted shards into one sorted stream (ties keep shard order).
+    Rows repeated verbatim in several shards, such as the built-in workflow rows
+    every shard emits, are passed on once; stats['shard_duplicates'] counts the rest.
+    Only verbatim copies are collapsed (they sort next to each other): rows that share
+    a (Type, Server, Name) key but differ are left to merge-and-dedupe's key dedupe.
+    Memory is one row per shard.
+    """
+    if stats is None:
+        stats = {}
+    stats['shard_duplicates'] = 0
+
+    previous = None
+    for row in heapq.merge(*(iter_shard(path) for path in paths), key=sort_key):
+        if row == previous:
+            stats['shard_duplicates'] += 1
+            continue
+        previous = row
+        yield row
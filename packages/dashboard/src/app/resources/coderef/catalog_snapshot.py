@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Pre-serialized /api/resources payload
+A gzip-compressed JSON snapshot of the catalog plus its content hash, so the
+dashboard can serve the file as-is with an ETag instead of parsing the CSV.
+Values are trimmed the way the API's CSV fallback (csv-parse with trim) reads them.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+from catalog_io import Resource
+
+# Aggregates stored with the snapshot (same breakdowns validate-csv.py prints)
+AGGREGATE_FIELDS = ['Type', 'Server', 'Category']
+
+
+# A value containing any of these is quoted in the CSV, and csv-parse keeps
+# whitespace inside quotes
+QUOTED_CHARS = frozenset(',"\r\n')
+
+
+def trimmed(value: str) -> str:
+    """value as csv-parse's trim option reads it: spaces and tabs around unquoted fields dropped"""
+    if QUOTED_CHARS.intersection(value):
+        return value
+    return value.strip(' \t')
+
+
+def catalog_snapshot_path(csv_path: Path) -> Path:
+    """The gzip JSON snapshot written next to a catalog CSV"""
+    return Path(csv_path).with_suffix('.json.gz')
+
+
+def snapshot_hash_path(snapshot_path: Path) -> Path:
+    """
+    Sidecar holding the snapshot's content hash (the API's ETag) on its first line
+    and the SHA-256 of the CSV it was built from on the second
+    """
+    snapshot_path = Path(snapshot_path)
+    return snapshot_path.with_name(snapshot_path.name + '.sha256')
+
+
+def _read_sidecar(snapshot_path: Path) -> List[str]:
+    try:
+        return snapshot_hash_path(snapshot_path).read_text(encoding='utf-8').split()
+    except OSError:
+        return []
+
+
+def read_snapshot_hash(snapshot_path: Path) -> str:
+    """Content hash of the current snapshot, or '' if there is none"""
+    return (_read_sidecar(snapshot_path) + [''])[0]
+
+
+def read_snapshot_source(snapshot_path: Path) -> str:
+    """SHA-256 of the CSV the current snapshot was built from, or '' if unknown"""
+    return (_read_sidecar(snapshot_path) + ['', ''])[1]
+
+
+def write_snapshot(rows: Iterable[Resource], snapshot_path: Path, source_sha256: str = '') -> Tuple[str, bool]:
+    """
+    Stream rows into the snapshot and return (content hash, rewritten).
+    The hash covers the rows only; if it matches the existing snapshot, the old
+    file is kept byte-for-byte (only its mtime is bumped) so ETags stay valid.
+    source_sha256 (the CSV's file hash) is what the API checks freshness against.
+    """
+    snapshot_path = Path(snapshot_path)
+    tmp_path = snapshot_path.with_name(snapshot_path.name + '.tmp')
+    digest = hashlib.sha256()
+    aggregates: Dict[str, Counter] = {field: Counter() for field in AGGREGATE_FIELDS}
+    count = 0
+
+    # mtime=0 and no embedded filename: identical JSON gives identical bytes
+    with open(tmp_path, 'wb') as raw, \
+            gzip.GzipFile(filename='', mode='wb', fileobj=raw, mtime=0) as gz:
+        gz.write(b'{"success": true, "data": [')
+        for resource in rows:
+            row = {field: trimmed(value) for field, value in resource.to_row().items()}
+            encoded = json.dumps(row, ensure_ascii=False).encode('utf-8')
+            digest.update(encoded + b'\n')
+            gz.write(encoded if count == 0 else b', ' + encoded)
+            count += 1
+            for field in AGGREGATE_FIELDS:
+                aggregates[field][row[field]] += 1
+
+        content_hash = digest.hexdigest()
+        tail = {
+            'count': count,
+            'hash': content_hash,
+            'aggregates': {f'by_{field.lower()}': dict(sorted(counter.items()))
+                           for field, counter in aggregates.items()},
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+        }
+        gz.write(b'], ' + json.dumps(tail, ensure_ascii=False)[1:].encode('utf-8'))
+
+    rewritten = not (snapshot_path.exists() and read_snapshot_hash(snapshot_path) == content_hash)
+    if rewritten:
+        os.replace(tmp_path, snapshot_path)
+    else:
+        tmp_path.unlink()
+        os.utime(snapshot_path)
+        if read_snapshot_source(snapshot_path) == source_sha256:
+            return content_hash, False
+
+    # Snapshot first, then its hash: a reader can never cache old content under the new ETag
+    hash_path = snapshot_hash_path(snapshot_path)
+    hash_tmp = hash_path.with_name(hash_path.name + '.tmp')
+    hash_tmp.write_text(f"{content_hash}\n{source_sha256}\n", encoding='utf-8')
+    os.replace(hash_tmp, hash_path)
+    return content_hash, rewritten
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Content-addressed catalog snapshots
+Rows are hashed and stored once; a snapshot is a compressed manifest of row
+hashes, so the store grows with row churn rather than with the number of copies
+"""
+
+import csv
+import gzip
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from catalog_io import ENCODING_SAMPLE_BYTES, detect_encoding
+from catalog_shards import file_sha256
+
+STORE_FORMAT = 2
+
+# Format 1 manifests have a single 'label' instead of 'labels'; they are still read
+READ_FORMATS = frozenset([1, STORE_FORMAT])
+
+# Bytes of BLAKE2b per row hash (96 bits: no collisions at catalog scale)
+ROW_HASH_BYTES = 12
+
+# Every Nth snapshot lists all of its row hashes; the others are diffs against
+# the previous snapshot, so restoring walks at most this many manifests
+KEYFRAME_INTERVAL = 16
+
+
+class SnapshotInfo(NamedTuple):
+    id: str
+    created: str
+    labels: Tuple[str, ...]   # every source recorded for this content, oldest first
+    file: str
+    rows: int
+    sha256: str
+
+
+def row_hash(values: List[str]) -> str:
+    encoded = json.dumps(values, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return hashlib.blake2b(encoded, digest_size=ROW_HASH_BYTES).hexdigest()
+
+
+def _write_gzip_json(path: Path, lines: List) -> None:
+    """Write JSON values one per line to a gzip file, atomically and reproducibly"""
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as raw, gzip.GzipFile(filename='', mode='wb', fileobj=raw, mtime=0) as gz:
+        for value in lines:
+            gz.write(json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n')
+    os.replace(tmp_path, path)
+
+
+def _read_gzip_json(path: Path) -> Iterator:
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            yield json.loads(line)
+
+
+def read_csv_rows(path: Path) -> Tuple[Dict, List[List[str]]]:
+    """
+    (format, rows) of any CSV. format holds what restoring needs to reproduce
+    the file byte for byte: encoding and line terminator.
+    """
+    with open(path, 'rb') as f:
+        sample = f.read(ENCODING_SAMPLE_BYTES)
+    encoding = detect_encoding(sample)
+    first_line = sample.split(b'\n', 1)[0]
+    newline = '\r\n' if first_line.endswith(b'\r') else '\n'
+    with open(path, 'r', encoding=encoding, newline='') as f:
+        rows = list(csv.reader(f))
+    return {'encoding': encoding, 'newline': newline}, rows
+
+
+class CatalogStore:
+    """
+    Directory layout:
+        objects/<id>.jsonl.gz    rows first stored by snapshot <id>: [hash, values] per line
+        objects/index.json.gz    hash -> pack id for every stored row (rebuilt from the packs
+                                 if it is missing or does not list every pack)
+        snapshots/<id>.json.gz   manifest: metadata line, then the row hashes or a diff
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.objects_dir = self.root / 'objects'
+        self.snapshots_dir = self.root / 'snapshots'
+        self.index_path = self.objects_dir / 'index.json.gz'
+        self._index: Optional[Dict[str, str]] = None
+
+    # ========== READING ==========
+
+    def snapshot_ids(self) -> List[str]:
+        if not self.snapshots_dir.is_dir():
+            return []
+        return sorted((p.name[:-len('.json.gz')] for p in self.snapshots_dir.glob('*.json.gz')), key=int)
+
+    def _manifest(self, snapshot_id: str) -> Tuple[Dict, List]:
+        path = self.snapshots_dir / f'{snapshot_id}.json.gz'
+        if not path.exists():
+            raise ValueError(f"No snapshot {snapshot_id!r} in {self.root}")
+        meta, *body = _read_gzip_json(path)
+        if meta.get('format') not in READ_FORMATS:
+            raise ValueError(f"Snapshot {snapshot_id}: unsupported format {meta.get('format')!r}")
+        if 'labels' not in meta:
+            meta['labels'] = [meta.pop('label')] if meta.get('label') else []
+        return meta, body
+
+    def info(self, snapshot_id: str) -> SnapshotInfo:
+        meta, _ = self._manifest(snapshot_id)
+        return SnapshotInfo(snapshot_id, meta['created'], tuple(meta['labels']), meta['source']['file'],
+                            meta['count'], meta['source']['sha256'])
+
+    def list(self) -> List[SnapshotInfo]:
+        return [self.info(snapshot_id) for snapshot_id in self.snapshot_ids()]
+
+    def row_hashes(self, snapshot_id: str) -> List[str]:
+        """Row hashes of a snapshot in file order (resolving diffs down to the last keyframe)"""
+        meta, body = self._manifest(snapshot_id)
+        if meta['base'] is None:
+            return body
+        base = self.row_hashes(meta['base'])
+        hashes: List[str] = []
+        for op in body:
+            if op[0] == '=':
+                hashes.extend(base[op[1]:op[2]])
+            else:
+                hashes.extend(op[1:])
+        return hashes
+
+    def _pack_ids(self) -> List[str]:
+        if not self.objects_dir.is_dir():
+            return []
+        return sorted(p.name[:-len('.jsonl.gz')] for p in self.objects_dir.glob('*.jsonl.gz'))
+
+    def pack_index(self) -> Dict[str, str]:
+        """Pack id of every stored row by hash (read once per store instance; no pack is opened)"""
+        if self._index is None:
+            packs = self._pack_ids()
+            index = None
+            if self.index_path.exists():
+                meta, *entries = _read_gzip_json(self.index_path)
+                if meta.get('format') == STORE_FORMAT and meta.get('packs') == packs:
+                    index = dict(entries)
+            if index is None:
+                # Missing, or a pack was written without its index update: rebuild
+                index = {}
+                for pack in packs:
+                    for digest, _ in _read_gzip_json(self.objects_dir / f'{pack}.jsonl.gz'):
+                        index.setdefault(digest, pack)
+                if packs:
+                    self._write_index(index, packs)
+            self._index = index
+        return self._index
+
+    def _write_index(self, index: Dict[str, str], packs: List[str]) -> None:
+        _write_gzip_json(self.index_path, [{'format': STORE_FORMAT, 'packs': packs}] + sorted(index.items()))
+
+    def rows(self, hashes: Iterable[str]) -> Dict[str, List[str]]:
+        """Stored rows for the given hashes, reading only the packs that hold them"""
+        wanted: Set[str] = set(hashes)
+        index = self.pack_index()
+        missing = wanted.difference(index)
+        if missing:
+            raise ValueError(f"{len(missing)} row(s) missing from {self.objects_dir}")
+        found: Dict[str, List[str]] = {}
+        for pack in sorted({index[digest] for digest in wanted}):
+            for digest, values in _read_gzip_json(self.objects_dir / f'{pack}.jsonl.gz'):
+                if digest in wanted:
+                    found[digest] = values
+        return found
+
+    def restore(self, snapshot_id: str, output_path: Path) -> bool:
+        """Write a snapshot back to CSV; True if the file is byte-identical to the original"""
+        meta, _ = self._manifest(snapshot_id)
+        hashes = self.row_hashes(snapshot_id)
+        rows = self.rows(hashes)
+        output_path = Path(output_path)
+        tmp_path = output_path.with_name(output_path.name + '.tmp')
+        with open(tmp_path, 'w', encoding=meta['source']['encoding'], newline='') as f:
+            writer = csv.writer(f, lineterminator=meta['source']['newline'])
+            for digest in hashes:
+                writer.writerow(rows[digest])
+        os.replace(tmp_path, output_path)
+        return file_sha256(output_path) == meta['source']['sha256']
+
+    # ========== WRITING ==========
+
+    def snapshot(self, csv_path: Path, label: str = '') -> Tuple[str, int]:
+        """
+        Snapshot a CSV; returns (snapshot id, rows newly stored).
+        A file identical to the latest snapshot is not stored again: its label is
+        added to that snapshot's labels and its id is returned with 0 new rows.
+        """
+        csv_path = Path(csv_path)
+        sha256 = file_sha256(csv_path)
+        ids = self.snapshot_ids()
+        if ids:
+            latest, body = self._manifest(ids[-1])
+            if latest['source']['sha256'] == sha256:
+                if label and label not in latest['labels']:
+                    latest['labels'].append(label)
+                    latest['format'] = STORE_FORMAT
+                    _write_gzip_json(self.snapshots_dir / f'{ids[-1]}.json.gz', [latest] + body)
+                return ids[-1], 0
+
+        csv_format, rows = read_csv_rows(csv_path)
+        hashes = [row_hash(values) for values in rows]
+        index = self.pack_index()
+        snapshot_id = f'{int(ids[-1]) + 1 if ids else 1:04d}'
+
+        new_rows = {}
+        for digest, values in zip(hashes, rows):
+            if digest not in index and digest not in new_rows:
+                new_rows[digest] = values
+        if new_rows:
+            self.objects_dir.mkdir(parents=True, exist_ok=True)
+            _write_gzip_json(self.objects_dir / f'{snapshot_id}.jsonl.gz',
+                             [[digest, values] for digest, values in new_rows.items()])
+            index.update((digest, snapshot_id) for digest in new_rows)
+            self._write_index(index, self._pack_ids())
+
+        meta = {
+            'format': STORE_FORMAT,
+            'id': snapshot_id,
+            'created': datetime.now(timezone.utc).isoformat(),
+            'labels': [label] if label else [],
+            'source': {'file': csv_path.name, 'sha256': sha256, **csv_format},
+            'count': len(hashes),
+            'base': None,
+        }
+        body: List = hashes
+        if ids and len(ids) % KEYFRAME_INTERVAL:
+            meta['base'] = ids[-1]
+            body = self._diff(self.row_hashes(ids[-1]), hashes)
+
+        self.snapshots_dir.mkdir(parents=True, exist_ok=True)
+        _write_gzip_json(self.snapshots_dir / f'{snapshot_id}.json.gz', [meta] + body)
+        return snapshot_id, len(new_rows)
+
+    @staticmethod
+    def _diff(base: List[str], hashes: List[str]) -> List:
+        """
+        ['=', i, j] copies base[i:j]; ['+', h, ...] lists hashes not in base.
+        Rows are matched on their hash in one pass over each list (as catalog_delta
+        matches on key); a run of copied rows stays one op while base keeps matching.
+        """
+        positions: Dict[str, int] = {}
+        for i, digest in enumerate(base):
+            positions.setdefault(digest, i)
+
+        ops: List = []
+        for digest in hashes:
+            last = ops[-1] if ops else None
+            if last and last[0] == '=' and last[2] < len(base) and base[last[2]] == digest:
+                last[2] += 1
+                continue
+            i = positions.get(digest)
+            if i is not None:
+                ops.append(['=', i, i + 1])
+            elif last and last[0] == '+':
+                last.append(digest)
+            else:
+                ops.append(['+', digest])
+        return ops
+
+    def disk_usage(self) -> int:
+        """Bytes used by the store"""
+        return sum(p.stat().st_size for p in self.root.rglob('*.gz'))
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Workorder index
+Summaries of coderef/workorder/ and coderef/archived/ folders (id, status, phases,
+task counts, timestamps) from their JSON files, parsed on a process pool and
+cached by mtime so only new or edited files are re-read
+"""
+
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from catalog_io import Resource
+from catalog_profile import PROFILER
+
+INDEX_FORMAT = 1
+
+# Folder under a project's coderef/ -> workorder state
+WORKORDER_DIRS = {'workorder': 'active', 'archived': 'archived'}
+
+# Files read from each workorder folder, most authoritative first
+WORKORDER_FILES = ('communication.json', 'execution-log.json', 'plan.json', 'context.json', 'analysis.json')
+
+# Below this many files to parse, a process pool costs more than it saves
+MIN_POOL_FILES = 16
+
+# How deep into nested objects a field is looked for (plan.json nests
+# phases under UNIVERSAL_PLANNING_STRUCTURE/6_implementation_phases)
+SEARCH_DEPTH = 3
+
+STATUS_KEYS = ('status',)
+ID_KEYS = ('workorder_id',)
+FEATURE_KEYS = ('feature_name', 'feature_id')
+PHASE_KEYS = ('phases', 'implementation_phases')
+TASK_KEYS = ('tasks',)
+CREATED_KEYS = ('created', 'created_at', 'generated_at')
+UPDATED_KEYS = ('updated', 'updated_at', 'last_updated', 'timestamp')
+
+DONE_STATUSES = frozenset(['complete', 'completed', 'done'])
+
+
+class WorkorderSummary(NamedTuple):
+    id: str
+    feature: str
+    state: str          # 'active' or 'archived'
+    status: str
+    phases: int
+    tasks: int
+    tasks_done: int
+    created: str
+    updated: str
+    path: str
+    files: Tuple[str, ...]
+
+
+# ========== PARSING (runs in worker processes) ==========
+
+def _find(data: Any, keys: Tuple[str, ...], accept=lambda value: value not in (None, '', [], {}),
+          depth: int = SEARCH_DEPTH) -> Any:
+    """First accepted value of any of keys (case-insensitive), breadth-first through nested objects"""
+    queue = deque([(data, 0)])
+    while queue:
+        node, level = queue.popleft()
+        if not isinstance(node, dict):
+            continue
+        for key, value in node.items():
+            if key.lower() in keys and accept(value):
+                return value
+        if level < depth:
+            queue.extend((value, level + 1) for value in node.values() if isinstance(value, dict))
+    return None
+
+
+def _is_list(value: Any) -> bool:
+    return isinstance(value, list) and bool(value)
+
+
+def _is_text(value: Any) -> bool:
+    return isinstance(value, str) and bool(value.strip())
+
+
+def _count_done(tasks: List) -> int:
+    return sum(1 for task in tasks
+               if isinstance(task, dict) and str(task.get('status', '')).lower() in DONE_STATUSES)
+
+
+def extract_facts(data: Any) -> Dict[str, Any]:
+    """Summary fields found in one parsed workorder JSON document (absent fields are None)"""
+    if isinstance(data, list):
+        # execution-log.json: a list of runs, the last one is current
+        runs = [entry for entry in data if isinstance(entry, dict)]
+        data = runs[-1] if runs else {}
+
+    phases = _find(data, PHASE_KEYS, _is_list)
+    tasks = done = None
+    if phases and all(isinstance(phase, dict) for phase in phases):
+        phase_tasks = [phase['tasks'] for phase in phases if isinstance(phase.get('tasks'), list)]
+        if phase_tasks:
+            tasks = sum(len(items) for items in phase_tasks)
+            done = sum(_count_done(items) for items in phase_tasks)
+    if tasks is None:
+        task_list = _find(data, TASK_KEYS, _is_list)
+        if task_list:
+            tasks, done = len(task_list), _count_done(task_list)
+
+    # Hand-maintained progress counters beat counting task statuses
+    def is_count(value: Any) -> bool:
+        return isinstance(value, int) and not isinstance(value, bool)
+
+    total = _find(data, ('total_tasks', 'task_count'), is_count)
+    completed = _find(data, ('completed_tasks',), is_count)
+
+    return {
+        'workorder_id': _find(data, ID_KEYS, _is_text, depth=1),
+        'feature': _find(data, FEATURE_KEYS, _is_text, depth=1),
+        'status': _find(data, STATUS_KEYS, _is_text, depth=1),
+        'phases': len(phases) if phases else None,
+        'tasks': total if total is not None else tasks,
+        'tasks_done': completed if completed is not None else done,
+        'created': _find(data, CREATED_KEYS, _is_text, depth=1),
+        'updated': _find(data, UPDATED_KEYS, _is_text, depth=1),
+    }
+
+
+def parse_workorder_file(path: str) -> Dict[str, Any]:
+    """Facts of one workorder JSON file, or {'error': message} (top-level so a process pool can pickle it)"""
+    try:
+        with open(path, 'r', encoding='utf-8-sig') as f:
+            return extract_facts(json.load(f))
+    except (OSError, ValueError) as e:
+        return {'error': str(e)}
+
+
+# ========== SUMMARIES ==========
+
+def _first(facts: List[Dict], field: str) -> Any:
+    for file_facts in facts:
+        value = file_facts.get(field)
+        if value is not None:
+            return value
+    return None
+
+
+def parse_timestamp(value: str) -> Optional[datetime]:
+    """
+    A workorder timestamp as an aware UTC datetime, or None if unparseable.
+    Files mix dates, naive times and 'Z' or offset suffixes; naive values are taken as UTC.
+    """
+    text = value.strip()
+    if text.endswith(('Z', 'z')):
+        text = text[:-1] + '+00:00'
+    try:
+        stamp = datetime.fromisoformat(text)
+    except ValueError:
+        return None
+    if stamp.tzinfo is None:
+        return stamp.replace(tzinfo=timezone.utc)
+    return stamp.astimezone(timezone.utc)
+
+
+def _iso(stamp: datetime) -> str:
+    return stamp.isoformat(timespec='seconds')
+
+
+def summarize(folder: Path, state: str, facts_by_file: Dict[str, Dict], mtimes: Dict[str, int]) -> WorkorderSummary:
+    """Combine per-file facts; each field comes from the first file in WORKORDER_FILES order that has it"""
+    names = [name for name in WORKORDER_FILES if name in facts_by_file]
+    facts = [facts_by_file[name] for name in names if 'error' not in facts_by_file[name]]
+    # Plans define the phases; logs and communication files only track them
+    plan_first = sorted(facts, key=lambda file_facts: file_facts is not facts_by_file.get('plan.json'))
+
+    # Both timestamps come from one source: the JSON stamps if any file has
+    # one, otherwise file mtimes. Mixing them put mtime-based creation dates
+    # after JSON update dates.
+    created = [parse_timestamp(f['created']) for f in facts if f.get('created')]
+    updated = [parse_timestamp(f['updated']) for f in facts if f.get('updated')]
+    created = [stamp for stamp in created if stamp]
+    updated = [stamp for stamp in updated if stamp]
+    if not created and not updated:
+        created = [datetime.fromtimestamp(mtime_ns / 1e9, tz=timezone.utc) for mtime_ns in mtimes.values()]
+        updated = list(created)
+    first = min(created or updated) if created or updated else None
+    # Any file's creation stamp also bounds the last update
+    last = max(created + updated) if first else None
+    return WorkorderSummary(
+        id=_first(facts, 'workorder_id') or folder.name,
+        feature=_first(facts, 'feature') or folder.name,
+        state=state,
+        status=_first(facts, 'status') or 'unknown',
+        phases=_first(plan_first, 'phases') or 0,
+        tasks=_first(facts, 'tasks') or 0,
+        tasks_done=_first(facts, 'tasks_done') or 0,
+        created=_iso(first) if first else '',
+        updated=_iso(last) if last else '',
+        path=str(folder),
+        files=tuple(names),
+    )
+
+
+def workorder_rows(summaries: Iterable[WorkorderSummary], server: str) -> List[Resource]:
+    """Catalog rows for workorders (Type Workorder, Category Active or Archived)"""
+    rows = []
+    for wo in summaries:
+        description = f"{wo.feature}: {wo.status}"
+        if wo.phases:
+            description += f", {wo.phases} phases"
+        if wo.tasks:
+            description += f", {wo.tasks_done}/{wo.tasks} tasks done"
+        rows.append(Resource('Workorder', server, wo.state.capitalize(), wo.id, description,
+                             'active', wo.path, wo.created, wo.updated))
+    return rows
+
+
+# ========== INDEX ==========
+
+class WorkorderIndex:
+    """
+    Persistent index: the summary of every workorder folder plus, per JSON file,
+    (mtime_ns, size, facts). A file whose mtime and size are unchanged is not reopened.
+    With no path the index lives in memory only (load and save do nothing).
+    """
+
+    def __init__(self, path: Optional[Path], jobs: int = 1):
+        self.path = Path(path) if path is not None else None
+        self.jobs = max(1, jobs)
+        self.files: Dict[str, Dict] = {}
+        self.summaries: List[WorkorderSummary] = []
+        self.parsed = 0
+        self.skipped = 0
+        self.errors: List[str] = []
+
+    def load(self):
+        """Read the previous index; a missing or outdated one just means a full parse"""
+        if self.path is None:
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('format') == INDEX_FORMAT:
+            self.files = data.get('files', {})
+
+    def save(self):
+        """Write the index atomically"""
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            'format': INDEX_FORMAT,
+            'generated': datetime.now(timezone.utc).isoformat(),
+            'workorders': [summary._asdict() for summary in self.summaries],
+            'files': self.files,
+        }
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=1)
+        os.replace(tmp_path, self.path)
+
+    def _parse(self, paths: List[str]) -> List[Dict]:
+        if self.jobs > 1 and len(paths) >= MIN_POOL_FILES:
+            with ProcessPoolExecutor(max_workers=self.jobs) as pool:
+                chunksize = max(1, len(paths) // (self.jobs * 4))
+                return list(pool.map(parse_workorder_file, paths, chunksize=chunksize))
+        return [parse_workorder_file(path) for path in paths]
+
+    @staticmethod
+    def stat(coderef_dirs: Iterable[Path]) -> Tuple[List[Tuple[Path, str, Dict[str, str]]],
+                                                     Dict[str, Tuple[int, int]]]:
+        """
+        (folders, stats): every workorder folder as (path, state, {file name: file path})
+        in path order, and (mtime_ns, size) of each workorder JSON file found
+        """
+        folders: List[Tuple[Path, str, Dict[str, str]]] = []
+        stats: Dict[str, Tuple[int, int]] = {}
+        with PROFILER.stage('workorders: stat'):
+            for coderef_dir in coderef_dirs:
+                for dirname, state in WORKORDER_DIRS.items():
+                    try:
+                        entries = sorted(os.scandir(Path(coderef_dir) / dirname), key=lambda entry: entry.name)
+                    except OSError:
+                        continue
+                    for entry in entries:
+                        if not entry.is_dir():
+                            continue
+                        found = {}
+                        for name in WORKORDER_FILES:
+                            file_path = os.path.join(entry.path, name)
+                            try:
+                                stat = os.stat(file_path)
+                            except OSError:
+                                continue
+                            stats[file_path] = (stat.st_mtime_ns, stat.st_size)
+                            found[name] = file_path
+                        folders.append((Path(entry.path), state, found))
+        return folders, stats
+
+    def scan(self, coderef_dirs: Iterable[Path]) -> List[WorkorderSummary]:
+        """
+        Summarize every folder under <coderef>/workorder and <coderef>/archived,
+        in path order. Files that vanished are dropped from the index.
+        """
+        folders, stats = self.stat(coderef_dirs)
+
+        dirty = [file_path for file_path, (mtime_ns, size) in stats.items()
+                 if self.files.get(file_path, {}).get('mtime_ns') != mtime_ns
+                 or self.files[file_path].get('size') != size]
+        with PROFILER.stage('workorders: parse'):
+            parsed = self._parse(dirty)
+        for file_path, facts in zip(dirty, parsed):
+            mtime_ns, size = stats[file_path]
+            self.files[file_path] = {'mtime_ns': mtime_ns, 'size': size, 'facts': facts}
+        self.files = {file_path: self.files[file_path] for file_path in stats}
+        self.parsed, self.skipped = len(dirty), len(stats) - len(dirty)
+        PROFILER.count('workorder_files_parsed', self.parsed)
+
+        self.errors = [f"Error reading {file_path}: {entry['facts']['error']}"
+                       for file_path, entry in self.files.items() if 'error' in entry['facts']]
+        self.summaries = [
+            summarize(folder, state,
+                      {name: self.files[file_path]['facts'] for name, file_path in found.items()},
+                      {name: stats[file_path][0] for name, file_path in found.items()})
+            for folder, state, found in folders
+        ]
+        return self.summaries
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Diff two catalog CSVs, or apply a delta
+Rows are matched on (Type, Server, Name); changes are reported per field
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+# Shared pipeline modules live next to this script
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from catalog_delta import apply_delta, catalog_delta_path, read_delta, write_delta
+
+# Operations listed in the text report (the delta file has all of them)
+MAX_PRINTED_OPS = 30
+
+
+def print_delta(delta_path: Path, limit: int = MAX_PRINTED_OPS):
+    header, ops, summary = read_delta(delta_path)
+    print("=" * 60)
+    print(f"CATALOG DELTA: {header['from']['file']} -> {header['to']['file']}")
+    print("=" * 60)
+    print(f"  Added:     {summary['added']}")
+    print(f"  Removed:   {summary['removed']}")
+    print(f"  Changed:   {summary['changed']}")
+    print(f"  Unchanged: {summary['unchanged']}")
+    if summary['duplicates']:
+        print(f"  [WARN] Repeated (Type, Server, Name) keys ignored: {summary['duplicates']}")
+
+    if ops:
+        print()
+    for op in ops[:limit]:
+        if op['op'] == 'add':
+            row = op['row']
+            print(f"  + {row['Type']}/{row['Server']}/{row['Name']}")
+        elif op['op'] == 'remove':
+            print(f"  - {'/'.join(op['key'])}")
+        else:
+            print(f"  ~ {'/'.join(op['key'])}")
+            for field, (old, new) in op['fields'].items():
+                print(f"      {field}: {old!r} -> {new!r}")
+    if len(ops) > limit:
+        print(f"  ... {len(ops) - limit} more in {delta_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Diff two resource catalogs or apply a catalog delta')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    diff = commands.add_parser('diff', help='Write the delta from OLD to NEW')
+    diff.add_argument('old', type=Path, help='Earlier catalog CSV')
+    diff.add_argument('new', type=Path, help='Later catalog CSV')
+    diff.add_argument('--output', '-o', type=Path, default=None,
+                      help='Delta file (default: <new>.delta.jsonl)')
+    diff.add_argument('--limit', type=int, default=MAX_PRINTED_OPS, help='Changes listed in the report')
+
+    apply = commands.add_parser('apply', help='Patch BASE with DELTA')
+    apply.add_argument('delta', type=Path, help='Delta file written by diff or merge-and-dedupe.py')
+    apply.add_argument('base', type=Path, help="The delta's earlier catalog")
+    apply.add_argument('--output', '-o', type=Path, required=True, help='Patched catalog CSV')
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'diff':
+            delta_path = args.output or catalog_delta_path(args.new)
+            write_delta(args.old, args.new, delta_path)
+            print_delta(delta_path, args.limit)
+            print(f"\n[OK] Delta written to: {delta_path}")
+        else:
+            count, identical = apply_delta(args.base, args.delta, args.output)
+            print(f"[OK] Wrote {count} rows to {args.output}")
+            if not identical:
+                print("[WARN] Result differs byte-wise from the delta's target catalog (encoding or row order)")
+    except (OSError, ValueError) as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
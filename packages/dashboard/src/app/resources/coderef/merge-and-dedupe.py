@@ -5,9 +5,26 @@ Filter out duplicate assistant commands
 Create final single source of truth
 """
 
+import argparse
 import csv
+import glob
+import os
+import shutil
+import sys
+import tempfile
+from collections import Counter
 from pathlib import Path
-from collections import defaultdict
+
+# Shared pipeline modules live next to this script
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from catalog_db import catalog_db_path, write_catalog_db
+from catalog_delta import UnsortedCatalog, catalog_delta_path, group_key, write_delta
+from catalog_io import FIELDNAMES, iter_catalog, load_catalog, sort_key, write_sorted_csv
+from catalog_profile import PROFILER, add_profile_arguments, profile_session
+from catalog_search import catalog_search_path, update_search_index
+from catalog_shards import file_sha256, merge_shards, verify_shard
+from catalog_snapshot import catalog_snapshot_path, write_snapshot
+from catalog_store import CatalogStore
 
 RESOURCES_DIR = Path(__file__).parent
 
@@ -17,135 +34,347 @@ OLD_CSV = RESOURCES_DIR / "tools-and-commands-backup.csv"  # Has: Tools from MCP
 
 # Output
 FINAL_CSV = RESOURCES_DIR / "FINAL-tools-and-commands.csv"
+DROPPED_CSV = RESOURCES_DIR / "merge-dropped-rows.csv"  # Report: which rows were dropped and why
 
+# Published catalog: the merge output's delta is computed against it
+CATALOG_CSV = RESOURCES_DIR / "tools-and-commands.csv"
 
-def read_csv(path: Path):
-    """Read CSV into list of dicts"""
-    rows = []
-    encodings = ['utf-8', 'utf-8-sig', 'utf-16', 'cp1252']
-
-    for encoding in encodings:
-        try:
-            with open(path, 'r', encoding=encoding, newline='') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    rows.append(dict(row))
-            return rows
-        except (UnicodeDecodeError, UnicodeError):
-            continue
+# Snapshot store: the published catalog is snapshotted here before every merge
+STORE_DIR = RESOURCES_DIR / "catalog-store"
+
+# Types taken from the old CSV; everything else is rebuilt by the scanner
+OLD_TYPES = ('Tool', 'Command')
 
-    raise Exception(f"Could not read {path}")
+# Which source wins when old and scanned rows share a (Type, Server, Name) key:
+#   old       - keep the old row, drop the scanned one
+#   scanned   - the scanned row replaces the old one
+#   old-only  - ignore scanned rows of this Type entirely
+# (old Commands are hand-curated, so scanned Commands are ignored by default)
+PRECEDENCE_CHOICES = ('old', 'scanned', 'old-only')
+DEFAULT_PRECEDENCE = {'Tool': 'old', 'Command': 'old-only'}
+
+
+def read_csv(path: Path):
+    """Read CSV into list of Resource records (encoding detected from BOM + sample)"""
+    return load_catalog(path)
 
 
-def is_duplicate_assistant_command(row, mcp_commands):
+def is_duplicate_assistant_command(row, mcp_command_names):
     """Check if this assistant command is a duplicate of an MCP command"""
-    if row['Type'] != 'Command' or row['Server'] != 'assistant':
+    if row.Type != 'Command' or row.Server != 'assistant':
         return False
 
-    # Check if same command exists in MCP servers
-    command_name = row['Name']
-    for mcp_row in mcp_commands:
-        if mcp_row['Name'] == command_name and mcp_row['Server'] != 'assistant':
-            return True
+    # Same command name exists in an MCP server (set lookup, not a scan)
+    return row.Name in mcp_command_names
+
+
+def parse_precedence(rules):
+    """Parse TYPE=SOURCE strings (e.g. Tool=scanned) into a precedence dict"""
+    precedence = {}
+    for rule in rules:
+        rtype, _, source = rule.partition('=')
+        if source not in PRECEDENCE_CHOICES:
+            raise ValueError(f"Invalid precedence rule {rule!r}: SOURCE must be one of {', '.join(PRECEDENCE_CHOICES)}")
+        precedence[rtype] = source
+    return precedence
+
+
+def iter_merged(scanned_resources, old_resources, stats, precedence=None):
+    """
+    Merge in one linear pass using prebuilt indexes.
+    The old CSV is indexed by (Type, Server, Name); scanned rows stream through and are
+    checked against that index, then the surviving old rows are emitted.
+    Scanned rows must be sorted by Type, Server (scanner CSVs and shard merges are):
+    repeated keys are found per (Type, Server) group, so memory for the scanned side
+    is the largest group, not the whole stream. Raises UnsortedCatalog otherwise.
+    stats is filled in as rows are consumed, including stats['dropped'] as
+    (source, reason, row) tuples.
+    """
+    precedence = {**DEFAULT_PRECEDENCE, **(precedence or {})}
+    dropped = []
+    stats.update({'tools': 0, 'mcp_commands': 0, 'duplicates': 0, 'scanned_kept': 0, 'dropped': dropped})
+
+    # Index the old CSV: kept Tools and MCP Commands by key, plus MCP command names
+    old_index = {}
+    mcp_command_names = set()
+    for row in old_resources:
+        if row.Type not in OLD_TYPES:
+            dropped.append(('old', 'type rebuilt by scanner', row))
+        elif row.Type == 'Command' and row.Server == 'assistant':
+            dropped.append(('old', 'assistant command', row))
+        elif row.key in old_index:
+            dropped.append(('old', 'duplicate key', row))
+        else:
+            old_index[row.key] = row
+            if row.Type == 'Tool':
+                stats['tools'] += 1
+            else:
+                stats['mcp_commands'] += 1
+                mcp_command_names.add(row.Name)
+
+    # Filter scanned resources against the indexes
+    group, seen = None, set()
+    for row in scanned_resources:
+        if group_key(row) != group:
+            if group is not None and group_key(row) < group:
+                raise UnsortedCatalog(f"scanned rows are not sorted by Type, Server "
+                                      f"(at {'/'.join(group_key(row))})")
+            group, seen = group_key(row), set()
+
+        if is_duplicate_assistant_command(row, mcp_command_names):
+            stats['duplicates'] += 1
+            dropped.append(('scanned', 'assistant duplicate of MCP command', row))
+            continue
 
-    return False
+        rule = precedence.get(row.Type, 'old')
+        if rule == 'old-only':
+            dropped.append(('scanned', f'{row.Type} rows come from old CSV', row))
+            continue
+        stats['scanned_kept'] += 1
 
+        if row.Name in seen:
+            dropped.append(('scanned', 'duplicate key', row))
+            continue
+        seen.add(row.Name)
+
+        if row.key in old_index:
+            if rule == 'old':
+                dropped.append(('scanned', 'old row takes precedence', row))
+                continue
+            dropped.append(('old', 'scanned row takes precedence', old_index.pop(row.key)))
+
+        yield row
+
+    yield from old_index.values()
+
+
+def merge_resources(scanned_resources, old_resources, precedence=None):
+    """
+    Merge scanned rows with Tools and MCP Commands from the old CSV.
+    Returns (deduped rows, stats dict) without printing.
+    """
+    stats = {}
+    # In-memory rows may come in any order (e.g. watch mode's per-file lists)
+    scanned = sorted(scanned_resources, key=sort_key)
+    deduped = list(iter_merged(scanned, old_resources, stats, precedence))
+    return deduped, stats
+
+
+def write_dropped_report(dropped, report_path):
+    """Write dropped rows with their source and reason"""
+    report_path = Path(report_path)
+    with open(report_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Source', 'Reason'] + FIELDNAMES)
+        for source, reason, row in dropped:
+            writer.writerow([source, reason] + list(row))
+
+
+def expand_shards(patterns):
+    """Shard CSV paths from paths/glob patterns, in the order given"""
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        paths.extend(Path(match) for match in matches if Path(match) not in paths)
+    return paths
+
+
+def merge_csvs(output_path=FINAL_CSV, precedence=None, report_path=DROPPED_CSV, *, shards=None,
+               store_path=None, db_path=None, snapshot_path=None, delta_path=None, delta_base=None,
+               search_path=None):
+    """
+    Merge new and old CSVs, removing duplicates, streaming the result to output_path.
+    Inputs and extra outputs are keyword-only; the outputs are passed on to write_csv.
+    With shards, the scanned rows come from a k-way merge of sorted shard CSVs
+    instead of SCANNED_CSV; on a repeated key the first row in sort order wins
+    (the first shard's, when the rows sort equal).
+    With delta_path, the rows changed relative to delta_base are written there.
+    With store_path, CATALOG_CSV is snapshotted into that store first.
+    """
+    if store_path and CATALOG_CSV.exists():
+        with PROFILER.stage('store snapshot'):
+            snapshot_catalog(CATALOG_CSV, store_path)
 
-def merge_csvs():
-    """Merge new and old CSVs, removing duplicates"""
     print("Reading CSVs...")
-    scanned_resources = read_csv(SCANNED_CSV)
-    old_resources = read_csv(OLD_CSV)
-
-    print(f"  Scanned CSV: {len(scanned_resources)} resources")
+    if shards:
+        manifests = [verify_shard(path) for path in shards]
+        for path, manifest in zip(shards, manifests):
+            origin = manifest['provenance']
+            print(f"  Shard {path.name}: {manifest['rows']} rows from {origin.get('host', '?')} "
+                  f"({', '.join(origin.get('roots', {})) or 'no roots'})")
+        shard_stats = {}
+        scanned_resources = merge_shards(shards, shard_stats)
+        print(f"  Scanned shards: {len(shards)} files, {sum(m['rows'] for m in manifests)} resources")
+    else:
+        with PROFILER.stage('read scanned'):
+            # Already in memory: sorting costs little and accepts hand-edited files
+            scanned_resources = sorted(read_csv(SCANNED_CSV), key=sort_key)
+        print(f"  Scanned CSV: {len(scanned_resources)} resources")
+
+    with PROFILER.stage('read old'):
+        old_resources = read_csv(OLD_CSV)
     print(f"  Old CSV: {len(old_resources)} resources")
 
-    # Extract Tools and MCP Commands from old CSV
-    tools_from_old = [r for r in old_resources if r['Type'] == 'Tool']
-    mcp_commands_from_old = [r for r in old_resources if r['Type'] == 'Command' and r['Server'] != 'assistant']
+    stats = {}
+    with PROFILER.stage('merge + write'):
+        total, type_counts = write_csv(iter_merged(scanned_resources, old_resources, stats, precedence),
+                                       output_path, db_path=db_path, snapshot_path=snapshot_path,
+                                       delta_path=delta_path, delta_base=delta_base, search_path=search_path)
 
     print(f"\nFrom old CSV (keeping):")
-    print(f"  Tools: {len(tools_from_old)}")
-    print(f"  MCP Commands: {len(mcp_commands_from_old)}")
-
-    # Filter scanned resources - remove assistant commands that are duplicates
-    scanned_filtered = []
-    dup_count = 0
-
-    for row in scanned_resources:
-        if is_duplicate_assistant_command(row, mcp_commands_from_old):
-            dup_count += 1
-            continue
-        # Skip commands from scanned CSV (we'll use old CSV commands which are correct)
-        if row['Type'] == 'Command':
-            continue
-        scanned_filtered.append(row)
+    print(f"  Tools: {stats['tools']}")
+    print(f"  MCP Commands: {stats['mcp_commands']}")
 
     print(f"\nFrom scanned CSV (keeping):")
-    print(f"  Filtered assistant duplicates: {dup_count} removed")
-    print(f"  ResourceSheets, Scripts, etc.: {len(scanned_filtered)}")
-
-    # Merge: Tools + MCP Commands from old + filtered scanned resources
-    merged = tools_from_old + mcp_commands_from_old + scanned_filtered
-
-    # Remove any remaining duplicates by (Type, Server, Name)
-    seen = set()
-    deduped = []
-
-    for row in merged:
-        key = (row['Type'], row['Server'], row['Name'])
-        if key not in seen:
-            seen.add(key)
-            deduped.append(row)
-
-    print(f"\nFinal merged: {len(deduped)} resources")
+    if shards:
+        print(f"  Rows repeated across shards: {shard_stats['shard_duplicates']} collapsed")
+    print(f"  Filtered assistant duplicates: {stats['duplicates']} removed")
+    print(f"  ResourceSheets, Scripts, etc.: {stats['scanned_kept']}")
 
-    # Count by type
-    type_counts = defaultdict(int)
-    for row in deduped:
-        type_counts[row['Type']] += 1
+    print(f"\nFinal merged: {total} resources")
 
     print("\nBreakdown:")
     for rtype, count in sorted(type_counts.items()):
         print(f"  {rtype:15} {count:4}")
 
-    return deduped
-
-
-def write_csv(resources, output_path):
-    """Write final CSV"""
-    # Sort by Type, Server, Category, Name
-    sorted_resources = sorted(resources, key=lambda x: (
-        x.get('Type', ''),
-        x.get('Server', ''),
-        x.get('Category', ''),
-        x.get('Name', '')
-    ))
-
-    # Standard fieldnames (ensure all rows have these)
-    fieldnames = ['Type', 'Server', 'Category', 'Name', 'Description', 'Status', 'Path', 'Created', 'LastUpdated']
-
-    # Fill missing fields with empty strings
-    for row in sorted_resources:
-        for field in fieldnames:
-            if field not in row:
-                row[field] = ''
-
-    with open(output_path, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
-        writer.writeheader()
-        writer.writerows(sorted_resources)
-
-    print(f"\n[OK] Wrote {len(sorted_resources)} rows to {output_path}")
+    reason_counts = Counter((source, reason) for source, reason, _ in stats['dropped'])
+    print(f"\nDropped: {len(stats['dropped'])} rows")
+    for (source, reason), count in sorted(reason_counts.items()):
+        print(f"  {source:8} {reason:40} {count:4}")
+
+    if report_path:
+        with PROFILER.stage('dropped report'):
+            write_dropped_report(stats['dropped'], report_path)
+        print(f"[OK] Dropped-row report: {report_path}")
+
+    return total
+
+
+def snapshot_catalog(csv_path: Path, store_path: Path):
+    """Snapshot a catalog before it may be replaced (only rows not already stored cost space)"""
+    store = CatalogStore(store_path)
+    latest = store.snapshot_ids()[-1:]
+    snapshot_id, new_rows = store.snapshot(csv_path, 'before merge')
+    if latest == [snapshot_id]:
+        print(f"[OK] {csv_path.name} unchanged since snapshot {snapshot_id}")
+    else:
+        print(f"[OK] Snapshot {snapshot_id} of {csv_path.name} ({new_rows} new rows) in {store_path}")
+
+
+def write_csv(resources, output_path, *, db_path=None, snapshot_path=None, delta_path=None, delta_base=None,
+              search_path=None):
+    """
+    Write final CSV sorted by Type, Server, Category, Name; returns (rows, counts by Type).
+    Every extra output is an optional keyword argument.
+    With db_path / snapshot_path, the written CSV is also loaded into an indexed
+    SQLite catalog / the gzip JSON snapshot served by /api/resources.
+    With search_path, the search index there is updated (only changed rows re-indexed).
+    With delta_path, added/removed/changed rows relative to delta_base (which may
+    be output_path itself, i.e. its previous version) are written there.
+    """
+    base = Path(delta_base) if delta_path and delta_base and Path(delta_base).exists() else None
+    base_copy = None
+    if base and Path(output_path).exists() and base.samefile(output_path):
+        # The base is about to be replaced: diff against a copy of the previous version
+        fd, base_copy = tempfile.mkstemp(suffix='.csv')
+        os.close(fd)
+        shutil.copyfile(base, base_copy)
+
+    try:
+        # Missing fields are written as empty strings; the file is replaced atomically
+        total, type_counts = write_sorted_csv(resources, output_path)
+
+        print(f"\n[OK] Wrote {total} rows to {output_path}")
+
+        if base:
+            with PROFILER.stage('delta'):
+                summary = write_delta(base_copy or base, output_path, delta_path, base.name)
+            print(f"[OK] Delta vs {base.name}: +{summary['added']} -{summary['removed']} "
+                  f"~{summary['changed']} rows -> {delta_path}")
+        elif delta_path:
+            print(f"[WARN] No delta written: base catalog {delta_base} not found")
+    finally:
+        if base_copy:
+            os.unlink(base_copy)
+
+    if db_path:
+        with PROFILER.stage('sqlite'):
+            write_catalog_db(iter_catalog(output_path), db_path)
+        print(f"[OK] SQLite catalog: {db_path}")
+
+    if snapshot_path:
+        with PROFILER.stage('snapshot'):
+            content_hash, rewritten = write_snapshot(iter_catalog(output_path), snapshot_path,
+                                                     file_sha256(output_path))
+        state = 'written' if rewritten else 'unchanged'
+        print(f"[OK] JSON snapshot {state}: {snapshot_path} ({content_hash[:12]})")
+
+    if search_path:
+        with PROFILER.stage('search index'):
+            _, counts = update_search_index(iter_catalog(output_path), search_path, output_path)
+        if counts is None:
+            print(f"[OK] Search index rebuilt: {search_path}")
+        else:
+            print(f"[OK] Search index updated: {search_path} (+{counts['added']} -{counts['removed']} "
+                  f"~{counts['changed']} rows)")
+    return total, type_counts
 
 
 def main():
+    parser = argparse.ArgumentParser(description='Merge scanned resources with existing tool data')
+    parser.add_argument('--prefer', action='append', default=[], metavar='TYPE=SOURCE',
+                        help=f"Precedence for a Type on key conflicts ({'/'.join(PRECEDENCE_CHOICES)}), repeatable")
+    parser.add_argument('--report', type=Path, default=DROPPED_CSV,
+                        help='Where to write the dropped-rows report')
+    parser.add_argument('--sqlite', type=Path, default=catalog_db_path(FINAL_CSV),
+                        help='SQLite catalog to write alongside the CSV')
+    parser.add_argument('--no-sqlite', action='store_true', help='Skip the SQLite catalog')
+    parser.add_argument('--snapshot', type=Path, default=catalog_snapshot_path(CATALOG_CSV),
+                        help='gzip JSON snapshot (default: tools-and-commands.json.gz, the file /api/resources '
+                             'serves once tools-and-commands.csv matches the merged CSV)')
+    parser.add_argument('--no-snapshot', action='store_true', help='Skip the JSON snapshot')
+    parser.add_argument('--shards', nargs='+', metavar='CSV',
+                        help='Merge these scanner shard outputs (paths or globs) instead of the scanned CSV')
+    parser.add_argument('--delta', type=Path, default=catalog_delta_path(FINAL_CSV),
+                        help='Delta (added/removed/changed rows) to write alongside the CSV')
+    parser.add_argument('--delta-base', type=Path, default=CATALOG_CSV,
+                        help='Catalog the delta is computed against (default: tools-and-commands.csv)')
+    parser.add_argument('--no-delta', action='store_true', help='Skip the delta')
+    parser.add_argument('--search', type=Path, default=catalog_search_path(FINAL_CSV),
+                        help='Search index to update alongside the CSV')
+    parser.add_argument('--no-search', action='store_true', help='Skip the search index')
+    parser.add_argument('--store', type=Path, default=STORE_DIR,
+                        help='Snapshot store for the pre-merge copy of tools-and-commands.csv')
+    parser.add_argument('--no-store', action='store_true', help='Skip the pre-merge snapshot')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    try:
+        precedence = parse_precedence(args.prefer)
+    except ValueError as e:
+        parser.error(str(e))
+
     print("="*60)
     print("MERGE AND DEDUPE")
     print("="*60)
 
-    resources = merge_csvs()
-    write_csv(resources, FINAL_CSV)
+    shards = expand_shards(args.shards) if args.shards else None
+    if args.shards and not shards:
+        parser.error(f"No shard files match: {' '.join(args.shards)}")
+
+    try:
+        with profile_session(args, 'total'):
+            merge_csvs(FINAL_CSV, precedence, args.report,
+                       shards=shards,
+                       store_path=None if args.no_store else args.store,
+                       db_path=None if args.no_sqlite else args.sqlite,
+                       snapshot_path=None if args.no_snapshot else args.snapshot,
+                       delta_path=None if args.no_delta else args.delta,
+                       delta_base=args.delta_base,
+                       search_path=None if args.no_search else args.search)
+    except ValueError as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
 
     print("\n" + "="*60)
     print("COMPLETE")
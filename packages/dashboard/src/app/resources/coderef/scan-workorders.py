@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Workorder index
+Summarize coderef/workorder/ and coderef/archived/ folders into .coderef/workorder-index.json
+(only JSON files changed since the last run are parsed)
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+# Shared pipeline modules live next to this script
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from catalog_workorders import WorkorderIndex
+
+RESOURCES_DIR = Path(__file__).parent
+WORKORDER_INDEX = RESOURCES_DIR / ".coderef" / "workorder-index.json"
+
+# This repository's coderef/ (packages/dashboard/src/app/resources/coderef -> repo root)
+PROJECT_CODEREF = RESOURCES_DIR.resolve().parents[5] / "coderef"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Index workorder and archived plan/context JSON')
+    parser.add_argument('coderef_dirs', type=Path, nargs='*', default=[PROJECT_CODEREF],
+                        help="Project coderef/ directories (default: this repository's)")
+    parser.add_argument('--index', type=Path, default=WORKORDER_INDEX,
+                        help='Index file (default: .coderef/workorder-index.json)')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1,
+                        help='Worker processes for parsing (default: CPU count)')
+    parser.add_argument('--full', action='store_true', help='Re-parse every file')
+    parser.add_argument('--quiet', '-q', action='store_true', help='Only print the totals')
+    args = parser.parse_args()
+
+    index = WorkorderIndex(args.index, args.jobs)
+    if not args.full:
+        index.load()
+
+    start = time.perf_counter()
+    summaries = index.scan(args.coderef_dirs)
+    elapsed = time.perf_counter() - start
+    try:
+        index.save()
+    except OSError as e:
+        print(f"[ERROR] Could not write {args.index}: {e}")
+        sys.exit(1)
+
+    if not args.quiet:
+        print(f"  {'State':9} {'Workorder':42} {'Status':24} {'Phases':>6} {'Tasks':>9}  Updated")
+        for wo in summaries:
+            tasks = f"{wo.tasks_done}/{wo.tasks}" if wo.tasks else '-'
+            print(f"  {wo.state:9} {wo.id:42} {wo.status:24} {wo.phases:6} {tasks:>9}  {wo.updated[:10]}")
+        print()
+
+    by_status = Counter(wo.status for wo in summaries)
+    print(f"Workorders: {len(summaries)} ({', '.join(f'{status} {count}' for status, count in by_status.most_common())})")
+    for error in index.errors:
+        print(f"[WARN] {error}")
+    print(f"[OK] {index.parsed} files parsed, {index.skipped} unchanged ({elapsed:.2f}s)")
+    print(f"[OK] Index written to: {args.index}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Search the resource catalog
+Build or update the search index next to a catalog CSV, and query it
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+# Shared pipeline modules live next to this script
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from catalog_io import iter_catalog
+from catalog_search import SearchIndex, catalog_search_path, update_search_index
+
+RESOURCES_DIR = Path(__file__).parent
+CATALOG_CSV = RESOURCES_DIR / "tools-and-commands.csv"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Full-text and fuzzy search over the resource catalog')
+    parser.add_argument('--csv', type=Path, default=CATALOG_CSV, help='Catalog CSV (default: tools-and-commands.csv)')
+    parser.add_argument('--index', type=Path, default=None, help='Search index (default: <csv>.search.idx)')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help='Update the index to match the CSV (only changed rows are re-indexed)')
+    build.add_argument('--full', action='store_true', help='Rebuild from scratch')
+
+    query = commands.add_parser('query', help='Search Name and Description')
+    query.add_argument('text', nargs='+', help='Search terms')
+    query.add_argument('--limit', type=int, default=20, help='Maximum results')
+    query.add_argument('--any', action='store_true', help='Match any term instead of all of them')
+    query.add_argument('--exact', action='store_true', help='No prefix or fuzzy matching')
+    args = parser.parse_args()
+
+    index_path = args.index or catalog_search_path(args.csv)
+    try:
+        if args.command == 'build':
+            start = time.perf_counter()
+            if args.full:
+                index = SearchIndex.build(iter_catalog(args.csv))
+                index.save(index_path, args.csv)
+                counts = None
+            else:
+                index, counts = update_search_index(iter_catalog(args.csv), index_path, args.csv)
+            elapsed = time.perf_counter() - start
+            if counts is None:
+                print(f"[OK] Built search index: {index.size} rows, {len(index.terms)} terms ({elapsed:.2f}s)")
+            else:
+                print(f"[OK] Updated search index: +{counts['added']} -{counts['removed']} "
+                      f"~{counts['changed']} rows ({elapsed:.2f}s)")
+            print(f"[OK] Written to: {index_path} ({index_path.stat().st_size / 1024:.1f} KiB)")
+
+        else:
+            index = SearchIndex.load(index_path)
+            text = ' '.join(args.text)
+            start = time.perf_counter()
+            hits = index.search(text, args.limit, match_all=not args.any,
+                                prefix=not args.exact, fuzzy=not args.exact)
+            elapsed = time.perf_counter() - start
+            for hit in hits:
+                rtype, server, name = hit.key
+                print(f"  {hit.score:7.3f}  {rtype:14} {server:20} {name}")
+            print(f"\n{len(hits)} result(s) in {elapsed * 1000:.2f} ms")
+    except (OSError, ValueError) as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,457 @@
+"""
+---
+related_script: packages/dashboard/src/app/resources/coderef/build-source-of-truth.py
+---
+"""
+
+import unittest
+import tempfile
+import shutil
+import os
+import importlib.util
+import io
+import json
+import subprocess
+from contextlib import redirect_stdout
+from pathlib import Path
+import sys
+
+# Shared pipeline modules live next to this test
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from catalog_delta import catalog_delta_path, read_delta
+from catalog_io import iter_catalog, write_sorted_csv
+
+
+def load_script(filename):
+    """Import a hyphenated pipeline script"""
+    path = Path(__file__).parent / filename
+    spec = importlib.util.spec_from_file_location(filename[:-3].replace('-', '_'), path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+bsot = load_script('build-source-of-truth.py')
+
+
+def globbed(pattern):
+    """What Path.glob/rglob finds for a pattern, minus pruned directories"""
+    found = pattern.root.rglob(pattern.glob) if pattern.recursive else pattern.root.glob(pattern.glob)
+    return [path for path in found
+            if path.is_file() and not bsot.PRUNE_DIRS & set(path.relative_to(pattern.root).parts)]
+
+
+def git(repo, *args, date=None):
+    env = dict(os.environ, GIT_AUTHOR_DATE=date or '', GIT_COMMITTER_DATE=date or '')
+    result = subprocess.run(['git', '-c', 'user.name=test', '-c', 'user.email=test@example.com', *args],
+                            cwd=repo, env=env, capture_output=True, text=True, check=True)
+    return result.stdout.strip()
+
+
+@unittest.skipUnless(shutil.which('git'), 'git is not installed')
+class TestGitTimestampIndex(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.repo = Path(self.test_dir) / 'repo'
+        (self.repo / 'docs').mkdir(parents=True)
+        git(self.repo, 'init', '-q')
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def commit(self, files, date):
+        for rel, text in files.items():
+            (self.repo / rel).write_text(text, encoding='utf-8')
+        git(self.repo, 'add', '-A')
+        git(self.repo, 'commit', '-q', '-m', date, date=date)
+
+    def test_lookup_returns_first_add_and_last_change(self):
+        """One log walk gives each tracked file its creation and latest commit dates."""
+        self.commit({'server.py': 'v1', 'docs/guide.md': 'v1'}, '2024-01-02T03:04:05+00:00')
+        self.commit({'server.py': 'v2', 'notes.md': 'v1'}, '2024-02-03T04:05:06+00:00')
+        (self.repo / 'untracked.md').write_text('x', encoding='utf-8')
+
+        index = bsot.GitTimestampIndex()
+
+        self.assertEqual(index.lookup(self.repo / 'server.py'),
+                         ('2024-01-02T03:04:05+00:00', '2024-02-03T04:05:06+00:00'))
+        self.assertEqual(index.lookup(self.repo / 'docs' / 'guide.md'), ('2024-01-02T03:04:05+00:00',) * 2)
+        self.assertEqual(index.lookup(self.repo / 'notes.md'), ('2024-02-03T04:05:06+00:00',) * 2)
+        self.assertEqual(index.lookup(self.repo / 'untracked.md'), (None, None))
+        self.assertEqual(index.find_repo_root((self.repo / 'docs').resolve()), self.repo.resolve())
+
+    def test_new_commits_invalidate_the_index(self):
+        """head_for reads HEAD without git; refresh_heads drops the walk of a repo that moved."""
+        self.commit({'server.py': 'v1'}, '2024-01-02T03:04:05+00:00')
+        index = bsot.GitTimestampIndex()
+        self.assertEqual(index.head_for(self.repo / 'server.py'), git(self.repo, 'rev-parse', 'HEAD'))
+        index.lookup(self.repo / 'server.py')
+
+        self.commit({'server.py': 'v2'}, '2024-03-04T05:06:07+00:00')
+
+        self.assertEqual(index.refresh_heads(), [self.repo.resolve()])
+        self.assertEqual(index.head_for(self.repo / 'server.py'), git(self.repo, 'rev-parse', 'HEAD'))
+        self.assertEqual(index.lookup(self.repo / 'server.py')[1], '2024-03-04T05:06:07+00:00')
+
+
+SERVER_SOURCE = '''"""Docs server"""
+from mcp.types import Tool
+
+GENERATE = "generate_docs"
+GENERATE_HELP = "Write the\\n    docs"
+
+TOOLS = [
+    Tool(name=GENERATE, description=GENERATE_HELP, inputSchema={}),
+    types.Tool(name="list_templates", description="List templates"),
+]
+parser.add_argument("--out", name="not_a_tool")
+logger = logging.getLogger(name="docs")
+
+
+@server.call_tool("audit_docs")
+async def audit(arguments):
+    """Audit the docs.
+
+    Details that are not part of the description.
+    """
+
+
+@app.call_tool(GENERATE)
+async def generate(arguments):
+    """Duplicate of a Tool() entry"""
+
+
+class SchemaValidator:
+    """Check a schema"""
+'''
+
+
+class TestModuleFacts(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.root = Path(self.test_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_extracts_tools_handlers_and_validators(self):
+        """Tool() constructors and @call_tool handlers are found, names resolved through constants."""
+        facts = bsot.extract_module_facts(SERVER_SOURCE)
+
+        self.assertEqual(facts.docstring, 'Docs server')
+        self.assertEqual(facts.tools, [('generate_docs', 'Write the docs'),
+                                       ('list_templates', 'List templates'),
+                                       ('audit_docs', 'Audit the docs.')])
+        self.assertEqual(facts.validators, [('SchemaValidator', 'Check a schema')])
+
+    def test_unrelated_name_keywords_are_ignored(self):
+        """name= on calls other than Tool(), and non-constant names, produce no tool."""
+        facts = bsot.extract_module_facts('x = Thing(name="nope")\nTool(name=make_name())\n'
+                                          '@server.call_tool(compute())\ndef handler(): pass\n')
+
+        self.assertEqual(facts.tools, [])
+
+    def test_syntax_errors_fall_back_cleanly(self):
+        """A broken server file is a task error; a broken script still gets its header comment."""
+        broken = self.root / 'server.py'
+        broken.write_text('# Broken server\nTool(name="half"\n', encoding='utf-8')
+        roots = {'ASSISTANT': bsot.ScanRoot('ASSISTANT', self.root)}
+        scanner = bsot.ResourceScanner(roots=roots)
+
+        rows, error = scanner._run_task((scanner._parse_server_file, (broken, 'docs'), f"Error reading {broken}"))
+        self.assertEqual(rows, [])
+        self.assertTrue(error.startswith(f"Error reading {broken}"))
+
+        row, = scanner._parse_script_file(broken, 'Orchestrator', parsed=True)
+        self.assertEqual(row.Description, 'Broken server')
+
+    def test_cache_is_invalidated_by_content_changes(self):
+        """One parse per file until its mtime or size changes."""
+        module = self.root / 'server.py'
+        module.write_text('Tool(name="first")\n', encoding='utf-8')
+        cache = bsot.ModuleFactsCache()
+
+        facts = cache.get(module)
+        self.assertIs(cache.get(module), facts)
+
+        module.write_text('Tool(name="first")\nTool(name="second")\n', encoding='utf-8')
+        self.assertEqual([name for name, _ in cache.get(module).tools], ['first', 'second'])
+
+
+class TestScanCache(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.root = Path(self.test_dir)
+        self.script = self.root / 'scripts' / 'sync.py'
+        self.script.parent.mkdir()
+        self.script.write_text('"""Sync the index"""\n', encoding='utf-8')
+        roots = {'ASSISTANT': bsot.ScanRoot('ASSISTANT', self.root, frozenset(['scripts']))}
+        self.scanner = bsot.ResourceScanner(roots=roots)
+        self.scanner.verbose = False
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def scan(self, use_hash=False):
+        """Scan with a cache loaded from disk, then save it; returns (rows, hits, misses)"""
+        cache = bsot.ScanCache(self.root / 'scan-cache.json', use_hash=use_hash)
+        cache.load()
+        self.scanner.cache = cache
+        rows = self.scanner.run_tasks(self.scanner.script_tasks())
+        cache.save()
+        return rows, cache.hits, cache.misses
+
+    def touch(self, path):
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    def test_entries_are_keyed_by_parser_and_arguments(self):
+        """Different parsers or arguments for one file are separate cache entries."""
+        parse = self.scanner._parse_script_file
+        keys = {bsot.task_key((parse, (self.script, 'Orchestrator', False), '')),
+                bsot.task_key((parse, (self.script, 'System', False), '')),
+                bsot.task_key((self.scanner._parse_validator_file, (self.script,), ''))}
+
+        self.assertEqual(len(keys), 3)
+
+    def test_touched_file_hits_only_with_hash(self):
+        """A new mtime with the same bytes is a hit when hashes are kept, a miss otherwise."""
+        rows, _, misses = self.scan(use_hash=True)
+        self.assertEqual(misses, 1)
+        self.assertEqual(self.scan(use_hash=True)[1:], (1, 0))
+
+        self.touch(self.script)
+        self.assertEqual(self.scan(use_hash=True), (rows, 1, 0))
+
+        self.touch(self.script)
+        self.assertEqual(self.scan()[1:], (0, 1))
+
+    def test_content_change_misses(self):
+        """Changed content is re-parsed, even at the same size with the hash option."""
+        self.scan(use_hash=True)
+
+        self.script.write_text('"""Sync the inbox"""\n', encoding='utf-8')
+        self.touch(self.script)
+        rows, hits, misses = self.scan(use_hash=True)
+
+        self.assertEqual((hits, misses), (0, 1))
+        self.assertEqual(rows[0].Description, 'Sync the inbox')
+
+    def test_scanner_source_change_invalidates_the_cache(self):
+        """Editing the scanner source changes the fingerprint and drops every entry."""
+        copy = self.root / 'pipeline'
+        copy.mkdir()
+        for name in ('build-source-of-truth.py', 'catalog_io.py'):
+            shutil.copyfile(Path(__file__).parent / name, copy / name)
+        cache_path = self.root / 'scan-cache.json'
+
+        def load_copy():
+            spec = importlib.util.spec_from_file_location('build_source_of_truth_copy',
+                                                          copy / 'build-source-of-truth.py')
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            cache = module.ScanCache(cache_path)
+            cache.load()
+            return cache
+
+        cache = load_copy()
+        cache.put('key', self.script, '', [])
+        cache.get('key', self.script)
+        cache.save()
+        self.assertIn('key', load_copy().entries)
+
+        with open(copy / 'build-source-of-truth.py', 'a', encoding='utf-8') as f:
+            f.write('\n# parser tweak\n')
+        self.assertEqual(load_copy().entries, {})
+
+
+class TestFileDiscovery(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.root = Path(self.test_dir)
+        for rel in ['server.py', 'README.md', 'docs/guide.md', 'docs/api/tools.md', 'src/app/main.py',
+                    'src/app/commands/review.md', 'src/app/commands/ship.md', 'src/lib/util.py',
+                    'node_modules/pkg/index.md', 'src/app/__pycache__/main.py', '.claude/commands/plan.md']:
+            path = self.root / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text('x', encoding='utf-8')
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_matches_glob_for_every_pattern(self):
+        """One walk finds what each glob/rglob would, in the same order, for nested and flat roots."""
+        patterns = [
+            bsot.FilePattern(self.root, '*.md'),
+            bsot.FilePattern(self.root, '*.py'),
+            bsot.FilePattern(self.root, '*.py', recursive=False),
+            bsot.FilePattern(self.root / 'src' / 'app' / 'commands', '*.md', recursive=False),
+            bsot.FilePattern(self.root / '.claude' / 'commands', '*.md'),
+            bsot.FilePattern(self.root / 'missing', '*.md'),
+        ]
+        discovery = bsot.FileDiscovery(patterns + patterns[:1])
+
+        for pattern in patterns:
+            self.assertEqual(discovery.files(pattern), globbed(pattern), pattern)
+        self.assertEqual(len(discovery.files(patterns[0])), 6)
+        self.assertEqual(discovery.files(patterns[2]), [self.root / 'server.py'])
+
+    def test_flat_roots_do_not_walk_subdirectories(self):
+        """Non-recursive patterns scan only their own directory."""
+        discovery = bsot.FileDiscovery([bsot.FilePattern(self.root / 'src' / 'app' / 'commands', '*.md', False),
+                                        bsot.FilePattern(self.root / 'docs', '*.md', False)])
+
+        self.assertEqual(discovery.dirs_scanned, 2)
+
+
+class TestScanConfig(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.root = Path(self.test_dir)
+        self.config = self.root / 'scan-config.json'
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def load(self, roots):
+        self.config.write_text(json.dumps({'version': 1, 'roots': roots}), encoding='utf-8')
+        return bsot.load_scan_config(self.config)
+
+    def test_profiles_and_defaults(self):
+        """Listed fields set the profile; omitted ones default to every scanner, no filters, no limit."""
+        os.environ['CODEREF_TEST_ROOT'] = str(self.root / 'env')
+        try:
+            roots = self.load([
+                {'name': 'SYSTEM', 'path': 'system', 'scanners': ['scripts'], 'include': ['scripts/*'],
+                 'exclude': ['scripts/old_*'], 'jobs': 4},
+                {'name': 'ENV', 'path': '$CODEREF_TEST_ROOT'},
+                {'name': 'HOME', 'path': '~/commands', 'scanners': ['commands']},
+            ])
+        finally:
+            del os.environ['CODEREF_TEST_ROOT']
+
+        self.assertEqual(list(roots), ['SYSTEM', 'ENV', 'HOME'])
+        self.assertEqual(roots['SYSTEM'], bsot.ScanRoot('SYSTEM', self.root / 'system', frozenset(['scripts']),
+                                                        ('scripts/*',), ('scripts/old_*',), 4))
+        self.assertEqual(roots['ENV'], bsot.ScanRoot('ENV', self.root / 'env'))
+        self.assertEqual(roots['ENV'].scanners, frozenset(bsot.SCANNER_NAMES))
+        self.assertEqual(roots['HOME'].path, Path.home() / 'commands')
+
+        system = roots['SYSTEM']
+        self.assertTrue(system.allows_file(system.path / 'scripts' / 'sync.py'))
+        self.assertFalse(system.allows_file(system.path / 'scripts' / 'old_sync.py'))
+        self.assertFalse(system.allows_file(system.path / 'tools' / 'sync.py'))
+
+    def test_scanner_follows_the_innermost_root(self):
+        """A nested root's profile, not its parent's, decides what runs under it."""
+        roots = self.load([{'name': 'OUTER', 'path': '.', 'scanners': ['scripts']},
+                           {'name': 'INNER', 'path': 'inner', 'scanners': ['commands']}])
+        scanner = bsot.ResourceScanner(roots=roots)
+
+        self.assertEqual(scanner.owner(self.root / 'inner' / 'a.md').name, 'INNER')
+        self.assertTrue(scanner.enabled('scripts', self.root / 'a.py'))
+        self.assertFalse(scanner.enabled('scripts', self.root / 'inner' / 'a.py'))
+        self.assertIsNone(scanner.owner(self.root.parent))
+
+    def test_invalid_configs_are_rejected(self):
+        """A root without a name or path, or with an unknown scanner, raises ValueError."""
+        for roots in ([{'name': 'NO_PATH'}], [{'path': 'x'}], ['just-a-string'],
+                      [{'name': 'TYPO', 'path': 'x', 'scanners': ['scirpts']}]):
+            with self.assertRaises(ValueError, msg=roots):
+                self.load(roots)
+
+    def test_shipped_config_loads(self):
+        """The checked-in scan-config.json is valid and names the built-in roots."""
+        roots = bsot.load_scan_config(bsot.SCAN_CONFIG)
+
+        self.assertEqual(set(roots), set(bsot.default_scan_roots()))
+
+
+class TestCatalogWatcher(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.root = Path(self.test_dir)
+        self.catalog = self.root / 'out' / 'tools-and-commands.csv'
+        self.catalog.parent.mkdir()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def watcher(self, scanners, root='DASHBOARD'):
+        roots = {root: bsot.ScanRoot(root, self.root, frozenset(scanners))}
+        # --hash: a touched but unchanged file is served from the scan cache
+        cache = bsot.ScanCache(self.root / 'scan-cache.json', use_hash=True)
+        watcher = bsot.CatalogWatcher(bsot.ResourceScanner(cache=cache, roots=roots), self.catalog)
+        watcher.merge.OLD_CSV = self.root / 'out' / 'backup.csv'
+        write_sorted_csv([], watcher.merge.OLD_CSV)
+        with redirect_stdout(io.StringIO()):
+            watcher.start()
+        return watcher
+
+    def poll(self, watcher):
+        """One pass of the watch loop without the sleeps: None if nothing changed, else the delta ops"""
+        tasks, signatures = watcher.snapshot()
+        if signatures == watcher.signatures:
+            return None
+        with redirect_stdout(io.StringIO()):
+            self.counts = watcher.rebuild(tasks, signatures)
+        return read_delta(catalog_delta_path(self.catalog))[1]
+
+    def scripts(self):
+        return [row.Name for row in iter_catalog(self.catalog) if row.Type == 'Script']
+
+    def write_plan(self, status):
+        folder = self.root / 'coderef' / 'workorder' / 'feature'
+        folder.mkdir(parents=True, exist_ok=True)
+        (folder / 'plan.json').write_text(json.dumps({'workorder_id': 'WO-FEATURE-001', 'status': status}),
+                                          encoding='utf-8')
+
+    def test_workorder_edit_triggers_a_rebuild(self):
+        """Editing only a workorder file changes the watch signature and the catalog row."""
+        self.write_plan('pending')
+        watcher = self.watcher(['workorders'])
+        self.assertIsNone(self.poll(watcher))
+
+        self.write_plan('complete')
+        ops = self.poll(watcher)
+
+        self.assertEqual([(op['op'], op['key']) for op in ops],
+                         [('change', ['Workorder', self.root.name, 'WO-FEATURE-001'])])
+        row, = [row for row in iter_catalog(self.catalog) if row.Type == 'Workorder']
+        self.assertTrue(row.Description.endswith(': complete'))
+
+    def test_script_add_remove_and_touch(self):
+        """Added and removed scripts reach the catalog; a touched, unchanged one changes nothing."""
+        scripts = self.root / 'scripts'
+        scripts.mkdir()
+        (scripts / 'sync.py').write_text('"""Sync the index"""\n', encoding='utf-8')
+        watcher = self.watcher(['scripts'], root='ASSISTANT')
+        self.assertEqual(self.scripts(), ['sync.py'])
+
+        added = scripts / 'validate_plan.py'
+        added.write_text('# Check a plan file\n', encoding='utf-8')
+        ops = self.poll(watcher)
+        self.assertEqual(self.counts, (1, 0))
+        self.assertEqual([(op['op'], op['row']['Name'], op['row']['Description']) for op in ops],
+                         [('add', 'validate_plan.py', 'Check a plan file')])
+        self.assertEqual(self.scripts(), ['sync.py', 'validate_plan.py'])
+
+        added.unlink()
+        ops = self.poll(watcher)
+        self.assertEqual(self.counts, (0, 1))
+        self.assertEqual([(op['op'], op['key']) for op in ops],
+                         [('remove', ['Script', 'Orchestrator', 'validate_plan.py'])])
+        self.assertEqual(self.scripts(), ['sync.py'])
+
+        before = self.catalog.read_bytes()
+        stat = (scripts / 'sync.py').stat()
+        os.utime(scripts / 'sync.py', ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        self.assertEqual(self.poll(watcher), [])
+        self.assertEqual(self.counts, (1, 0))
+        self.assertEqual(self.catalog.read_bytes(), before)
+
+        self.assertIsNone(self.poll(watcher))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+"""
+---
+related_script: packages/dashboard/src/app/resources/coderef/catalog_delta.py
+---
+"""
+
+import unittest
+import tempfile
+import shutil
+import os
+from pathlib import Path
+import sys
+
+# Shared pipeline modules live next to this test
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from catalog_io import FIELDNAMES, Resource, iter_catalog, write_sorted_csv
+from catalog_delta import apply_delta, read_delta, write_delta
+
+
+def tool(server, name, description='', status='active'):
+    return Resource('Tool', server, 'General', name, description, status, f'{server}/server.py')
+
+
+OLD = [
+    tool('context', 'scan', 'Scan a project'),
+    tool('context', 'query', 'Query the graph'),
+    tool('docs', 'generate', 'Write docs'),
+    tool('docs', 'retired', 'Old tool', 'deprecated'),
+    Resource('Command', 'system', 'Slash', 'review', 'Review a PR', 'active', 'review.md'),
+]
+NEW = [
+    tool('context', 'scan', 'Scan a project, quickly'),
+    tool('context', 'query', 'Query the graph'),
+    tool('docs', 'generate', 'Write docs', 'beta'),
+    tool('personas', 'ava', 'Frontend persona'),
+    Resource('Command', 'system', 'Slash', 'review', 'Review a PR', 'active', 'review.md'),
+    Resource('Command', 'system', 'Slash', 'ship', 'Ship it', 'active', 'ship.md'),
+]
+
+
+class TestCatalogDelta(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.root = Path(self.test_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def write_catalog(self, name, rows):
+        path = self.root / name
+        write_sorted_csv(rows, path)
+        return path
+
+    def test_apply_reproduces_the_new_catalog(self):
+        """Diffing two catalogs and patching the old one gives back the new file exactly."""
+        old, new = self.write_catalog('old.csv', OLD), self.write_catalog('new.csv', NEW)
+        delta = self.root / 'catalog.delta.jsonl'
+
+        stats = write_delta(old, new, delta)
+        self.assertEqual((stats['added'], stats['removed'], stats['changed'], stats['unchanged']), (2, 1, 2, 2))
+        _, ops, summary = read_delta(delta)
+        self.assertEqual(summary, stats)
+        self.assertEqual({op['op']: op for op in ops}['change']['key'], ['Tool', 'docs', 'generate'])
+
+        output = self.root / 'patched.csv'
+        self.assertEqual(apply_delta(old, delta, output), (len(NEW), True))
+        self.assertEqual(output.read_bytes(), new.read_bytes())
+        self.assertEqual(sorted(iter_catalog(output)), sorted(NEW))
+
+    def test_unsorted_base_is_diffed_after_sorting(self):
+        """A hand-edited, unsorted old catalog still yields a delta that applies to it."""
+        old = self.root / 'backup.csv'
+        lines = [','.join(FIELDNAMES)] + [','.join(row) for row in reversed(OLD)]
+        old.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+        new = self.write_catalog('new.csv', NEW)
+        delta = self.root / 'catalog.delta.jsonl'
+
+        self.assertEqual(write_delta(old, new, delta)['changed'], 2)
+        self.assertEqual(apply_delta(old, delta, self.root / 'patched.csv'), (len(NEW), True))
+
+    def test_apply_rejects_a_different_base(self):
+        """A delta only applies to the catalog it was made from."""
+        old, new = self.write_catalog('old.csv', OLD), self.write_catalog('new.csv', NEW)
+        delta = self.root / 'catalog.delta.jsonl'
+        write_delta(old, new, delta)
+
+        with self.assertRaises(ValueError):
+            apply_delta(new, delta, self.root / 'patched.csv')
+
+
+if __name__ == '__main__':
+    unittest.main()
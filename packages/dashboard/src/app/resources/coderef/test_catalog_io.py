@@ -0,0 +1,97 @@
+"""
+---
+related_script: packages/dashboard/src/app/resources/coderef/catalog_io.py
+---
+"""
+
+import unittest
+import tempfile
+import shutil
+import os
+import random
+from pathlib import Path
+import sys
+
+# Shared pipeline modules live next to this test
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from catalog_io import (ENCODING_SAMPLE_BYTES, FIELDNAMES, Resource, detect_encoding, iter_catalog, load_catalog,
+                        sort_key, sorted_rows, write_sorted_csv)
+
+
+def sample_rows(count, seed=7):
+    """Rows with many sort-key ties; Description records input order"""
+    rng = random.Random(seed)
+    return [Resource(rng.choice(['Tool', 'Script', 'Command']), rng.choice(['a', 'b']), 'General',
+                     f'name-{rng.randrange(count // 4)}', f'input {n}', 'active', f'p{n}.py', '', '')
+            for n in range(count)]
+
+
+class TestCatalogIO(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.root = Path(self.test_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_external_sort_matches_stable_in_memory_sort(self):
+        """Spilled runs merge into the same order as sorted(), ties kept in input order."""
+        rows = sample_rows(500)
+        expected = sorted(rows, key=sort_key)
+
+        for threshold in (1, 7, 64, 500, 10_000):
+            self.assertEqual(list(sorted_rows(iter(rows), threshold=threshold)), expected)
+
+    def test_write_sorted_csv_round_trip(self):
+        """A file written through the external sort reads back as the sorted rows."""
+        rows = sample_rows(200) + [Resource('Tool', 'a', 'General', 'quoted', 'Has "quotes", commas\nand lines')]
+        path = self.root / 'catalog.csv'
+
+        count, type_counts = write_sorted_csv(rows, path, threshold=16)
+
+        self.assertEqual(count, len(rows))
+        self.assertEqual(sum(type_counts.values()), len(rows))
+        self.assertEqual(list(iter_catalog(path)), sorted(rows, key=sort_key))
+        self.assertFalse(path.with_name(path.name + '.tmp').exists())
+
+    def test_detect_encoding(self):
+        """BOMs, BOM-less UTF-16, UTF-8 cut mid-character and cp1252 are told apart."""
+        text = 'Type,Server,Name\nTool,caf\u00e9,r\u00e9sum\u00e9\n'
+        utf8 = text.encode('utf-8')
+        cases = [
+            (text.encode('utf-8-sig'), 'utf-8-sig'),
+            (text.encode('utf-16'), 'utf-16'),
+            (text.encode('utf-32'), 'utf-32'),
+            (text.encode('utf-16-le'), 'utf-16-le'),
+            (text.encode('utf-16-be'), 'utf-16-be'),
+            (utf8, 'utf-8'),
+            (utf8[:utf8.index('\u00e9'.encode('utf-8')) + 1], 'utf-8'),
+            (text.encode('cp1252'), 'cp1252'),
+        ]
+        for sample, expected in cases:
+            self.assertEqual(detect_encoding(sample), expected, sample[:12])
+
+    def test_catalogs_read_in_every_backup_encoding(self):
+        """The same catalog reads back identically whatever encoding it was saved in."""
+        rows = [Resource('Tool', 'caf\u00e9', 'General', 'r\u00e9sum\u00e9', 'Quotes \u201cfancy\u201d', 'active')]
+        text = ','.join(FIELDNAMES) + '\r\n' + ','.join(rows[0]) + '\r\n'
+        for encoding in ('utf-8', 'utf-8-sig', 'utf-16', 'cp1252'):
+            path = self.root / f'{encoding}.csv'
+            path.write_bytes(text.encode(encoding))
+            self.assertEqual(list(iter_catalog(path)), rows, encoding)
+
+    def test_load_catalog_falls_back_past_the_sample(self):
+        """A cp1252 byte beyond the detection sample triggers the fallback re-parse."""
+        filler = Resource('Tool', 'srv', 'General', 'filler', 'x' * 200, 'active')
+        late = Resource('Tool', 'srv', 'General', 'late', 'caf\u00e9', 'active')
+        rows = [filler._replace(Name=f'filler-{n}') for n in range(ENCODING_SAMPLE_BYTES // 200)] + [late]
+        lines = [','.join(FIELDNAMES)] + [','.join(row) for row in rows]
+        path = self.root / 'late.csv'
+        path.write_bytes('\n'.join(lines).encode('cp1252') + b'\n')
+
+        self.assertEqual(detect_encoding(path.read_bytes()[:ENCODING_SAMPLE_BYTES]), 'utf-8')
+        self.assertEqual(load_catalog(path), rows)
+
+
+if __name__ == '__main__':
+    unittest.main()
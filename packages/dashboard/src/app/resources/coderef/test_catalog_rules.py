@@ -0,0 +1,108 @@
+"""
+---
+related_script: packages/dashboard/src/app/resources/coderef/catalog_rules.py
+---
+"""
+
+import unittest
+import tempfile
+import shutil
+import os
+import importlib.util
+from pathlib import Path
+import sys
+
+# Shared pipeline modules live next to this test
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from catalog_io import Resource, write_sorted_csv
+from catalog_rules import check_rows, select_rules
+
+
+def load_script(filename):
+    """Import a hyphenated pipeline script"""
+    path = Path(__file__).parent / filename
+    spec = importlib.util.spec_from_file_location(filename[:-3].replace('-', '_'), path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+bsot = load_script('build-source-of-truth.py')
+
+
+class TestCatalogRules(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.root = Path(self.test_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def scanner(self, scanners):
+        roots = {'DASHBOARD': bsot.ScanRoot('DASHBOARD', self.root, frozenset(scanners))}
+        scanner = bsot.ResourceScanner(roots=roots)
+        scanner.verbose = False
+        return scanner
+
+    def path_issues(self, rows):
+        results = check_rows(rows, select_rules(['path-exists']), jobs=1)
+        return [issue for result in results for issue in result.issues]
+
+    def test_scanned_tab_rows_pass_path_exists(self):
+        """Tab rows point at the resources page file, which path-exists accepts."""
+        page = self.root / 'packages' / 'dashboard' / 'src' / 'app' / 'resources' / 'page.tsx'
+        page.parent.mkdir(parents=True)
+        page.write_text('export default function Page() {}\n', encoding='utf-8')
+
+        scanner = self.scanner(['tabs'])
+        rows = list(scanner.iter_tasks(scanner.dashboard_tab_tasks()))
+
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(self.path_issues(rows), [])
+
+    def test_scanned_workorder_rows_pass_path_exists(self):
+        """Workorder rows point at their folder, which path-exists accepts."""
+        for dirname in ('workorder', 'archived'):
+            folder = self.root / 'coderef' / dirname / f'{dirname}-feature'
+            folder.mkdir(parents=True)
+            (folder / 'plan.json').write_text('{"workorder_id": "WO-%s-001", "status": "pending"}' % dirname.upper(),
+                                              encoding='utf-8')
+
+        rows = self.scanner(['workorders']).workorder_rows()
+
+        self.assertEqual(sorted(row.Category for row in rows), ['Active', 'Archived'])
+        self.assertEqual(self.path_issues(rows), [])
+
+    def test_path_exists_reports_missing_and_wrong_kind(self):
+        """A missing path or a directory where a file is expected is reported."""
+        folder = self.root / 'scripts'
+        folder.mkdir()
+        rows = [
+            Resource('Script', 'x', 'General', 'gone', 'd', 'active', str(self.root / 'gone.py'), '', ''),
+            Resource('Script', 'x', 'General', 'folder', 'd', 'active', str(folder), '', ''),
+            Resource('Workflow', 'x', 'General', 'steps', 'd', 'active', 'a -> b', '', ''),
+        ]
+
+        issues = self.path_issues(rows)
+
+        self.assertEqual([name for name, _ in issues], ['path-exists', 'path-exists'])
+        self.assertIn('path not found', issues[0][1])
+        self.assertIn('expected a file', issues[1][1])
+
+    def test_collect_stats_caps_listed_issues(self):
+        """Past max_issues failing rows, validate-csv only counts them."""
+        validate = load_script('validate-csv.py')
+        csv_path = self.root / 'catalog.csv'
+        write_sorted_csv([Resource('Script', 'x', 'General', f'script-{n}', 'd', 'bogus', 'a.py', '', '')
+                          for n in range(10)], csv_path)
+
+        report = validate.collect_stats(csv_path, select_rules(['status']), jobs=1, max_issues=3)
+
+        self.assertEqual(report['violations'], {'status': 10})
+        self.assertEqual(report['rows_with_issues'], 10)
+        self.assertEqual([entry['row'] for entry in report['issues']], [1, 2, 3])
+        self.assertEqual(report['issues_omitted'], 7)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+---
+related_script: packages/dashboard/src/app/resources/coderef/catalog_search.py
+---
+"""
+
+import unittest
+import tempfile
+import shutil
+import os
+import random
+from pathlib import Path
+import sys
+
+# Shared pipeline modules live next to this test
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from catalog_io import Resource
+from catalog_search import SearchIndex, update_search_index
+
+WORDS = ['scan', 'query', 'graph', 'docs', 'persona', 'workorder', 'review', 'deploy', 'index', 'search']
+QUERIES = ['scan', 'graph query', 'docs review', 'work', 'serch', 'deploy index search', 'missing']
+
+
+def sample_rows(count=48, seed=3):
+    rng = random.Random(seed)
+    return [Resource('Tool', f'srv{n % 3}', 'General', f'tool-{n}', ' '.join(rng.sample(WORDS, 3)), 'active')
+            for n in range(count)]
+
+
+def results(index, query, match_all=True):
+    """Every hit as key -> score; doc ids (and so tie order) may differ between indexes"""
+    return {hit.key: hit.score for hit in index.search(query, limit=1000, match_all=match_all)}
+
+
+class TestCatalogSearch(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.root = Path(self.test_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def assertSameResults(self, index, expected):
+        for query in QUERIES:
+            for match_all in (True, False):
+                self.assertEqual(results(index, query, match_all), results(expected, query, match_all),
+                                 (query, match_all))
+
+    def test_incremental_update_matches_a_rebuild(self):
+        """Adding, removing and editing rows gives the same hits and scores as a fresh build."""
+        old = sample_rows()
+        new = list(old)
+        # Same token counts throughout, so the build-time avgdl still holds
+        new[5] = new[5]._replace(Description='graph graph graph')
+        new[17] = new[17]._replace(Description='search deploy review')
+        del new[30]
+        new.append(Resource('Tool', 'srv9', 'General', 'tool-99', 'workorder index docs', 'active'))
+        new.append(new[0])
+
+        index = SearchIndex.build(old)
+        self.assertEqual(index.update(new), {'added': 2, 'removed': 1, 'changed': 2})
+        rebuilt = SearchIndex.build(new)
+
+        self.assertEqual(index.size, rebuilt.size)
+        self.assertEqual(sorted(key for key in index.keys if key), sorted(rebuilt.keys))
+        self.assertSameResults(index, rebuilt)
+
+    def test_large_changes_ask_for_a_rebuild(self):
+        """Past REBUILD_RATIO of the documents, update() returns None."""
+        rows = sample_rows()
+        self.assertIsNone(SearchIndex.build(rows).update(rows[:len(rows) // 2]))
+
+    def test_saved_index_searches_the_same(self):
+        """An index reloaded from disk, then updated there, answers like the original."""
+        rows = sample_rows()
+        path = self.root / 'catalog.search.idx'
+
+        index, counts = update_search_index(rows, path)
+        self.assertIsNone(counts)
+        self.assertSameResults(SearchIndex.load(path), index)
+
+        rows[3] = rows[3]._replace(Description='persona persona scan')
+        index, counts = update_search_index(rows, path)
+        self.assertEqual(counts, {'added': 0, 'removed': 0, 'changed': 1})
+        self.assertSameResults(SearchIndex.load(path), SearchIndex.build(rows))
+
+
+if __name__ == '__main__':
+    unittest.main()
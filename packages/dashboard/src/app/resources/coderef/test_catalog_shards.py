@@ -0,0 +1,75 @@
+"""
+---
+related_script: packages/dashboard/src/app/resources/coderef/catalog_shards.py
+---
+"""
+
+import unittest
+import tempfile
+import shutil
+import os
+from pathlib import Path
+import sys
+
+# Shared pipeline modules live next to this test
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from catalog_io import Resource, sort_key, write_sorted_csv
+from catalog_shards import merge_shards, verify_shard, write_shard_manifest
+
+WORKFLOW = Resource('Workflow', 'system', 'Workflows', 'create-workorder', 'Plan a feature', 'active', 'a -> b')
+
+
+def tool(server, name, description='', category='General'):
+    return Resource('Tool', server, category, name, description, 'active', f'{server}/server.py')
+
+
+class TestCatalogShards(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.root = Path(self.test_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def write_shard(self, name, rows):
+        path = self.root / name
+        total, _ = write_sorted_csv(rows, path)
+        write_shard_manifest(path, total, {'roots': {name: {}}})
+        return path
+
+    def test_merge_order_matches_sorted_concatenation(self):
+        """The k-way merge is a stable sort of the shards in order, minus verbatim repeats."""
+        shards = [
+            [tool('docs', 'b'), tool('context', 'a', 'from shard 1'), WORKFLOW, tool('docs', 'z')],
+            [tool('context', 'a', 'from shard 2'), WORKFLOW, tool('personas', 'c')],
+            [tool('docs', 'b'), WORKFLOW, tool('context', 'a', 'from shard 1', 'Code Intelligence')],
+        ]
+        paths = [self.write_shard(f'shard{n}.csv', rows) for n, rows in enumerate(shards)]
+
+        stats = {}
+        merged = list(merge_shards(paths, stats))
+
+        expected = []
+        for row in sorted((row for rows in shards for row in rows), key=sort_key):
+            if not expected or expected[-1] != row:
+                expected.append(row)
+        self.assertEqual(merged, expected)
+        self.assertEqual([row.Description for row in merged if row.Name == 'a' and row.Category == 'General'],
+                         ['from shard 1', 'from shard 2'])
+        self.assertEqual(stats['shard_duplicates'], 3)
+
+    def test_unsorted_or_modified_shards_are_rejected(self):
+        """A shard edited after its manifest, or not in sort order, raises ValueError."""
+        path = self.write_shard('shard.csv', [tool('docs', 'a')])
+        self.assertEqual(verify_shard(path)['rows'], 1)
+
+        with open(path, 'a', encoding='utf-8', newline='') as f:
+            f.write(','.join(tool('context', 'b')) + '\r\n')
+        with self.assertRaises(ValueError):
+            verify_shard(path)
+        with self.assertRaises(ValueError):
+            list(merge_shards([path]))
+
+
+if __name__ == '__main__':
+    unittest.main()
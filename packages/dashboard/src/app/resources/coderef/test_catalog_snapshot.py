@@ -0,0 +1,58 @@
+"""
+---
+related_script: packages/dashboard/src/app/resources/coderef/catalog_snapshot.py
+---
+"""
+
+import unittest
+import tempfile
+import shutil
+import os
+import gzip
+import json
+from pathlib import Path
+import sys
+
+# Shared pipeline modules live next to this test
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from catalog_io import Resource
+from catalog_snapshot import read_snapshot_hash, read_snapshot_source, write_snapshot
+
+ROWS = [Resource('Tool', 'srv', 'General', 'alpha', ' padded description ', 'active', 'a.py', '', '')]
+
+
+class TestCatalogSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.snapshot = Path(self.test_dir) / 'catalog.json.gz'
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_sidecar_tracks_the_source_csv_hash(self):
+        """An unchanged payload keeps its bytes and ETag but records the new CSV hash."""
+        content_hash, rewritten = write_snapshot(ROWS, self.snapshot, 'a' * 64)
+        self.assertTrue(rewritten)
+        original = self.snapshot.read_bytes()
+
+        self.assertEqual(write_snapshot(ROWS, self.snapshot, 'b' * 64), (content_hash, False))
+
+        self.assertEqual(self.snapshot.read_bytes(), original)
+        self.assertEqual(read_snapshot_hash(self.snapshot), content_hash)
+        self.assertEqual(read_snapshot_source(self.snapshot), 'b' * 64)
+
+    def test_values_are_trimmed_like_the_csv_fallback(self):
+        """Unquoted values lose surrounding spaces and tabs; values the CSV quotes keep them."""
+        rows = ROWS + [Resource('Tool', ' srv\t', 'General', 'beta', ' keeps, its padding ', 'active', '', '', '')]
+        write_snapshot(rows, self.snapshot)
+
+        with gzip.open(self.snapshot, 'rt', encoding='utf-8') as f:
+            payload = json.load(f)
+        self.assertEqual([row['Description'] for row in payload['data']],
+                         ['padded description', ' keeps, its padding '])
+        self.assertEqual(payload['aggregates']['by_server'], {'srv': 2})
+        self.assertEqual(read_snapshot_source(self.snapshot), '')
+
+
+if __name__ == '__main__':
+    unittest.main()
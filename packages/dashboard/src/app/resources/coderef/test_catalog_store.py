@@ -0,0 +1,97 @@
+"""
+---
+related_script: packages/dashboard/src/app/resources/coderef/catalog_store.py
+---
+"""
+
+import unittest
+import tempfile
+import shutil
+import os
+from pathlib import Path
+import sys
+
+# Shared pipeline modules live next to this test
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import catalog_store
+from catalog_store import CatalogStore
+
+HEADER = 'Type,Server,Category,Name,Description,Status,Path,Created,LastUpdated'
+
+
+def catalog_text(names, newline='\n'):
+    lines = [HEADER] + [f'Tool,srv,General,{name},"Does {name}, quickly",active,C:\\x\\{name}.py,,' for name in names]
+    return newline.join(lines) + newline
+
+
+class TestCatalogStore(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.root = Path(self.test_dir)
+        self.store = CatalogStore(self.root / 'store')
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def write_csv(self, name, text, encoding='utf-8'):
+        path = self.root / name
+        with open(path, 'w', encoding=encoding, newline='') as f:
+            f.write(text)
+        return path
+
+    def test_restores_are_byte_identical(self):
+        """Keyframes, diffs, CRLF and BOM files all restore to the exact original bytes."""
+        versions = [
+            self.write_csv('a.csv', catalog_text(['alpha', 'beta', 'gamma'])),
+            self.write_csv('b.csv', catalog_text(['alpha', 'delta', 'gamma', 'beta'], '\r\n'), 'utf-8-sig'),
+            self.write_csv('c.csv', catalog_text(['gamma', 'alpha', 'alpha', 'epsilon'])),
+        ]
+        ids = [self.store.snapshot(path)[0] for path in versions]
+
+        self.assertEqual(ids, ['0001', '0002', '0003'])
+        for snapshot_id, original in zip(ids, versions):
+            restored = self.root / f'restored-{snapshot_id}.csv'
+            self.assertTrue(CatalogStore(self.store.root).restore(snapshot_id, restored))
+            self.assertEqual(restored.read_bytes(), original.read_bytes())
+
+    def test_diff_copies_runs_and_lists_new_hashes(self):
+        """The hash-matched diff keeps runs of base rows as single copy ops."""
+        ops = CatalogStore._diff(['h', 'a', 'b', 'c', 'd'], ['h', 'a', 'b', 'x', 'y', 'd', 'c'])
+
+        self.assertEqual(ops, [['=', 0, 3], ['+', 'x', 'y'], ['=', 4, 5], ['=', 3, 4]])
+
+    def test_identical_file_adds_its_label(self):
+        """A copy of the latest snapshot stores nothing but keeps its label."""
+        first = self.write_csv('backup-1.csv', catalog_text(['alpha']))
+        second = self.write_csv('backup-2.csv', catalog_text(['alpha']))
+
+        self.assertEqual(self.store.snapshot(first, first.name), ('0001', 2))
+        self.assertEqual(self.store.snapshot(second, second.name), ('0001', 0))
+        self.assertEqual(self.store.snapshot(second, second.name), ('0001', 0))
+
+        self.assertEqual(CatalogStore(self.store.root).info('0001').labels, ('backup-1.csv', 'backup-2.csv'))
+
+    def test_pack_index_is_persisted_and_rebuilt(self):
+        """Snapshots use the saved hash -> pack index; a stale or missing one is rebuilt."""
+        self.store.snapshot(self.write_csv('a.csv', catalog_text(['alpha', 'beta'])))
+        self.store.snapshot(self.write_csv('b.csv', catalog_text(['alpha', 'gamma'])))
+        expected = CatalogStore(self.store.root).pack_index()
+        self.assertEqual(sorted(set(expected.values())), ['0001', '0002'])
+
+        original = catalog_store._read_gzip_json
+        opened = []
+        catalog_store._read_gzip_json = lambda path: opened.append(Path(path).name) or original(path)
+        try:
+            CatalogStore(self.store.root).snapshot(self.write_csv('c.csv', catalog_text(['beta', 'delta'])))
+        finally:
+            catalog_store._read_gzip_json = original
+        self.assertFalse([name for name in opened if name.endswith('.jsonl.gz')])
+
+        self.store.index_path.unlink()
+        rebuilt = CatalogStore(self.store.root).pack_index()
+        self.assertEqual(len(rebuilt), len(expected) + 1)
+        self.assertTrue(self.store.index_path.exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
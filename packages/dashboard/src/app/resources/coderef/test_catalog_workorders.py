@@ -0,0 +1,87 @@
+"""
+---
+related_script: packages/dashboard/src/app/resources/coderef/catalog_workorders.py
+---
+"""
+
+import unittest
+import tempfile
+import shutil
+import os
+import json
+import importlib.util
+from pathlib import Path
+import sys
+
+# Shared pipeline modules live next to this test
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from catalog_workorders import WorkorderIndex, summarize
+
+
+def load_script(filename):
+    """Import a hyphenated pipeline script"""
+    path = Path(__file__).parent / filename
+    spec = importlib.util.spec_from_file_location(filename[:-3].replace('-', '_'), path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class TestCatalogWorkorders(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.root = Path(self.test_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def write_workorder(self, name, files):
+        folder = self.root / 'coderef' / 'workorder' / name
+        folder.mkdir(parents=True)
+        for filename, data in files.items():
+            (folder / filename).write_text(json.dumps(data), encoding='utf-8')
+        return folder
+
+    def test_timestamps_come_from_json_and_are_ordered(self):
+        """Mixed date formats are normalized and Created never follows LastUpdated."""
+        folder = self.write_workorder('feature', {
+            'context.json': {'last_updated': '2026-01-11'},
+            'execution-log.json': [{'timestamp': '2026-01-11T16:25:37.347202'}],
+            'plan.json': {'created_at': '2026-01-09T18:00:00Z'},
+        })
+
+        summary, = WorkorderIndex(None).scan([self.root / 'coderef'])
+
+        self.assertEqual(summary.path, str(folder))
+        self.assertEqual(summary.created, '2026-01-09T18:00:00+00:00')
+        self.assertEqual(summary.updated, '2026-01-11T16:25:37+00:00')
+
+    def test_update_only_stamp_does_not_fall_back_to_mtime(self):
+        """A lone last_updated date sets both timestamps instead of mixing in the file mtime."""
+        summary = summarize(self.root, 'active', {'context.json': {'updated': '2026-01-12'}},
+                            {'context.json': 1_900_000_000 * 10 ** 9})
+
+        self.assertEqual((summary.created, summary.updated),
+                         ('2026-01-12T00:00:00+00:00', '2026-01-12T00:00:00+00:00'))
+
+    def test_scanner_writes_workorder_index_to_the_given_path(self):
+        """The scanner persists the index where it is told to, and reuses it on the next scan."""
+        bsot = load_script('build-source-of-truth.py')
+        self.write_workorder('feature', {'plan.json': {'workorder_id': 'WO-FEATURE-001', 'status': 'pending'}})
+        roots = {'DASHBOARD': bsot.ScanRoot('DASHBOARD', self.root, frozenset(['workorders']))}
+        index_path = self.root / 'index' / 'workorder-index.json'
+
+        scanner = bsot.ResourceScanner(roots=roots, workorder_index=index_path)
+        scanner.verbose = False
+        rows = scanner.workorder_rows()
+
+        self.assertEqual([row.Name for row in rows], ['WO-FEATURE-001'])
+        self.assertTrue(index_path.exists())
+        index = WorkorderIndex(index_path)
+        index.load()
+        index.scan([self.root / 'coderef'])
+        self.assertEqual((index.parsed, index.skipped), (0, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
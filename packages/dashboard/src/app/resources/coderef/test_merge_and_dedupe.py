@@ -0,0 +1,177 @@
+"""
+---
+related_script: packages/dashboard/src/app/resources/coderef/merge-and-dedupe.py
+---
+"""
+
+import unittest
+import tempfile
+import shutil
+import os
+import csv
+import importlib.util
+import io
+import sqlite3
+from contextlib import redirect_stdout
+from pathlib import Path
+import sys
+
+# Shared pipeline modules live next to this test
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from catalog_io import FIELDNAMES, Resource, sort_key, write_sorted_csv
+from catalog_shards import merge_shards, write_shard_manifest
+
+
+def load_script(filename):
+    """Import a hyphenated pipeline script"""
+    path = Path(__file__).parent / filename
+    spec = importlib.util.spec_from_file_location(filename[:-3].replace('-', '_'), path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+merge = load_script('merge-and-dedupe.py')
+
+
+def row(type_, server, name, description):
+    return Resource(type_, server, 'General', name, description, 'active', f'{name}.py')
+
+
+OLD = [
+    row('Tool', 'docs', 'generate', 'curated'),
+    row('Tool', 'docs', 'generate', 'curated twice'),
+    row('Command', 'docs', 'review', 'curated'),
+    row('Command', 'assistant', 'plan', 'curated'),
+    row('Script', 'system', 'sync', 'stale'),
+]
+SCANNED = sorted([
+    row('Tool', 'docs', 'generate', 'scanned'),
+    row('Tool', 'docs', 'audit', 'scanned'),
+    row('Command', 'docs', 'review', 'scanned'),
+    row('Command', 'assistant', 'review', 'scanned'),
+    row('Script', 'system', 'sync', 'scanned'),
+], key=sort_key)
+
+
+def outcome(precedence=None):
+    """(description of each kept row by (Type, Name), [(source, reason, description)] dropped)"""
+    merged, stats = merge.merge_resources(SCANNED, OLD, precedence)
+    kept = {(r.Type, r.Name): r.Description for r in merged}
+    dropped = sorted((source, reason, r.Description) for source, reason, r in stats['dropped'])
+    return kept, dropped
+
+
+class TestMergeAndDedupe(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.root = Path(self.test_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_default_precedence(self):
+        """Old Tools beat scanned ones, scanned Commands are ignored, other Types come from the scan."""
+        kept, dropped = outcome()
+
+        self.assertEqual(kept, {('Tool', 'generate'): 'curated', ('Tool', 'audit'): 'scanned',
+                                ('Command', 'review'): 'curated', ('Script', 'sync'): 'scanned'})
+        self.assertEqual(dropped, sorted([
+            ('old', 'duplicate key', 'curated twice'),
+            ('old', 'assistant command', 'curated'),
+            ('old', 'type rebuilt by scanner', 'stale'),
+            ('scanned', 'old row takes precedence', 'scanned'),
+            ('scanned', 'Command rows come from old CSV', 'scanned'),
+            ('scanned', 'assistant duplicate of MCP command', 'scanned'),
+        ]))
+
+    def test_scanned_precedence_replaces_old_rows(self):
+        """Type=scanned lets the scanned row win and reports the old one as replaced."""
+        kept, dropped = outcome(merge.parse_precedence(['Tool=scanned', 'Command=scanned']))
+
+        self.assertEqual(kept[('Tool', 'generate')], 'scanned')
+        self.assertEqual(kept[('Command', 'review')], 'scanned')
+        self.assertEqual([entry for entry in dropped if entry[1] == 'scanned row takes precedence'],
+                         [('old', 'scanned row takes precedence', 'curated')] * 2)
+        # An assistant Command named like an MCP Command is still a duplicate
+        self.assertIn(('scanned', 'assistant duplicate of MCP command', 'scanned'), dropped)
+
+    def test_old_only_ignores_scanned_rows(self):
+        """Type=old-only drops every scanned row of that Type, even without a conflict."""
+        kept, dropped = outcome({'Tool': 'old-only'})
+
+        self.assertEqual([key for key in kept if key[0] == 'Tool'], [('Tool', 'generate')])
+        self.assertEqual([entry for entry in dropped if entry[1] == 'Tool rows come from old CSV'],
+                         [('scanned', 'Tool rows come from old CSV', 'scanned')] * 2)
+
+    def test_parse_precedence_rejects_unknown_sources(self):
+        """Only old, scanned and old-only are valid sources."""
+        self.assertEqual(merge.parse_precedence(['Script=old-only']), {'Script': 'old-only'})
+        with self.assertRaises(ValueError):
+            merge.parse_precedence(['Tool=newest'])
+
+    def test_dropped_report(self):
+        """The report lists each dropped row with its source and reason."""
+        _, stats = merge.merge_resources(SCANNED, OLD)
+        report = self.root / 'merge-dropped-rows.csv'
+
+        merge.write_dropped_report(stats['dropped'], report)
+
+        with open(report, newline='', encoding='utf-8') as f:
+            lines = list(csv.reader(f))
+        self.assertEqual(lines[0], ['Source', 'Reason'] + FIELDNAMES)
+        self.assertEqual(len(lines) - 1, len(stats['dropped']))
+        self.assertIn(['old', 'type rebuilt by scanner'] + list(OLD[4]), lines)
+
+    def test_shard_stream_dedupes_keys_per_group(self):
+        """Same-key rows from different shards collapse even when other rows sort between them."""
+        shards = []
+        for n, category in enumerate(['Alpha', 'Zeta']):
+            path = self.root / f'shard{n}.csv'
+            rows = [row('Script', 'system', 'sync', f'shard {n}')._replace(Category=category),
+                    row('Script', 'system', f'only-{n}', f'shard {n}')._replace(Category='Middle')]
+            write_shard_manifest(path, write_sorted_csv(rows, path)[0], {})
+            shards.append(path)
+
+        stats = {}
+        merged = list(merge.iter_merged(merge_shards(shards), [], stats))
+
+        self.assertEqual([(r.Name, r.Description) for r in merged],
+                         [('sync', 'shard 0'), ('only-0', 'shard 0'), ('only-1', 'shard 1')])
+        self.assertEqual([(source, reason, r.Description) for source, reason, r in stats['dropped']],
+                         [('scanned', 'duplicate key', 'shard 1')])
+
+    def test_unsorted_stream_is_rejected(self):
+        """Streamed scanned rows out of (Type, Server) order raise instead of missing duplicates."""
+        rows = [row('Script', 'system', 'sync', 'a'), row('Script', 'docs', 'build', 'b')]
+
+        with self.assertRaises(merge.UnsortedCatalog):
+            list(merge.iter_merged(iter(rows), [], {}))
+        self.assertEqual(len(merge.merge_resources(rows, [])[0]), 2)
+
+    def test_sqlite_export(self):
+        """write_csv's SQLite catalog holds every merged row and answers FTS5 queries."""
+        merged, _ = merge.merge_resources(SCANNED, OLD)
+        db_path = self.root / 'catalog.db'
+
+        with redirect_stdout(io.StringIO()):
+            total, _ = merge.write_csv(merged, self.root / 'catalog.csv', db_path=db_path)
+
+        conn = sqlite3.connect(db_path)
+        try:
+            self.assertEqual(conn.execute('SELECT COUNT(*) FROM resources').fetchone()[0], total)
+            row_count = conn.execute("SELECT value FROM meta WHERE key = 'row_count'").fetchone()[0]
+            self.assertEqual(row_count, str(total))
+            has_fts = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'resources_fts'").fetchone()
+            if not has_fts:
+                self.skipTest(f'SQLite {sqlite3.sqlite_version} has no FTS5')
+            matches = conn.execute('SELECT r.Type, r.Name FROM resources_fts '
+                                   'JOIN resources r ON r.id = resources_fts.rowid '
+                                   "WHERE resources_fts MATCH 'audit'").fetchall()
+        finally:
+            conn.close()
+        self.assertEqual(matches, [('Tool', 'audit')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+---
+related_script: packages/dashboard/src/app/resources/coderef/validate-csv.py
+---
+"""
+
+import unittest
+import tempfile
+import shutil
+import os
+import json
+import subprocess
+from pathlib import Path
+import sys
+
+# Shared pipeline modules live next to this test
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from catalog_io import Resource, write_sorted_csv
+
+SCRIPT = Path(__file__).parent / 'validate-csv.py'
+
+
+class TestValidateCsv(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.root = Path(self.test_dir)
+        scripts = self.root / 'scripts'
+        scripts.mkdir()
+        for name in ('build.py', 'sync.py'):
+            (scripts / name).write_text('# script\n', encoding='utf-8')
+        stamp = '2026-01-02T03:04:05'
+        self.csv_path = self.root / 'catalog.csv'
+        write_sorted_csv([
+            Resource('Script', 'system', 'Utilities', 'build.py', 'Build it', 'active',
+                     str(scripts / 'build.py'), stamp, stamp),
+            Resource('Script', 'system', 'Utilities', 'sync.py', 'Sync it', 'active',
+                     str(scripts / 'sync.py'), stamp, stamp),
+            Resource('Script', 'system', 'Utilities', 'gone.py', 'Was deleted', 'active',
+                     str(scripts / 'gone.py'), stamp, stamp),
+            Resource('Script', 'system', 'Utilities', 'sync.py', 'Copied twice', 'active',
+                     str(scripts / 'sync.py'), stamp, stamp),
+            Resource('Workflow', 'system', 'Workflows', 'release', 'Ship it', 'active', 'build -> sync', stamp, stamp),
+        ], self.csv_path)
+        self.report_path = self.root / 'report.json'
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def validate(self, *args):
+        return subprocess.run([sys.executable, str(SCRIPT), '--path', str(self.csv_path),
+                               '--json', str(self.report_path), '--jobs', '4', *args],
+                              capture_output=True, text=True)
+
+    def test_report_and_exit_code(self):
+        """One missing path and one duplicate key are reported; --strict turns them into exit 1."""
+        run = self.validate('--strict')
+
+        self.assertEqual(run.returncode, 1, run.stderr)
+        with open(self.report_path, encoding='utf-8') as f:
+            report = json.load(f)
+        self.assertEqual(report['total'], 5)
+        self.assertEqual(report['violations'], {'required-fields': 0, 'status': 0, 'iso-dates': 0,
+                                                'unique-key': 1, 'path-exists': 1})
+        self.assertEqual(report['rows_with_issues'], 2)
+        self.assertEqual(report['issues_omitted'], 0)
+        issues = {tuple(entry['key']): [issue['rule'] for issue in entry['issues']] for entry in report['issues']}
+        self.assertEqual(issues, {('Script', 'system', 'gone.py'): ['path-exists'],
+                                  ('Script', 'system', 'sync.py'): ['unique-key']})
+        self.assertIn('[WARN] row', run.stdout)
+
+    def test_default_run_only_reports(self):
+        """Without --strict the same findings still exit 0; --rules narrows the checks."""
+        self.assertEqual(self.validate().returncode, 0)
+
+        self.assertEqual(self.validate('--strict', '--rules', 'status,iso-dates').returncode, 0)
+        with open(self.report_path, encoding='utf-8') as f:
+            self.assertEqual(json.load(f)['rows_with_issues'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
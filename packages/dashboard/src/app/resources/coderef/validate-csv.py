@@ -1,60 +1,168 @@
 #!/usr/bin/env python3
 """Validate FINAL CSV completeness"""
 
-import csv
+import argparse
+import json
+import os
+import sys
 from pathlib import Path
 from collections import Counter
+from typing import List
+
+# Shared pipeline modules live next to this script
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from catalog_io import iter_catalog
+from catalog_profile import PROFILER, add_profile_arguments, profile_session
+from catalog_rules import REQUIRED_FIELDS, RULES, Rule, check_rows, select_rules
 
 RESOURCES_DIR = Path(__file__).parent
 FINAL_CSV = RESOURCES_DIR / "tools-and-commands.csv"
 
-def validate_csv():
-    """Validate CSV structure and contents"""
-    with open(FINAL_CSV, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        data = list(reader)
+# Rule violations listed in the text report
+MAX_PRINTED_ISSUES = 20
+
+# Rows whose issues are kept for the JSON report; past this only the counts grow,
+# so memory stays bounded however many rows fail
+MAX_REPORTED_ISSUES = 1000
+
+
+def collect_stats(path: Path, rules: List[Rule] = None, jobs: int = 8,
+                  max_issues: int = MAX_REPORTED_ISSUES) -> dict:
+    """
+    Stream the CSV once, accumulating every counter and the first sample per type,
+    and run the validation rules on each row as it passes. The issues of the
+    first max_issues failing rows are kept; later ones are only counted.
+    """
+    total = 0
+    type_counts = Counter()
+    server_counts = Counter()
+    missing = Counter({field: 0 for field in REQUIRED_FIELDS})
+    samples = {}
+    violations = Counter({rule.name: 0 for rule in rules or []})
+    issues = []
+    rows_with_issues = 0
+
+    for result in check_rows(iter_catalog(path), rules or [], jobs):
+        r = result.resource
+        for name, message in result.issues:
+            violations[name] += 1
+        if result.issues:
+            rows_with_issues += 1
+        if result.issues and len(issues) < max_issues:
+            issues.append({
+                'row': result.row,
+                'key': list(r.key),
+                'issues': [{'rule': name, 'message': message} for name, message in result.issues],
+            })
+        total += 1
+        type_counts[r.Type] += 1
+        server_counts[r.Server] += 1
+        for field in REQUIRED_FIELDS:
+            if not getattr(r, field):
+                missing[field] += 1
+        if r.Type not in samples:
+            samples[r.Type] = {'Name': r.Name, 'Server': r.Server, 'Category': r.Category}
 
+    return {
+        'path': str(path),
+        'total': total,
+        'by_type': dict(sorted(type_counts.items())),
+        'by_server': dict(sorted(server_counts.items())),
+        'missing': dict(missing),
+        'samples': dict(sorted(samples.items())),
+        'violations': dict(violations),
+        'rows_with_issues': rows_with_issues,
+        'issues': issues,
+        'issues_omitted': rows_with_issues - len(issues),
+    }
+
+
+def print_report(report: dict):
+    """Human-readable report"""
     print("=" * 60)
     print("CSV VALIDATION REPORT")
     print("=" * 60)
 
-    print(f"\nTotal resources: {len(data)}")
+    print(f"\nTotal resources: {report['total']}")
 
-    # Count by type
-    type_counts = Counter(r['Type'] for r in data)
     print("\nBreakdown by Type:")
-    for rtype, count in sorted(type_counts.items()):
+    for rtype, count in report['by_type'].items():
         print(f"  {rtype:15} {count:4}")
 
-    # Count by server
-    server_counts = Counter(r['Server'] for r in data)
     print("\nBreakdown by Server:")
-    for server, count in sorted(server_counts.items()):
+    for server, count in report['by_server'].items():
         print(f"  {server:20} {count:4}")
 
-    # Check for missing data
-    missing_desc = [r for r in data if not r['Description']]
-    missing_status = [r for r in data if not r['Status']]
-    missing_path = [r for r in data if not r['Path']]
-
     print("\nData Quality:")
-    print(f"  Missing Description: {len(missing_desc)}")
-    print(f"  Missing Status: {len(missing_status)}")
-    print(f"  Missing Path: {len(missing_path)}")
+    for field in REQUIRED_FIELDS:
+        print(f"  Missing {field}: {report['missing'][field]}")
 
-    # Sample of each type
     print("\nSample Entries by Type:")
-    for rtype in sorted(type_counts.keys()):
-        sample = next((r for r in data if r['Type'] == rtype), None)
-        if sample:
-            print(f"\n  {rtype}:")
-            print(f"    Name: {sample['Name']}")
-            print(f"    Server: {sample['Server']}")
-            print(f"    Category: {sample['Category']}")
+    for rtype, sample in report['samples'].items():
+        print(f"\n  {rtype}:")
+        print(f"    Name: {sample['Name']}")
+        print(f"    Server: {sample['Server']}")
+        print(f"    Category: {sample['Category']}")
+
+    if report['violations']:
+        print("\nRule Violations:")
+        for name, count in report['violations'].items():
+            print(f"  {name:20} {count:4}")
+        print(f"  Rows with issues: {report['rows_with_issues']}")
+
+        for entry in report['issues'][:MAX_PRINTED_ISSUES]:
+            type_, server, name = entry['key']
+            for issue in entry['issues']:
+                print(f"  [WARN] row {entry['row']} {type_}/{server}/{name}: {issue['message']}")
+        remaining = len(report['issues']) - MAX_PRINTED_ISSUES
+        if remaining > 0:
+            print(f"  ... {remaining} more rows in the JSON report")
+        if report['issues_omitted']:
+            print(f"  ... {report['issues_omitted']} more rows not listed (only counted)")
 
     print("\n" + "=" * 60)
     print("VALIDATION COMPLETE")
     print("=" * 60)
 
+
+def validate_csv(path: Path = FINAL_CSV, json_path: Path = None,
+                 rules: List[Rule] = None, jobs: int = 8, max_issues: int = MAX_REPORTED_ISSUES) -> dict:
+    """Validate CSV structure and contents; also writes a JSON report"""
+    if rules is None:
+        rules = select_rules()
+    with PROFILER.stage('collect stats'):
+        report = collect_stats(path, rules, jobs, max_issues)
+    print_report(report)
+
+    if json_path is None:
+        json_path = path.with_name(path.stem + '.validation.json')
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n[OK] JSON report: {json_path}")
+
+    return report
+
+
 if __name__ == '__main__':
-    validate_csv()
+    parser = argparse.ArgumentParser(description='Validate a resource catalog CSV')
+    parser.add_argument('--path', type=Path, default=FINAL_CSV, help='CSV to validate (default: tools-and-commands.csv)')
+    parser.add_argument('--json', type=Path, default=None,
+                        help='JSON report path (default: <csv>.validation.json next to the CSV)')
+    parser.add_argument('--rules', default=None,
+                        help=f"Comma-separated rules to run (default: all of {', '.join(RULES)})")
+    parser.add_argument('--jobs', '-j', type=int, default=8, help='Threads for filesystem checks (default: 8)')
+    parser.add_argument('--max-issues', type=int, default=MAX_REPORTED_ISSUES,
+                        help=f'Failing rows listed in the JSON report; the rest are only counted (default: {MAX_REPORTED_ISSUES})')
+    parser.add_argument('--strict', action='store_true', help='Exit 1 if any rule is violated')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    try:
+        selected = select_rules(args.rules.split(',') if args.rules else None)
+    except ValueError as e:
+        parser.error(str(e))
+
+    with profile_session(args, 'total'):
+        report = validate_csv(args.path, args.json, selected, args.jobs, args.max_issues)
+    if args.strict and report['rows_with_issues']:
+        sys.exit(1)